@@ -1,6 +1,6 @@
 """Dynamic Ocean Fields package."""
 
-from .envs import DynamicOceanEnv
+from .envs import DynamicOceanEnv, VectorDynamicOceanEnv
 
 __version__ = "0.1.0"
-__all__ = ["DynamicOceanEnv"]
+__all__ = ["DynamicOceanEnv", "VectorDynamicOceanEnv"]
@@ -2,6 +2,13 @@
 """
 Greedy agent: at each step, inspect the local_patch in the observation and pick the neighboring cell
 with the lowest cost. Falls back to random if ties or issues.
+
+act_batch() does the same for stacked observations (e.g. straight from
+VectorDynamicOceanEnv): one gather of the 9 neighbour cells from the (N, 1, K, K) patches,
+argmin with ties broken uniformly by the agent's seeded generator, so each row gets the
+same action distribution as act(). With goal_weight > 0 (goal-biased variant) a move is
+scored by its cost plus goal_weight times the octile distance from its destination to
+goal_pos.
 """
 
 import numpy as np
@@ -22,9 +29,23 @@ MOVES = {
 }
 
 
+# octile distance: max(|dr|, |dc|) + (sqrt(2) - 1) * min(|dr|, |dc|)
+_SQRT2_M1 = np.sqrt(2.0) - 1.0
+_DELTAS = np.array([MOVES[a] for a in range(len(MOVES))])
+
+
 class GreedyAgent:
-    def __init__(self, action_space):
+    def __init__(self, action_space, seed=None, goal_weight: float = 0.0):
+        """
+        Args:
+            action_space: the env's (single) action space
+            seed: seed of the generator breaking ties in act_batch
+            goal_weight: > 0 adds goal_weight * (distance to goal after the move) to each move's cost
+        """
         self.action_space = action_space
+        self.rng = np.random.default_rng(seed)
+        self.goal_weight = goal_weight
+        self._gather = {}  # K -> (actions inside the patch, their flat indices in a K x K patch)
 
     def act(self, obs) -> Any:
         """
@@ -32,6 +53,9 @@ class GreedyAgent:
         obs['agent_pos'] and goal are also available if needed.
         Strategy: choose the move that points to the lowest-cost cell within the local patch.
         """
+        if self.goal_weight:
+            batch = {k: np.asarray(obs[k])[None] for k in ("local_patch", "agent_pos", "goal_pos")}
+            return int(self.act_batch(batch)[0])
         patch = obs["local_patch"][0]  # (K, K)
         K = patch.shape[0]
         center = K // 2
@@ -51,5 +75,33 @@ class GreedyAgent:
             return self.action_space.sample()
         return random.choice(best_actions)
 
+    def _moves_in_patch(self, K: int):
+        if K not in self._gather:
+            center = K // 2
+            actions = np.array([a for a, (dr, dc) in MOVES.items() if 0 <= center + dr < K and 0 <= center + dc < K])
+            self._gather[K] = actions, (center + _DELTAS[actions, 0]) * K + center + _DELTAS[actions, 1]
+        return self._gather[K]
+
+    def act_batch(self, obs) -> np.ndarray:
+        """
+        obs: dict with 'local_patch' (N, 1, K, K) and, for goal_weight > 0, 'agent_pos' and
+        'goal_pos' (N, 2). Returns (N,) int actions.
+        """
+        patch = np.asarray(obs["local_patch"])
+        N, K = patch.shape[0], patch.shape[-1]
+        actions, flat = self._moves_in_patch(K)
+        score = patch.reshape(N, K * K)[:, flat]  # (N, moves) destination costs
+        if self.goal_weight:
+            dest = np.asarray(obs["agent_pos"])[:, None, :] + _DELTAS[actions]
+            d = np.abs(dest - np.asarray(obs["goal_pos"])[:, None, :])
+            score = score + self.goal_weight * (d.max(axis=2) + _SQRT2_M1 * d.min(axis=2))
+        # NaN cells are skipped, as in act(): fmin ignores them (nanmin without its warning) and
+        # they never compare equal to the minimum
+        tied = score == np.fmin.reduce(score, axis=1, keepdims=True)
+        # rows without a comparable score (all NaN) choose among all moves, as act() does
+        tied |= ~tied.any(axis=1, keepdims=True)
+        keys = np.where(tied, self.rng.random(score.shape), -1.0)
+        return actions[keys.argmax(axis=1)]
+
     def reset(self):
         pass
@@ -0,0 +1,195 @@
+# agents/rollout.py
+"""
+Fused rollouts of the scripted baselines (GreedyAgent / RandomAgent) over N episodes.
+
+rollout() runs the policy and the DynamicOceanEnv transition together, without
+observations, agent objects or per-step Python calls:
+- 'greedy' : GreedyAgent's rule, i.e. the action whose destination (clipped to the grid,
+             as the edge-padded local patch shows it) has the lowest cost, ties broken
+             uniformly at random
+- 'random' : uniform over the 9 actions
+Transitions, rewards (-cost of the entered cell) and episode ends (goal reached or
+max_steps) are those of DynamicOceanEnv, so replaying `actions` in the env reproduces
+`trajectories`, `returns` and `success`.
+
+Backends:
+- 'numba' : one compiled loop over episodes and steps (optional dependency)
+- 'numpy' : all unfinished episodes advance together with array ops
+- 'auto'  : 'numba' when Numba is installed, else 'numpy' (default)
+Both draw from seeded generators, but not the same streams: the results of the two
+backends agree in distribution, not sample for sample.
+
+    result = rollout(cost_map, start, goal, num_episodes=10_000, policy="greedy", max_steps=500)
+    result.returns.mean(), result.success.mean()
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .greedy_agent import MOVES
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+POLICIES = ("greedy", "random")
+BACKENDS = ("auto", "numba", "numpy")
+
+# (dr, dc) per action, as DynamicOceanEnv moves
+MOVE_DELTAS = np.array([MOVES[a] for a in range(len(MOVES))], dtype=int)
+
+
+class RolloutResult(NamedTuple):
+    returns: np.ndarray  # (N,) float, sum of rewards
+    success: np.ndarray  # (N,) bool, goal reached
+    lengths: np.ndarray  # (N,) int, steps taken
+    trajectories: Optional[np.ndarray]  # (N, lengths.max() + 1, 2) int32 positions, -1 after the end
+    actions: Optional[np.ndarray]  # (N, lengths.max()) int8, -1 after the end
+
+
+def _rollout_kernel(cost, H, W, starts, goals, max_steps, policy, seed, record, traj, actions, returns, success,
+                    lengths, nb_dr, nb_dc):
+    """
+    Run every episode to its end; cost is the flat (H*W) map, policy 0 = greedy, 1 = random.
+    Fills returns / success / lengths and, if record, traj / actions. Written for numba.njit.
+    """
+    np.random.seed(seed)
+    for i in range(starts.shape[0]):
+        r = starts[i, 0]
+        c = starts[i, 1]
+        if record:
+            traj[i, 0, 0] = r
+            traj[i, 0, 1] = c
+        total = 0.0
+        t = 0
+        while t < max_steps:
+            if policy == 0:
+                best = np.inf
+                a = 0
+                ties = 0
+                for k in range(9):
+                    nr = min(max(r + nb_dr[k], 0), H - 1)
+                    nc = min(max(c + nb_dc[k], 0), W - 1)
+                    v = cost[nr * W + nc]
+                    if v < best:
+                        best = v
+                        a = k
+                        ties = 1
+                    elif v == best:
+                        # keep each of the tied actions with equal probability
+                        ties += 1
+                        if np.random.random() * ties < 1.0:
+                            a = k
+            else:
+                a = np.random.randint(0, 9)
+            r = min(max(r + nb_dr[a], 0), H - 1)
+            c = min(max(c + nb_dc[a], 0), W - 1)
+            total -= cost[r * W + c]
+            if record:
+                actions[i, t] = a
+                traj[i, t + 1, 0] = r
+                traj[i, t + 1, 1] = c
+            t += 1
+            if r == goals[i, 0] and c == goals[i, 1]:
+                success[i] = True
+                break
+        returns[i] = total
+        lengths[i] = t
+
+
+_rollout_kernel_jit = numba.njit(_rollout_kernel) if numba is not None else None
+
+
+def _rollout_numpy(cost_map, starts, goals, max_steps, policy, seed, record, traj, actions, returns, success, lengths):
+    H, W = cost_map.shape
+    rng = np.random.default_rng(seed)
+    idx = np.arange(len(starts))
+    pos = starts.copy()
+    if record:
+        traj[:, 0] = pos
+    for t in range(max_steps):
+        if policy == "greedy":
+            nr = np.clip(pos[:, 0, None] + MOVE_DELTAS[:, 0], 0, H - 1)
+            nc = np.clip(pos[:, 1, None] + MOVE_DELTAS[:, 1], 0, W - 1)
+            v = cost_map[nr, nc]  # (n, 9) destination costs
+            tied = v == np.fmin.reduce(v, axis=1, keepdims=True)  # NaN cells skipped, as in the kernel
+            a = np.where(tied, rng.random(v.shape), -1.0).argmax(axis=1)
+        else:
+            a = rng.integers(0, 9, size=len(idx))
+        pos += MOVE_DELTAS[a]
+        np.clip(pos, 0, (H - 1, W - 1), out=pos)
+        returns[idx] -= cost_map[pos[:, 0], pos[:, 1]]
+        lengths[idx] += 1
+        if record:
+            actions[idx, t] = a
+            traj[idx, t + 1] = pos
+        reached = (pos == goals).all(axis=1)
+        if reached.any():
+            success[idx[reached]] = True
+            keep = ~reached
+            idx, pos, goals = idx[keep], pos[keep], goals[keep]
+            if not len(idx):
+                break
+
+
+def rollout(
+    cost_map: np.ndarray,
+    start,
+    goal,
+    num_episodes: int,
+    policy: str = "greedy",
+    max_steps: Optional[int] = None,
+    seed: int = 0,
+    record: bool = False,
+    backend: str = "auto",
+) -> RolloutResult:
+    """
+    Args:
+        cost_map: 2D array (H, W)
+        start: (row, col) shared by all episodes, or (N, 2) array of per-episode starts
+        goal: (row, col) shared by all episodes, or (N, 2) array of per-episode goals
+        num_episodes: number of episodes N
+        policy: 'greedy' or 'random'
+        max_steps: episode step limit (defaults to H*W*2, as in DynamicOceanEnv)
+        seed: seed of the policy's random choices
+        record: also return per-step trajectories and actions. They are trimmed to the longest
+            episode, but the run itself holds N * (max_steps + 1) * 9 bytes for them, so bound
+            max_steps explicitly when recording on large maps
+        backend: 'auto', 'numba' or 'numpy' (see module docstring)
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    if backend == "auto":
+        backend = "numba" if numba is not None else "numpy"
+    if backend == "numba" and numba is None:
+        raise ImportError("backend='numba' requires the numba package")
+    cost_map = np.ascontiguousarray(cost_map, dtype=float)
+    assert cost_map.ndim == 2, "cost_map must be 2D"
+    H, W = cost_map.shape
+    N = num_episodes
+    max_steps = max_steps or (H * W * 2)
+    starts = np.broadcast_to(np.asarray(start, dtype=np.int64), (N, 2)).copy()
+    goals = np.broadcast_to(np.asarray(goal, dtype=np.int64), (N, 2)).copy()
+
+    returns = np.zeros(N)
+    success = np.zeros(N, dtype=bool)
+    lengths = np.zeros(N, dtype=np.int64)
+    traj = np.full((N, max_steps + 1, 2) if record else (0, 0, 2), -1, dtype=np.int32)
+    actions = np.full((N, max_steps) if record else (0, 0), -1, dtype=np.int8)
+    if backend == "numba":
+        _rollout_kernel_jit(cost_map.ravel(), H, W, starts, goals, max_steps, POLICIES.index(policy), seed, record,
+                            traj, actions, returns, success, lengths, MOVE_DELTAS[:, 0].copy(),
+                            MOVE_DELTAS[:, 1].copy())
+    else:
+        _rollout_numpy(cost_map, starts, goals, max_steps, policy, seed, record, traj, actions, returns, success,
+                       lengths)
+    if not record:
+        return RolloutResult(returns, success, lengths, None, None)
+    T = int(lengths.max()) if N else 0
+    if T < max_steps:  # copy, so the max_steps-wide buffers are freed
+        traj, actions = traj[:, : T + 1].copy(), actions[:, :T].copy()
+    return RolloutResult(returns, success, lengths, traj, actions)
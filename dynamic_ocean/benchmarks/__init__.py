@@ -0,0 +1,14 @@
+"""
+Performance benchmarks.
+
+Run from the package root, e.g.:
+    python -m benchmarks.bench_obs
+
+Code compiled with Numba is called once before it is timed, so compilation is not
+included in any of the timings.
+
+benchmarks.suite runs the env / planner / cost / I/O benchmarks across sizes, writes
+JSON results and compares them against a saved baseline:
+    python -m benchmarks.suite run --out results.json
+    python -m benchmarks.suite compare baseline.json results.json
+"""
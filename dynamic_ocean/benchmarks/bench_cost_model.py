@@ -0,0 +1,60 @@
+"""
+Weight sweeps and single-channel refreshes: aggregate_cost from scratch vs CostModel.
+
+Run:
+    python -m benchmarks.bench_cost_model --C 4 --H 1000 --W 1000 --sweep 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import CostModel, aggregate_cost
+from utils.data_loader import generate_random_grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cost-map recomputation")
+    parser.add_argument("--C", type=int, default=4)
+    parser.add_argument("--H", type=int, default=1000)
+    parser.add_argument("--W", type=int, default=1000)
+    parser.add_argument("--sigma", type=float, default=1.0)
+    parser.add_argument("--sweep", type=int, default=20, help="number of weight vectors")
+    args = parser.parse_args()
+
+    channels = generate_random_grid(C=args.C, H=args.H, W=args.W, seed=0)
+    sweep = np.random.default_rng(1).random((args.sweep, args.C)).tolist()
+    print(f"grid {args.C}x{args.H}x{args.W}, sigma={args.sigma}, {args.sweep} weight vectors")
+
+    t0 = time.perf_counter()
+    for w in sweep:
+        aggregate_cost(channels, w, smooth_sigma=args.sigma)
+    before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    model = CostModel(channels, sweep[0], smooth_sigma=args.sigma)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for w in sweep:
+        model.set_weights(w)
+        model.cost()
+    after = time.perf_counter() - t0
+    print(f"weight sweep: aggregate_cost {before / args.sweep * 1e3:8.1f} ms/map   "
+          f"CostModel {after / args.sweep * 1e3:8.1f} ms/map (+ {build * 1e3:.0f} ms build)")
+
+    fresh = generate_random_grid(C=1, H=args.H, W=args.W, seed=2)[0]
+    refreshed = channels.copy()
+    refreshed[0] = fresh
+    t0 = time.perf_counter()
+    aggregate_cost(refreshed, sweep[0], smooth_sigma=args.sigma)
+    before = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    model.set_channel(0, fresh)
+    model.cost()
+    after = time.perf_counter() - t0
+    print(f"channel refresh: aggregate_cost {before * 1e3:8.1f} ms   CostModel {after * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+cost_to_go: per-cell Dijkstra backends against the whole-array sweep method.
+
+Reports wall-clock time per method and how far the sweep field deviates from the exact
+8-neighbour Dijkstra field (max absolute and max relative difference over reachable
+cells), plus the number of sweep passes. The pure-Python 'flat' backend is skipped above
+--flat-max cells per side.
+
+Run:
+    python -m benchmarks.bench_cost_to_go --sizes 256 1024 2048
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.pathfinding import cost_to_go, numba
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cost_to_go methods")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[256, 1024])
+    parser.add_argument("--flat-max", type=int, default=1024)
+    parser.add_argument("--sigma", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if numba is not None:
+        cost_to_go(np.ones((8, 8)), (0, 0), backend="numba")
+
+    print(f"{'size':>6} {'method':>16} {'seconds':>8} {'speedup':>8} {'max_abs':>9} {'max_rel':>9} {'sweeps':>6}")
+    for n in args.sizes:
+        channels = generate_random_grid(C=4, H=n, W=n, seed=args.seed)
+        cost_map = aggregate_cost(channels, [1.0, 0.8, 0.3, 0.5], smooth_sigma=args.sigma)
+        del channels
+        goal = (n // 3, n // 2)
+
+        runs = []
+        if n <= args.flat_max:
+            runs.append(("dijkstra/flat", {"backend": "flat"}))
+        if numba is not None:
+            runs.append(("dijkstra/numba", {"backend": "numba"}))
+        runs.append(("sweep", {"method": "sweep"}))
+
+        exact, reference_secs = None, None
+        for name, kwargs in runs:
+            stats = {}
+            t0 = time.perf_counter()
+            dist, _ = cost_to_go(cost_map, goal, stats=stats, **kwargs)
+            secs = time.perf_counter() - t0
+            if exact is None:
+                exact, reference_secs = dist, secs
+            finite = np.isfinite(exact)
+            diff = np.abs(dist[finite] - exact[finite])
+            rel = diff / np.maximum(exact[finite], 1e-12)
+            print(f"{n:>6} {name:>16} {secs:8.3f} {reference_secs / secs:8.1f} {diff.max():9.1e} {rel.max():9.1e} "
+                  f"{stats.get('sweeps', '-'):>6}")
+
+
+if __name__ == "__main__":
+    main()
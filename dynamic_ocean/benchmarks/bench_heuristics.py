@@ -0,0 +1,66 @@
+"""
+astar_grid heuristics: nodes expanded, latency and cost excess over the optimum.
+
+'none' is Dijkstra and gives the optimal cost. 'manhattan' and 'euclidean' are not
+admissible on aggregate_cost maps (costs in [0, 1]) and may return worse paths; the
+excess column shows by how much. 'alt' uses landmark tables built once per map
+(reported as landmark_s) and passed to every query.
+
+Run:
+    python -m benchmarks.bench_heuristics --sizes 256 1024 --queries 20 --landmarks 8
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.pathfinding import alt_landmarks, astar_grid
+
+HEURISTICS = ["none", "manhattan", "euclidean", "octile", "alt"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark astar_grid heuristics")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[256, 1024])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--sigma", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    astar_grid(np.ones((8, 8)), (0, 0), (7, 7), heuristic="alt")  # warm-up
+
+    print(f"{'size':>6} {'heuristic':>10} {'expanded':>10} {'query_ms':>9} {'excess%':>8}")
+    for n in args.sizes:
+        channels = generate_random_grid(C=4, H=n, W=n, seed=args.seed)
+        cost_map = aggregate_cost(channels, [1.0, 0.8, 0.3, 0.5], smooth_sigma=args.sigma)
+        rng = np.random.default_rng(args.seed)
+        queries = [(tuple(int(v) for v in rng.integers(n, size=2)), tuple(int(v) for v in rng.integers(n, size=2)))
+                   for _ in range(args.queries)]
+        t0 = time.perf_counter()
+        landmarks = alt_landmarks(cost_map, count=args.landmarks)
+        print(f"{n:>6} landmark_s={time.perf_counter() - t0:.2f} ({args.landmarks} landmarks)")
+
+        optimal = None
+        for heuristic in HEURISTICS:
+            costs, expanded, secs = [], 0, 0.0
+            for start, goal in queries:
+                stats = {}
+                t0 = time.perf_counter()
+                _, cost = astar_grid(cost_map, start, goal, heuristic=heuristic, landmarks=landmarks, stats=stats)
+                secs += time.perf_counter() - t0
+                costs.append(cost)
+                expanded += stats["expanded"]
+            costs = np.array(costs)
+            if optimal is None:
+                optimal = costs
+            excess = 100.0 * np.mean(costs / np.maximum(optimal, 1e-12) - 1.0)
+            print(f"{n:>6} {heuristic:>10} {expanded // len(queries):>10d} {1000 * secs / len(queries):9.2f} "
+                  f"{excess:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+HierarchicalPlanner against astar_grid: build time, query latency, speedup and suboptimality.
+
+The reference is astar_grid with heuristic='none' (Dijkstra), which returns the optimal
+cost on these maps. Suboptimality is the mean and worst excess of the hierarchical
+cost over that optimum. Queries are random start/goal pairs at least a quarter of the map
+apart.
+
+Run:
+    python -m benchmarks.bench_hierarchical --size 2000 --cluster 64 --queries 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.hierarchical import HierarchicalPlanner
+from utils.pathfinding import astar_grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hierarchical pathfinding")
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--cluster", type=int, default=64)
+    parser.add_argument("--entrance", type=int, default=16)
+    parser.add_argument("--span", type=int, default=4)
+    parser.add_argument("--corridors", nargs="+", type=int, default=[0, 1])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n = args.size
+    channels = generate_random_grid(C=4, H=n, W=n, seed=args.seed)
+    cost_map = aggregate_cost(channels, [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0) + 0.05
+    del channels
+    astar_grid(cost_map[:8, :8], (0, 0), (7, 7))  # warm-up
+
+    rng = np.random.default_rng(args.seed)
+    queries = []
+    while len(queries) < args.queries:
+        start, goal = rng.integers(n, size=2), rng.integers(n, size=2)
+        if np.abs(start - goal).max() >= n // 4:
+            queries.append((tuple(int(v) for v in start), tuple(int(v) for v in goal)))
+
+    optimal, secs = [], 0.0
+    for start, goal in queries:
+        t0 = time.perf_counter()
+        optimal.append(astar_grid(cost_map, start, goal, heuristic="none")[1])
+        secs += time.perf_counter() - t0
+    astar_ms = 1000 * secs / len(queries)
+    print(f"grid {n}x{n}, {len(queries)} queries, cluster={args.cluster} entrance={args.entrance} span={args.span}")
+    print(f"{'planner':>12} {'build_s':>8} {'nodes':>7} {'query_ms':>9} {'speedup':>8} {'mean_sub%':>10} {'max_sub%':>9}")
+    print(f"{'astar_grid':>12} {'-':>8} {'-':>7} {astar_ms:9.1f} {1.0:8.1f} {0.0:10.2f} {0.0:9.2f}")
+
+    for corridor in args.corridors:
+        planner = HierarchicalPlanner(cost_map, cluster=args.cluster, entrance=args.entrance, span=args.span,
+                                      corridor=corridor)
+        excess, secs = [], 0.0
+        for (start, goal), best in zip(queries, optimal):
+            t0 = time.perf_counter()
+            _, cost = planner.plan(start, goal)
+            secs += time.perf_counter() - t0
+            excess.append(100.0 * (cost / best - 1.0))
+        query_ms = 1000 * secs / len(queries)
+        print(f"{f'hpa c={corridor}':>12} {planner.build_seconds:8.2f} {len(planner.graph):7d} {query_ms:9.1f} "
+              f"{astar_ms / query_ms:8.1f} {np.mean(excess):10.2f} {np.max(excess):9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+IncrementalPlanner (D* Lite) repairs against replanning from scratch with astar_grid.
+
+An agent sails from one corner towards the opposite one. Every --every steps a forecast
+update rescales a --patch x --patch block of the map (by a random factor in [0.5, 3])
+centred --ahead cells further along the current path, and both planners replan from
+the agent's position. Costs are checked to agree.
+
+Run:
+    python -m benchmarks.bench_incremental --size 1024 --updates 30 --ahead 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.incremental import IncrementalPlanner
+from utils.pathfinding import astar_grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental replanning")
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--updates", type=int, default=20)
+    parser.add_argument("--every", type=int, default=5)
+    parser.add_argument("--patch", type=int, default=16)
+    parser.add_argument("--ahead", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n = args.size
+    cost_map = aggregate_cost(generate_random_grid(C=4, H=n, W=n, seed=args.seed), [1.0, 0.8, 0.3, 0.5],
+                              smooth_sigma=1.0) + 0.05
+    warm = IncrementalPlanner(np.ones((4, 4)), (0, 0), (3, 3))
+    warm.plan()
+    astar_grid(np.ones((4, 4)), (0, 0), (3, 3))
+
+    rng = np.random.default_rng(args.seed)
+    planner = IncrementalPlanner(cost_map, (2, 2), (n - 3, n - 3))
+    stats = {}
+    path, _ = planner.plan(stats=stats)
+    print(f"grid {n}x{n}, initial plan {stats['seconds'] * 1000:.1f} ms, {stats['expanded']} expanded")
+
+    repair_ms, astar_ms, expanded, worst = [], [], [], 0.0
+    for _ in range(args.updates):
+        if len(path) <= args.every + 1:
+            break
+        planner.move_to(path[args.every])
+        r, c = path[min(args.every + args.ahead, len(path) - 1)]
+        half = args.patch // 2
+        r0, c0 = max(r - half, 0), max(c - half, 0)
+        block = planner.cost_map[r0 : r0 + args.patch, c0 : c0 + args.patch] * rng.uniform(0.5, 3.0)
+        planner.set_region(r0, c0, block)
+
+        path, cost = planner.plan(stats=stats)
+        repair_ms.append(stats["seconds"] * 1000)
+        expanded.append(stats["expanded"])
+        t0 = time.perf_counter()
+        _, ref = astar_grid(planner.cost_map, planner.start, planner.goal)
+        astar_ms.append((time.perf_counter() - t0) * 1000)
+        worst = max(worst, abs(cost - ref) / ref)
+
+    print(f"{len(repair_ms)} updates, patch {args.patch}, {args.ahead} cells ahead of the agent")
+    print(f"{'planner':>12} {'mean_ms':>9} {'median_ms':>10} {'expanded':>9}")
+    print(f"{'astar_grid':>12} {np.mean(astar_ms):9.1f} {np.median(astar_ms):10.1f} {'-':>9}")
+    print(f"{'d* lite':>12} {np.mean(repair_ms):9.1f} {np.median(repair_ms):10.1f} {int(np.mean(expanded)):9d}")
+    print(f"speedup {np.mean(astar_ms) / np.mean(repair_ms):.1f}x, max relative cost difference {worst:.1e}")
+
+
+if __name__ == "__main__":
+    main()
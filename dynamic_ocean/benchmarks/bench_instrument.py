@@ -0,0 +1,85 @@
+"""
+Overhead of utils.instrument on DynamicOceanEnv.step.
+
+Times the same random-action episodes three ways: never instrumented, with reset / step /
+_get_obs wrapped by a Recorder (latency histograms only, and optionally with
+--allocations), and instrumented then uninstrument()ed. The last must match the first:
+when disabled no wrapper is left on the hot path. Each run uses a new env; best of
+--repeat rounds, with the order of the three cases rotated every round.
+
+Run:
+    python -m benchmarks.bench_instrument --size 256 --patch 7 --steps 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from envs.dynamic_ocean_env import DynamicOceanEnv
+from utils.data_loader import generate_random_grid
+from utils.instrument import DEFAULT_METHODS, Recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark instrumentation overhead")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--patch", type=int, default=7)
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--allocations", action="store_true", help="also track allocations (tracemalloc)")
+    args = parser.parse_args()
+
+    n = args.size
+    cost_map = aggregate_cost(generate_random_grid(C=4, H=n, W=n, seed=0), [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0)
+    actions = np.random.default_rng(0).integers(0, 9, size=args.steps).tolist()
+
+    def episode(env):
+        env.reset(seed=0)
+        t0 = time.perf_counter()
+        for a in actions:
+            if env.step(a)[2]:
+                env.reset()
+        return time.perf_counter() - t0
+
+    def fresh_env():
+        return DynamicOceanEnv(cost_map, (n // 2, n // 2), (n - 1, n - 1), patch_size=args.patch)
+
+    rec = Recorder(track_allocations=args.allocations)
+
+    def off():
+        return episode(fresh_env())
+
+    def on():
+        env = fresh_env()
+        rec.instrument(env, DEFAULT_METHODS["env"], prefix="env")
+        try:
+            return episode(env)
+        finally:
+            rec.uninstrument()
+
+    def removed():
+        env = fresh_env()
+        rec.instrument(env, DEFAULT_METHODS["env"], prefix="env")
+        rec.uninstrument()
+        return episode(env)
+
+    cases = [("off", off), ("on", on), ("removed", removed)]
+    best = {label: float("inf") for label, _ in cases}
+    for i in range(args.repeat):
+        for label, fn in cases[i % 3:] + cases[: i % 3]:  # rotate the order against drift
+            best[label] = min(best[label], fn())
+
+    print(f"grid {n}x{n}, patch {args.patch}, {args.steps} steps, best of {args.repeat}")
+    for label, secs in best.items():
+        overhead = 100 * (secs / best["off"] - 1)
+        print(f"{label:>8}: {args.steps / secs:10.0f} steps/s  {overhead:+6.1f}%")
+    step = rec.snapshot()["calls"]["env.step"]
+    print(f"env.step p50 <= {step['p50_seconds'] * 1e6:.1f} us, p99 <= {step['p99_seconds'] * 1e6:.1f} us")
+    if args.allocations:
+        print(f"env.step allocated {rec.alloc_bytes['env.step'] / step['count']:.0f} B/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Per-step cost of DynamicOceanEnv observations for each obs_mode.
+
+Reports steps/sec and the bytes allocated during a step (tracemalloc peak above the
+pre-step level, averaged over steps) for patch sizes 3..31. With --channels C the envs
+also observe C raw channels ('local_channels') in --channel-layout / --channel-dtype, and
+with --pyramid-levels L an (L, K, K) coarse-context pyramid.
+
+Run:
+    python -m benchmarks.bench_obs --H 256 --W 256 --steps 2000
+    python -m benchmarks.bench_obs --channels 8 --channel-dtype float16
+    python -m benchmarks.bench_obs --patch-sizes 7 --pyramid-levels 4
+"""
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+
+from envs.dynamic_ocean_env import CHANNEL_LAYOUTS, DynamicOceanEnv, OBS_MODES
+
+
+def bench_mode(cost_map, patch_size, obs_mode, steps, seed=0, **channel_kw):
+    H, W = cost_map.shape
+    env = DynamicOceanEnv(cost_map, (H // 2, W // 2), (H - 1, W - 1), patch_size=patch_size,
+                          max_steps=10 * steps, obs_mode=obs_mode, **channel_kw)
+    env.reset()
+    actions = np.random.default_rng(seed).integers(0, 9, size=steps).tolist()
+
+    t0 = time.perf_counter()
+    for a in actions:
+        env.step(a)
+    steps_per_sec = steps / (time.perf_counter() - t0)
+
+    env.reset()
+    tracemalloc.start()
+    total = 0
+    for a in actions:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        env.step(a)
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return steps_per_sec, total / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark observation modes")
+    parser.add_argument("--H", type=int, default=256)
+    parser.add_argument("--W", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--patch-sizes", nargs="+", type=int, default=[3, 7, 15, 31])
+    parser.add_argument("--channels", type=int, default=0, help="also observe this many raw channels")
+    parser.add_argument("--channel-layout", choices=CHANNEL_LAYOUTS, default="last")
+    parser.add_argument("--channel-dtype", default="float32")
+    parser.add_argument("--pyramid-levels", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cost_map = rng.random((args.H, args.W))
+    channel_kw = {"pyramid_levels": args.pyramid_levels}
+    if args.channels:
+        channel_kw.update(channels=rng.random((args.channels, args.H, args.W)), channel_layout=args.channel_layout,
+                          channel_dtype=np.dtype(args.channel_dtype))
+    print(f"{'K':>4} {'mode':>7} {'steps/s':>10} {'bytes/step':>11}")
+    for K in args.patch_sizes:
+        for mode in OBS_MODES:
+            sps, nbytes = bench_mode(cost_map, K, mode, args.steps, **channel_kw)
+            print(f"{K:>4} {mode:>7} {sps:>10.0f} {nbytes:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
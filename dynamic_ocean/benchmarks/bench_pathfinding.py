@@ -0,0 +1,51 @@
+"""
+astar_grid / dijkstra_grid latency per backend on random grids from generate_random_grid.
+
+The 'dict' reference backend is skipped above --dict-max cells per side because it
+gets very slow on large grids.
+
+Run:
+    python -m benchmarks.bench_pathfinding --sizes 128 512 2000
+"""
+
+import argparse
+import time
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.pathfinding import astar_grid, dijkstra_grid, numba
+
+
+def _time(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pathfinding backends")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[64, 256, 1024])
+    parser.add_argument("--dict-max", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backends = ["dict", "flat"] + (["numba"] if numba is not None else [])
+    if numba is not None:
+        warm = aggregate_cost(generate_random_grid(C=4, H=8, W=8, seed=0), [1.0, 0.8, 0.3, 0.5])
+        astar_grid(warm, (0, 0), (7, 7), backend="numba")
+
+    print(f"{'size':>6} {'planner':>9} {'backend':>7} {'seconds':>9} {'cost':>12}")
+    for n in args.sizes:
+        channels = generate_random_grid(C=4, H=n, W=n, seed=args.seed)
+        cost_map = aggregate_cost(channels, [1.0, 0.8, 0.3, 0.5])
+        start, goal = (0, 0), (n - 1, n - 1)
+        for name, planner in (("astar", astar_grid), ("dijkstra", dijkstra_grid)):
+            for backend in backends:
+                if backend == "dict" and n > args.dict_max:
+                    continue
+                secs, (_, cost) = _time(planner, cost_map, start, goal, backend=backend)
+                print(f"{n:>6} {name:>9} {backend:>7} {secs:>9.3f} {cost:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+plan_many throughput against one astar_grid call per query.
+
+Queries draw random starts and goals from a pool of --goals distinct goals, so most
+goals are shared and plan_many answers them from one cost_to_go each. Each worker
+count runs the same queries; the map is shared with the workers, not copied.
+
+Run:
+    python -m benchmarks.bench_plan_many --size 512 --queries 2000 --goals 20 --workers 1 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.pathfinding import astar_grid, plan_many
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark plan_many")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--goals", type=int, default=10)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2])
+    parser.add_argument("--loop-max", type=int, default=200, help="queries timed for the astar loop")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n = args.size
+    cost_map = aggregate_cost(generate_random_grid(C=4, H=n, W=n, seed=args.seed), [1.0, 0.8, 0.3, 0.5])
+    rng = np.random.default_rng(args.seed)
+    goals = [tuple(int(v) for v in rng.integers(n, size=2)) for _ in range(args.goals)]
+    queries = [(tuple(int(v) for v in rng.integers(n, size=2)), goals[rng.integers(len(goals))])
+               for _ in range(args.queries)]
+    astar_grid(cost_map[:8, :8], (0, 0), (7, 7))  # warm-up
+
+    print(f"grid {n}x{n}, {len(queries)} queries, {len(goals)} goals")
+    print(f"{'planner':>14} {'seconds':>9} {'queries/s':>10} {'searches':>9}")
+    loop = queries[: args.loop_max]
+    t0 = time.perf_counter()
+    for start, goal in loop:
+        astar_grid(cost_map, start, goal, heuristic="none")
+    secs = time.perf_counter() - t0
+    print(f"{'astar loop':>14} {secs * len(queries) / len(loop):9.2f} {len(loop) / secs:10.1f} {len(queries):9d}"
+          + ("  (extrapolated)" if len(loop) < len(queries) else ""))
+    for workers in args.workers:
+        stats = {}
+        for _ in plan_many(cost_map, queries, workers=workers, stats=stats):
+            pass
+        print(f"{f'plan_many x{workers}':>14} {stats['seconds']:9.2f} {stats['queries_per_sec']:10.1f} "
+              f"{stats['searches']:9d}")
+
+
+if __name__ == "__main__":
+    main()
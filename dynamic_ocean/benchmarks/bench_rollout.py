@@ -0,0 +1,96 @@
+"""
+Scripted-baseline rollouts: Python agent loop against the fused rollout engine.
+
+The reference is the run_demo loop (GreedyAgent.act / RandomAgent.act on every
+DynamicOceanEnv observation) over the first --python-episodes of the random starts;
+agents.rollout.rollout runs all --episodes per backend. For greedy, 'batch' steps a
+VectorDynamicOceanEnv of --python-episodes * 50 ships with GreedyAgent.act_batch for
+--max-steps steps (finished ships restart, so it reports throughput only). Reports steps/sec
+and the success rate and mean return of each.
+
+Run:
+    python -m benchmarks.bench_rollout --size 256 --episodes 10000 --max-steps 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from agents.greedy_agent import GreedyAgent
+from agents.random_agent import RandomAgent
+from agents.rollout import numba, rollout
+from envs.cost_functions import aggregate_cost
+from envs.dynamic_ocean_env import DynamicOceanEnv
+from envs.vector_env import VectorDynamicOceanEnv
+from utils.data_loader import generate_random_grid
+
+
+def python_loop(cost_map, starts, goal, agent_cls, max_steps):
+    env = DynamicOceanEnv(cost_map, tuple(starts[0]), goal, max_steps=max_steps)
+    agent = agent_cls(env.action_space)
+    steps, returns, successes = 0, [], []
+    for start in starts:
+        env.start = tuple(start)
+        obs, _ = env.reset()
+        done, total = False, 0.0
+        while not done:
+            obs, r, done, _, info = env.step(agent.act(obs))
+            total += r
+            steps += 1
+        returns.append(total)
+        successes.append(info["success"])
+    return steps, float(np.mean(returns)), float(np.mean(successes))
+
+
+def batch_loop(cost_map, starts, goal, max_steps, seed):
+    env = VectorDynamicOceanEnv(cost_map, starts, goal, num_envs=len(starts), max_steps=max_steps)
+    agent = GreedyAgent(env.single_action_space, seed=seed)
+    obs, _ = env.reset()
+    for _ in range(max_steps):
+        obs = env.step(agent.act_batch(obs))[0]
+    return len(starts) * max_steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scripted-agent rollouts")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--episodes", type=int, default=10000)
+    parser.add_argument("--python-episodes", type=int, default=20)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n = args.size
+    cost_map = aggregate_cost(generate_random_grid(C=4, H=n, W=n, seed=args.seed), [1.0, 0.8, 0.3, 0.5],
+                              smooth_sigma=1.0)
+    goal = (n - 1, n - 1)
+    starts = np.random.default_rng(args.seed).integers(0, n, size=(args.episodes, 2))
+    backends = ["numpy"] + (["numba"] if numba is not None else [])
+    if numba is not None:
+        rollout(np.ones((4, 4)), (0, 0), (3, 3), 1, backend="numba")  # warm-up (compilation)
+
+    print(f"grid {n}x{n}, max_steps {args.max_steps}")
+    print(f"{'policy':>7} {'engine':>7} {'episodes':>9} {'steps/s':>12} {'success':>8} {'mean return':>12}")
+    for policy, agent_cls in (("greedy", GreedyAgent), ("random", RandomAgent)):
+        t0 = time.perf_counter()
+        steps, mean_ret, succ = python_loop(cost_map, starts[: args.python_episodes], goal, agent_cls,
+                                            args.max_steps)
+        secs = time.perf_counter() - t0
+        print(f"{policy:>7} {'python':>7} {args.python_episodes:>9} {steps / secs:>12.0f} {succ:>8.2f} {mean_ret:>12.1f}")
+        if policy == "greedy":
+            t0 = time.perf_counter()
+            steps = batch_loop(cost_map, starts[: args.python_episodes * 50], goal, args.max_steps, args.seed)
+            secs = time.perf_counter() - t0
+            print(f"{policy:>7} {'batch':>7} {args.python_episodes * 50:>9} {steps / secs:>12.0f}")
+        for backend in backends:
+            t0 = time.perf_counter()
+            res = rollout(cost_map, starts, goal, args.episodes, policy, args.max_steps, args.seed, record=False,
+                          backend=backend)
+            secs = time.perf_counter() - t0
+            print(f"{policy:>7} {backend:>7} {args.episodes:>9} {res.lengths.sum() / secs:>12.0f} "
+                  f"{res.success.mean():>8.2f} {res.returns.mean():>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
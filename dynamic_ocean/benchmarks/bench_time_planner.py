@@ -0,0 +1,74 @@
+"""
+Runtime and peak memory of astar_time_grid on a memory-mapped (T, H, W) forecast cube.
+
+The cube is written once to a temporary .npy file (float32) built from
+generate_random_grid maps drifting over time, then searched corner to corner.
+Peak memory is reported as the process max RSS and, in a second traced run, the
+tracemalloc peak (Python + NumPy allocations made by the search).
+
+Run:
+    python -m benchmarks.bench_time_planner --H 500 --W 500 --T 240 --max-wait 6
+"""
+
+import argparse
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from utils.data_loader import generate_random_grid
+from utils.pathfinding import astar_time_grid
+
+
+def write_cube(path, T, H, W, seed=0):
+    cube = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(T, H, W))
+    a = aggregate_cost(generate_random_grid(C=4, H=H, W=W, seed=seed), [1.0, 0.8, 0.3, 0.5])
+    b = aggregate_cost(generate_random_grid(C=4, H=H, W=W, seed=seed + 1), [1.0, 0.8, 0.3, 0.5])
+    for t in range(T):
+        w = 0.5 * (1.0 + np.sin(2 * np.pi * t / max(T, 1)))
+        cube[t] = (1.0 - w) * a + w * b
+    cube.flush()
+    del cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-dependent A*")
+    parser.add_argument("--H", type=int, default=200)
+    parser.add_argument("--W", type=int, default=200)
+    parser.add_argument("--T", type=int, default=96)
+    parser.add_argument("--no-prune", action="store_true", help="exact time-expanded search")
+    parser.add_argument("--no-wait", action="store_true")
+    parser.add_argument("--max-wait", type=int, default=None, help="wait steps allowed per cell after first arrival")
+    parser.add_argument("--max-frames", type=int, default=16, help="frames held in memory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cube.npy"
+        write_cube(path, args.T, args.H, args.W)
+        cube = np.load(path, mmap_mode="r")
+        kwargs = dict(allow_wait=not args.no_wait, max_wait=args.max_wait, prune=not args.no_prune,
+                      max_frames=args.max_frames)
+        stats = {}
+        t0 = time.perf_counter()
+        route, cost = astar_time_grid(cube, (0, 0), (args.H - 1, args.W - 1), stats=stats, **kwargs)
+        secs = time.perf_counter() - t0
+        # tracemalloc slows Python down a lot, so memory is traced in a separate run
+        tracemalloc.start()
+        astar_time_grid(cube, (0, 0), (args.H - 1, args.W - 1), **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    maxrss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    cube_mb = args.T * args.H * args.W * 4 / 2**20
+    print(f"cube {args.T}x{args.H}x{args.W} ({cube_mb:.0f} MB on disk)")
+    print(f"seconds={secs:.2f} cost={cost:.4f} steps={len(route) - 1 if route else None}")
+    print(f"expanded={stats['expanded']} settled={stats['settled']} max_heap={stats['max_heap']}")
+    print(f"tracemalloc_peak_mb={peak / 2**20:.1f} max_rss_mb={maxrss_mb:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark suite with machine-readable results and a regression check.
+
+`run` measures, for every grid size (and patch size / channel count where relevant):
+- env_step        steps/sec of DynamicOceanEnv.step per patch size and obs_mode
+- astar_grid      corner-to-corner latency (default heuristic)
+- dijkstra_grid   corner-to-corner latency
+- aggregate_cost  seconds and tracemalloc peak bytes per channel count
+- load_grid       seconds to read a whole .npz file and a chunked .grid store
+Timings are the best of --repeat runs. Planner timings use the default backend
+(numba when installed, recorded in the metadata) after a warm-up call.
+
+Results are JSON:
+    {"meta": {...}, "results": [{"name", "params", "metric", "value", "unit", "better"}, ...]}
+where better is "higher" or "lower". `compare` matches results by (name, params, metric)
+and exits with status 1 if any metric is worse than the baseline by more than
+--threshold (relative), so it can gate CI.
+
+Run:
+    python -m benchmarks.suite run --sizes 64 256 1024 4096 --out results.json
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from envs.cost_functions import aggregate_cost
+from envs.dynamic_ocean_env import DynamicOceanEnv, OBS_MODES
+from utils.data_loader import generate_random_grid, load_grid, save_grid
+from utils.pathfinding import astar_grid, dijkstra_grid, numba
+
+WEIGHTS4 = [1.0, 0.8, 0.3, 0.5]
+
+
+def _record(name, params, metric, value, unit, better):
+    return {"name": name, "params": params, "metric": metric, "value": float(value), "unit": unit, "better": better}
+
+
+def _best_seconds(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _cost_map(n, seed=0):
+    return aggregate_cost(generate_random_grid(C=4, H=n, W=n, seed=seed), WEIGHTS4, smooth_sigma=1.0)
+
+
+def bench_env_step(n, patch_sizes, steps, repeat):
+    cost_map = _cost_map(n)
+    actions = np.random.default_rng(0).integers(0, 9, size=steps).tolist()
+    out = []
+    for K in patch_sizes:
+        for mode in OBS_MODES:
+            env = DynamicOceanEnv(cost_map, (n // 2, n // 2), (n - 1, n - 1), patch_size=K, obs_mode=mode)
+
+            def episode():
+                env.reset()
+                for a in actions:
+                    if env.step(a)[2]:
+                        env.reset()
+
+            secs = _best_seconds(episode, repeat)
+            params = {"size": n, "patch_size": K, "obs_mode": mode}
+            out.append(_record("env_step", params, "steps_per_sec", steps / secs, "1/s", "higher"))
+    return out
+
+
+def bench_planners(n, repeat):
+    cost_map = _cost_map(n)
+    out = []
+    for name, fn in (("astar_grid", astar_grid), ("dijkstra_grid", dijkstra_grid)):
+        secs = _best_seconds(lambda: fn(cost_map, (0, 0), (n - 1, n - 1)), repeat)
+        out.append(_record(name, {"size": n}, "seconds", secs, "s", "lower"))
+    return out
+
+
+def bench_aggregate_cost(n, channel_counts, repeat):
+    out = []
+    for C in channel_counts:
+        channels = np.random.default_rng(0).random((C, n, n))
+        weights = np.linspace(1.0, 0.2, C).tolist()
+        secs = _best_seconds(lambda: aggregate_cost(channels, weights, smooth_sigma=1.0), repeat)
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        aggregate_cost(channels, weights, smooth_sigma=1.0)
+        peak = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        params = {"size": n, "channels": C}
+        out.append(_record("aggregate_cost", params, "seconds", secs, "s", "lower"))
+        out.append(_record("aggregate_cost", params, "peak_bytes", peak, "B", "lower"))
+    return out
+
+
+def bench_load_grid(n, channel_counts, repeat):
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for C in channel_counts:
+            channels = generate_random_grid(C=C, H=n, W=n, seed=0)
+            for fmt, path in (("npz", Path(tmp) / f"grid_{C}.npz"), ("chunked", Path(tmp) / f"grid_{C}.grid")):
+                save_grid(str(path), channels, format=fmt)
+                secs = _best_seconds(lambda: load_grid(str(path)), repeat)
+                params = {"size": n, "channels": C, "format": fmt}
+                out.append(_record("load_grid", params, "seconds", secs, "s", "lower"))
+    return out
+
+
+BENCHMARKS = ("env_step", "planners", "aggregate_cost", "load_grid")
+
+
+def run(sizes, patch_sizes=(3, 7, 15), channel_counts=(4, 8), steps=2000, repeat=3, only=BENCHMARKS):
+    """Run the selected benchmarks for every size; returns the JSON-ready result dict."""
+    if "planners" in only:
+        astar_grid(np.ones((8, 8)), (0, 0), (7, 7))  # warm-up (numba compilation)
+    results = []
+    for n in sizes:
+        if "env_step" in only:
+            results += bench_env_step(n, patch_sizes, steps, repeat)
+        if "planners" in only:
+            results += bench_planners(n, repeat)
+        if "aggregate_cost" in only:
+            results += bench_aggregate_cost(n, channel_counts, repeat)
+        if "load_grid" in only:
+            results += bench_load_grid(n, channel_counts, repeat)
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "numba": getattr(numba, "__version__", None),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": list(sizes),
+        "patch_sizes": list(patch_sizes),
+        "channel_counts": list(channel_counts),
+        "steps": steps,
+        "repeat": repeat,
+    }
+    return {"meta": meta, "results": results}
+
+
+def _key(record):
+    return record["name"], json.dumps(record["params"], sort_keys=True), record["metric"]
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Compare two result dicts. Returns (rows, regressions), each row a
+    (record, baseline value, relative change in the "worse" direction) tuple.
+    Metrics present in only one of the files are ignored.
+    """
+    base = {_key(r): r for r in baseline["results"]}
+    rows, regressions = [], []
+    for record in current["results"]:
+        old = base.get(_key(record))
+        if old is None or old["value"] == 0:
+            continue
+        change = (record["value"] - old["value"]) / abs(old["value"])
+        worse = -change if record["better"] == "higher" else change
+        rows.append((record, old["value"], worse))
+        if worse > threshold:
+            regressions.append((record, old["value"], worse))
+    return rows, regressions
+
+
+def _print_results(results):
+    print(f"{'benchmark':>15} {'params':<45} {'metric':>14} {'value':>12}")
+    for r in results:
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        print(f"{r['name']:>15} {params:<45} {r['metric']:>14} {r['value']:12.4g}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="dynamic_ocean benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="run benchmarks and write JSON results")
+    p_run.add_argument("--sizes", nargs="+", type=int, default=[64, 256, 1024])
+    p_run.add_argument("--patch-sizes", nargs="+", type=int, default=[3, 7, 15])
+    p_run.add_argument("--channels", nargs="+", type=int, default=[4, 8])
+    p_run.add_argument("--steps", type=int, default=2000)
+    p_run.add_argument("--repeat", type=int, default=3)
+    p_run.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    p_run.add_argument("--out", help="write results to this JSON file")
+    p_cmp = sub.add_parser("compare", help="fail if results regressed against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        data = run(args.sizes, args.patch_sizes, args.channels, args.steps, args.repeat, args.only)
+        _print_results(data["results"])
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(data, f, indent=2)
+            print(f"wrote {len(data['results'])} results to {args.out}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':>15} {'params':<45} {'metric':>14} {'baseline':>11} {'current':>11} {'worse%':>7}")
+    for record, old, worse in rows:
+        params = " ".join(f"{k}={v}" for k, v in record["params"].items())
+        flag = "  REGRESSION" if worse > args.threshold else ""
+        print(f"{record['name']:>15} {params:<45} {record['metric']:>14} {old:11.4g} {record['value']:11.4g} "
+              f"{100 * worse:7.1f}{flag}")
+    print(f"{len(rows)} metrics compared, {len(regressions)} regressed beyond {100 * args.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# env_factory.py
+"""
+Shared body of the Hub loaders (environments/*/load_environment.py and the repo-root
+load_environment.py).
+
+make_env_factory builds the cost map and every read-only field derived from it once
+(optionally through a utils.cost_cache.CostCache and/or utils.shared memory) and returns a
+factory whose DynamicOceanEnv instances all share them:
+
+    factory = make_env_factory(grid_path="data/sample_grid.npz", shaping="cost_to_go")
+    env = factory()
+    dist, parent_dir = factory.cost_to_go()
+"""
+
+import weakref
+from typing import Callable, Optional
+
+import numpy as np
+
+from .envs.cost_functions import aggregate_cost
+from .envs.dynamic_ocean_env import DynamicOceanEnv, pad_channels
+from .utils.cost_cache import CostCache, file_digest
+from .utils.data_loader import load_grid
+from .utils.pathfinding import cost_to_go, geodesic_distance
+from .utils.shared import SharedArrays, attach
+
+SHAPINGS = (None, "cost_to_go", "geodesic")
+
+
+def make_env_factory(
+    grid_path: Optional[str] = None,
+    channels: Optional[np.ndarray] = None,
+    meta: Optional[dict] = None,
+    weights=None,
+    smooth_sigma: float = 1.0,
+    patch_size: int = 3,
+    start=None,
+    goal=None,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: Optional[int] = None,
+    share_memory: bool = False,
+    precompute_cost_to_go: bool = False,
+    shaping: Optional[str] = None,
+    shaping_gamma: float = 0.99,
+    observe_channels: bool = False,
+    channel_layout: str = "last",
+    channel_dtype="float32",
+    **env_kwargs,
+) -> Callable[..., DynamicOceanEnv]:
+    """
+    Args:
+        grid_path: .npz / chunked grid to load; or pass channels (C, H, W) and meta directly
+        weights: per-channel cost weights (default all 1.0)
+        smooth_sigma: Gaussian smoothing of the aggregated cost map
+        patch_size: odd local patch size K
+        start, goal: override the grid meta's start / goal (defaults (0, 0) and (H-1, W-1))
+        cache_dir: CostCache directory; the cost map and fields are read from (or written to)
+            memory-mapped files keyed on the grid contents, weights and smooth_sigma
+        cache_max_bytes: size bound of that cache (LRU eviction)
+        share_memory: publish the cost map and fields once in shared memory; envs attach to
+            them read-only and the factory pickles as segment handles. The cost-to-go fields
+            are then computed here, and the segments live until the factory is garbage
+            collected in this process or it exits
+        precompute_cost_to_go: compute the cost-to-go fields now instead of on first use
+        shaping: None, 'cost_to_go' or 'geodesic' potential-based reward shaping
+        shaping_gamma: discount used by the shaping term
+        observe_channels: also observe the raw channels as 'local_channels' (padded once)
+        channel_layout: 'last' ((K, K, C) patches) or 'first' ((C, K, K))
+        channel_dtype: dtype of the channel observations
+        **env_kwargs: further DynamicOceanEnv arguments (max_steps, obs_mode, pyramid_levels, ...)
+
+    Returns:
+        factory(**overrides) -> DynamicOceanEnv; overrides replace env_kwargs for that env.
+        factory.cost_to_go() returns the goal-rooted (dist, parent_dir) fields of
+        utils.pathfinding.cost_to_go, computed once and shared by every env.
+    """
+    if shaping not in SHAPINGS:
+        raise ValueError(f"unknown shaping {shaping!r}, expected 'cost_to_go' or 'geodesic'")
+    if (grid_path is None) == (channels is None):
+        raise ValueError("pass exactly one of grid_path and channels")
+
+    def load_channels():
+        return load_grid(grid_path) if grid_path is not None else (channels, meta or {})
+
+    def build_cost_map():
+        grid, info = load_channels()
+        cost_map = aggregate_cost(grid, weights or [1.0] * grid.shape[0], smooth_sigma=smooth_sigma)
+        grid_goal = info.get("goal", (grid.shape[1] - 1, grid.shape[2] - 1))
+        return cost_map, tuple(info.get("start", (0, 0))), tuple(grid_goal)
+
+    cache = None
+    if cache_dir:
+        cache = CostCache(cache_dir, max_bytes=cache_max_bytes)
+        grid_key = file_digest(grid_path) if grid_path is not None else channels
+        key = cache.key(grid=grid_key, meta=meta, weights=weights, smooth_sigma=smooth_sigma)
+        info, cost_map = cache.get_meta(key), cache.get(key, "cost_map")
+        if info is None or cost_map is None:
+            cost_map, grid_start, grid_goal = build_cost_map()
+            cost_map = cache.put(key, "cost_map", cost_map)
+            cache.put_meta(key, {"start": grid_start, "goal": grid_goal})
+        else:
+            grid_start, grid_goal = tuple(info["start"]), tuple(info["goal"])
+    else:
+        cost_map, grid_start, grid_goal = build_cost_map()
+    start = grid_start if start is None else tuple(start)
+    goal = grid_goal if goal is None else tuple(goal)
+
+    shared = SharedArrays() if share_memory else None
+    if shared is not None:
+        cost_map = attach(shared.publish("cost_map", cost_map))
+
+    def derived(name, build):
+        # read-only field computed once; shared through the cache / shared memory if enabled
+        if cache is not None:
+            field = cache.get_or_create(key, name, build)
+        else:
+            field = build()
+            field.flags.writeable = False
+        if shared is not None:
+            field = attach(shared.publish(name, field))
+        return field
+
+    pad = patch_size // 2
+    padded_cost = derived(f"padded_{pad}", lambda: np.pad(cost_map, pad_width=pad, mode="edge"))
+
+    padded_channels = None
+    channel_dtype = np.dtype(channel_dtype)
+    if observe_channels:
+        padded_channels = derived(
+            f"channels_{channel_layout}_{channel_dtype.name}_{pad}",
+            lambda: pad_channels(load_channels()[0], patch_size, channel_layout, channel_dtype))
+
+    ctg_cache = {}
+
+    def get_cost_to_go():
+        if "field" not in ctg_cache:
+            computed = []  # one search builds both fields
+
+            def field(i):
+                if not computed:
+                    computed.extend(cost_to_go(cost_map, goal))
+                return computed[i]
+
+            # keyed on the goal too: start / goal overrides are not part of the entry key
+            ctg_cache["field"] = (derived(f"cost_to_go_dist_{goal[0]}_{goal[1]}", lambda: field(0)),
+                                  derived(f"cost_to_go_parent_dir_{goal[0]}_{goal[1]}", lambda: field(1)))
+        return ctg_cache["field"]
+
+    if precompute_cost_to_go:
+        get_cost_to_go()
+
+    if shaping == "cost_to_go":
+        shaping_field = get_cost_to_go()[0]
+    elif shaping == "geodesic":
+        shaping_field = derived(f"geodesic_{goal[0]}_{goal[1]}", lambda: geodesic_distance(cost_map.shape, goal))
+    else:
+        shaping_field = None
+
+    base = dict(cost_map=cost_map, start=start, goal=goal, patch_size=patch_size, shaping_field=shaping_field,
+                shaping_gamma=shaping_gamma, padded_cost=padded_cost, channel_layout=channel_layout,
+                padded_channels=padded_channels, channel_dtype=channel_dtype)
+
+    def env_factory(**overrides):
+        kwargs = {**base, **env_kwargs, **overrides}
+        if kwargs["patch_size"] != patch_size:
+            # the shared padding is for the loader's patch_size; let the env pad its own
+            kwargs["padded_cost"] = None
+            if padded_channels is not None:
+                H, W = cost_map.shape
+                if channel_layout == "last":
+                    kwargs["channels"] = np.moveaxis(padded_channels[pad : pad + H, pad : pad + W], -1, 0)
+                else:
+                    kwargs["channels"] = padded_channels[:, pad : pad + H, pad : pad + W]
+                kwargs["padded_channels"] = None
+        return DynamicOceanEnv(**kwargs)
+
+    if shared is None:
+        env_factory.cost_to_go = get_cost_to_go
+    else:
+        # the owner must not travel with the factory: publish the fields here, so the factory
+        # only holds attached arrays (pickled as handles), and tie the segments to its lifetime
+        fields = get_cost_to_go()
+        env_factory.cost_to_go = lambda: fields
+        weakref.finalize(env_factory, shared.close)
+    return env_factory
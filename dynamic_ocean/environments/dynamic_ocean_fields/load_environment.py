@@ -10,9 +10,8 @@ from typing import Any
 # import verifiers as vf
 
 # import your env constructor
-from dynamic_ocean.envs.dynamic_ocean_env import DynamicOceanEnv
-from dynamic_ocean.utils.data_loader import load_grid
-from dynamic_ocean.envs.cost_functions import aggregate_cost
+from dynamic_ocean.env_factory import make_env_factory
+
 
 def load_environment(*, grid_path: str = "data/sample_grid.npz", weights=None, **kwargs) -> Any:
     """
@@ -20,18 +19,9 @@ def load_environment(*, grid_path: str = "data/sample_grid.npz", weights=None, *
     or an object the Hub can use. The exact type depends on the verifiers API in use.
     For now, return a factory function or a simple object wrapping your DynamicOceanEnv.
     The Hub's stub will guide you; adapt to the verifiers template if it requires vf.Environment.
-    """
-    # 1) load channels + meta
-    channels, meta = load_grid(grid_path)
-    # 2) create the cost_map (use provided weights or defaults)
-    weights = weights or [1.0] * channels.shape[0]
-    cost_map = aggregate_cost(channels, weights, smooth_sigma=kwargs.get("smooth_sigma", 1.0))
-    start = meta.get("start", (0, 0))
-    goal = meta.get("goal", (channels.shape[1] - 1, channels.shape[2] - 1))
 
-    # 3) return a callable or object that constructs your env for each rollout
-    # Simple: return a function that returns a new DynamicOceanEnv instance
-    def env_factory(**env_kwargs):
-        return DynamicOceanEnv(cost_map=cost_map, start=start, goal=goal, **env_kwargs)
-
-    return env_factory
+    kwargs are the options of dynamic_ocean.env_factory.make_env_factory (smooth_sigma,
+    cache_dir, share_memory, shaping, observe_channels, pyramid_levels, ...); the returned
+    factory(**env_kwargs) builds a DynamicOceanEnv over the shared cost map and fields.
+    """
+    return make_env_factory(grid_path=grid_path, weights=weights, **kwargs)
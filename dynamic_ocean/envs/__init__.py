@@ -2,6 +2,9 @@
 """Dynamic Ocean Fields environment package."""
 
 from .dynamic_ocean_env import DynamicOceanEnv
+from .vector_env import VectorDynamicOceanEnv
 from .cost_functions import aggregate_cost, normalize_channel  # exported for convenience
+from .cost_tiling import aggregate_cost_tiled
 
-__all__ = ["DynamicOceanEnv", "aggregate_cost", "normalize_channel"]
+__all__ = ["DynamicOceanEnv", "VectorDynamicOceanEnv", "aggregate_cost", "aggregate_cost_tiled",
+           "normalize_channel"]
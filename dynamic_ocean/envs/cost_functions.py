@@ -2,17 +2,32 @@
 """
 Cost aggregation utilities.
 
+- clip_bounds: the (lo, hi) clip values normalize_channel uses
 - normalize_channel: robust min-max normalization with percentile clipping
+- apply_clip_bounds: the normalization step of normalize_channel with given bounds
 - aggregate_cost: apply per-channel transforms, normalize, weight, and sum
+- CostModel: aggregate_cost with cached per-channel results, for weight sweeps
 """
 
 import numpy as np
 from scipy.ndimage import gaussian_filter
-from typing import Callable, Iterable, List, Optional
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+def clip_bounds(ch: np.ndarray, clip_percentiles: Optional[tuple] = (1, 99)) -> Tuple[float, float]:
+    """(lo, hi) used by normalize_channel; both percentiles come from one partition of `ch`."""
+    if clip_percentiles is not None:
+        lo, hi = np.nanpercentile(ch, clip_percentiles)
+    else:
+        lo, hi = np.nanmin(ch), np.nanmax(ch)
+    return float(lo), float(hi)
 
 
 def normalize_channel(
-    ch: np.ndarray, clip_percentiles: Optional[tuple] = (1, 99)
+    ch: np.ndarray,
+    clip_percentiles: Optional[tuple] = (1, 99),
+    out: Optional[np.ndarray] = None,
+    dtype=float,
 ) -> np.ndarray:
     """
     Normalize channel to [0,1] using robust min-max with percentile clipping.
@@ -20,22 +35,30 @@ def normalize_channel(
     Args:
         ch: 2D array
         clip_percentiles: (low_pct, high_pct) - if None, use min/max
+        out: optional array to write the result into (may be `ch` itself)
+        dtype: result dtype when `out` is None
 
     Returns:
         normalized channel
     """
-    ch = np.asarray(ch, dtype=float)
-    if clip_percentiles is not None:
-        lo = np.nanpercentile(ch, clip_percentiles[0])
-        hi = np.nanpercentile(ch, clip_percentiles[1])
-    else:
-        lo = np.nanmin(ch)
-        hi = np.nanmax(ch)
+    ch = np.asarray(ch, dtype=dtype if out is None else out.dtype)
+    return apply_clip_bounds(ch, clip_bounds(ch, clip_percentiles), out=out)
+
+
+def apply_clip_bounds(ch: np.ndarray, bounds: Tuple[float, float], out: Optional[np.ndarray] = None,
+                      dtype=float) -> np.ndarray:
+    """Map `ch` to [0,1] with precomputed (lo, hi) bounds; a flat channel (lo ~= hi) maps to zeros."""
+    lo, hi = bounds
+    ch = np.asarray(ch, dtype=dtype if out is None else out.dtype)
+    if out is None:
+        out = np.empty_like(ch)
     if np.isclose(hi, lo):
-        return np.zeros_like(ch)
-    norm = (ch - lo) / (hi - lo)
-    norm = np.clip(norm, 0.0, 1.0)
-    return norm
+        out[...] = 0.0
+        return out
+    np.subtract(ch, lo, out=out)
+    out /= hi - lo
+    np.clip(out, 0.0, 1.0, out=out)
+    return out
 
 
 def aggregate_cost(
@@ -43,15 +66,23 @@ def aggregate_cost(
     weights: Iterable[float],
     transforms: Optional[Iterable[Callable[[np.ndarray], np.ndarray]]] = None,
     smooth_sigma: float = 0.0,
+    dtype=float,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Aggregate multi-channel cost into a single 2D cost map.
 
+    Channels are normalized one at a time into a scratch buffer and accumulated into the
+    output in place, so peak memory is the output plus about two (H, W) temporaries
+    instead of C weighted copies.
+
     Args:
         channels: array shaped (C, H, W)
         weights: length-C iterable of non-negative weights
         transforms: optional list of per-channel transform functions
         smooth_sigma: gaussian smoothing sigma to apply at the end (0 => no smoothing)
+        dtype: accumulation and result dtype (np.float32 halves the memory)
+        out: optional (H, W) array to write the result into; its dtype overrides `dtype`
 
     Returns:
         cost_map: 2D array shaped (H, W) normalized to ~[0, sum(weights)]
@@ -61,25 +92,126 @@ def aggregate_cost(
     C, H, W = channels.shape
     weights = list(weights)
     assert len(weights) == C, "weights length must match channel count"
-
-    if transforms is None:
-        transforms = [lambda x: x for _ in range(C)]
-    else:
+    if transforms is not None:
         transforms = list(transforms)
         assert len(transforms) == C
 
-    normed = []
+    if out is None:
+        out = np.zeros((H, W), dtype=dtype)
+    else:
+        assert out.shape == (H, W), "out must be shape (H, W)"
+        out[...] = 0.0
+    scratch = np.empty_like(out)
     for i in range(C):
-        ch = transforms[i](channels[i])
-        chn = normalize_channel(ch)
-        normed.append(chn * weights[i])
+        ch = channels[i] if transforms is None else transforms[i](channels[i])
+        normalize_channel(ch, out=scratch)
+        scratch *= weights[i]
+        out += scratch
+    del scratch
 
-    cost = np.sum(normed, axis=0)
     if smooth_sigma and smooth_sigma > 0.0:
-        cost = gaussian_filter(cost, sigma=smooth_sigma)
+        gaussian_filter(out, sigma=smooth_sigma, output=out)
 
     # optional re-normalize to [0,1] for stability
-    if np.nanmax(cost) > 0:
-        cost = cost / float(np.nanmax(cost))
+    peak = np.nanmax(out)
+    if peak > 0:
+        out /= peak
+
+    return out
+
+
+class CostModel:
+    """
+    aggregate_cost with its per-channel work cached, for weight sweeps and channel refreshes.
+
+    Each channel is transformed, normalized and (if smooth_sigma > 0) smoothed once and
+    kept, together with its clip bounds. Smoothing is linear, so smoothing the channels
+    one by one and summing them equals smoothing the weighted sum:
+        - set_weights: only the weighted re-sum (and the final rescale) is redone
+        - set_channel: only that channel is renormalized and resmoothed
+    The cache costs C * H * W values of `dtype` (np.float32 halves it). Results match
+    aggregate_cost up to floating point rounding.
+
+    Usage:
+        model = CostModel(channels, [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0)
+        for w in sweep:
+            model.set_weights(w)
+            cost_map = model.cost()
+    """
+
+    def __init__(
+        self,
+        channels: np.ndarray,
+        weights: Iterable[float],
+        transforms: Optional[Iterable[Callable[[np.ndarray], np.ndarray]]] = None,
+        smooth_sigma: float = 0.0,
+        clip_percentiles: Optional[tuple] = (1, 99),
+        dtype=float,
+    ):
+        """
+        Args:
+            channels: array shaped (C, H, W)
+            weights: length-C iterable of non-negative weights
+            transforms: optional list of per-channel transform functions
+            smooth_sigma: gaussian smoothing sigma (0 => no smoothing)
+            clip_percentiles: (low_pct, high_pct) per channel - if None, use min/max
+            dtype: dtype of the cached channels and of the cost map
+        """
+        channels = np.asarray(channels)
+        assert channels.ndim == 3, "channels must be shape (C, H, W)"
+        C, H, W = channels.shape
+        self.transforms = list(transforms) if transforms is not None else None
+        if self.transforms is not None:
+            assert len(self.transforms) == C
+        self.smooth_sigma = smooth_sigma
+        self.clip_percentiles = clip_percentiles
+        self._normed = np.empty((C, H, W), dtype=dtype)
+        self.bounds: List[Tuple[float, float]] = [(0.0, 0.0)] * C
+        self.weights = None
+        self._cost = None
+        for i in range(C):
+            self.set_channel(i, channels[i])
+        self.set_weights(weights)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._normed.shape[1:]
+
+    @property
+    def normalized(self) -> np.ndarray:
+        """(C, H, W) normalized (and smoothed) channels, read-only."""
+        view = self._normed.view()
+        view.flags.writeable = False
+        return view
+
+    def set_weights(self, weights: Iterable[float]):
+        weights = np.asarray(list(weights), dtype=float)
+        assert weights.shape == (self._normed.shape[0],), "weights length must match channel count"
+        self.weights = weights
+        self._cost = None
+
+    def set_channel(self, i: int, ch: np.ndarray):
+        """Replace channel i (raw values, before its transform)."""
+        ch = np.asarray(ch)
+        assert ch.shape == self.shape, "channel must be shape (H, W)"
+        if self.transforms is not None:
+            ch = self.transforms[i](ch)
+        ch = np.asarray(ch, dtype=self._normed.dtype)
+        self.bounds[i] = clip_bounds(ch, self.clip_percentiles)
+        out = self._normed[i]
+        apply_clip_bounds(ch, self.bounds[i], out=out)
+        if self.smooth_sigma and self.smooth_sigma > 0.0:
+            gaussian_filter(out, sigma=self.smooth_sigma, output=out)
+        self._cost = None
 
-    return cost
+    def cost(self) -> np.ndarray:
+        """(H, W) cost map for the current weights and channels (cached until they change)."""
+        if self._cost is None:
+            C, H, W = self._normed.shape
+            cost = np.dot(self.weights.astype(self._normed.dtype), self._normed.reshape(C, H * W)).reshape(H, W)
+            # optional re-normalize to [0,1] for stability
+            peak = np.nanmax(cost)
+            if peak > 0:
+                cost /= peak
+            self._cost = cost
+        return self._cost
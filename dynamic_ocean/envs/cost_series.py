@@ -0,0 +1,129 @@
+# envs/cost_series.py
+"""
+Time-varying cost maps for DynamicOceanEnv.
+
+CostSeries wraps a (T, H, W) stack of forecast cost frames without reading it into
+memory. Frames are read one at a time from any array-like that supports frames[i]
+(np.ndarray, np.memmap, zarr/h5py datasets, ...) or from a .npy file opened with
+mmap_mode='r'. Only the current frame and the next `prefetch` frames are resident;
+frames that fall behind are dropped.
+
+Env step s maps to forecast position s / steps_per_frame: frame i = s // steps_per_frame
+and, with interpolate=True, a blend weight alpha = (s % steps_per_frame) / steps_per_frame
+towards frame i + 1. Steps past the last frame keep using the last frame.
+
+The resident frames follow one position in time, so each env needs its own cache:
+DynamicOceanEnv takes a view() of the CostSeries it is given, and envs built from one
+series share its frames but never evict each other's.
+"""
+
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple
+
+
+class CostSeries:
+    ndim = 3
+
+    def __init__(
+        self,
+        frames,
+        steps_per_frame: int = 1,
+        interpolate: bool = False,
+        prefetch: int = 1,
+        dtype=float,
+    ):
+        """
+        Args:
+            frames: (T, H, W) array-like, or path to a .npy file (memory-mapped)
+            steps_per_frame: env steps between consecutive frames (>= 1)
+            interpolate: linearly blend neighbouring frames between frame times
+            prefetch: number of frames after the current one to keep resident
+            dtype: dtype frames are converted to when loaded
+        """
+        if isinstance(frames, (str, Path)):
+            frames = np.load(frames, mmap_mode="r")
+        assert len(frames.shape) == 3, "frames must be shaped (T, H, W)"
+        assert steps_per_frame >= 1, "steps_per_frame must be >= 1"
+        assert prefetch >= 0, "prefetch must be >= 0"
+        self.frames = frames
+        self.n_frames = int(frames.shape[0])
+        self.shape = tuple(int(n) for n in frames.shape)
+        self.steps_per_frame = int(steps_per_frame)
+        self.interpolate = interpolate
+        self.prefetch = int(prefetch)
+        self.dtype = dtype
+        # frame index -> (frame edge-padded by p, p); smaller pads are views of it
+        self._resident = OrderedDict()
+
+    def view(self) -> "CostSeries":
+        """A CostSeries over the same frames (not copied) with its own resident-frame cache."""
+        return CostSeries(self.frames, self.steps_per_frame, self.interpolate, self.prefetch, self.dtype)
+
+    @property
+    def frame_shape(self) -> Tuple[int, int]:
+        return self.shape[1], self.shape[2]
+
+    @property
+    def resident_frames(self):
+        return sorted(self._resident)
+
+    def position(self, step: int) -> Tuple[int, float]:
+        """(frame index, blend weight towards the next frame) at env step `step`."""
+        i, rem = divmod(int(step), self.steps_per_frame)
+        if i >= self.n_frames - 1:
+            return self.n_frames - 1, 0.0
+        alpha = rem / self.steps_per_frame if self.interpolate else 0.0
+        return i, alpha
+
+    def frame(self, i: int, pad: int = 0) -> np.ndarray:
+        """Frame i (edge-padded by `pad` cells), loading it and the prefetch window if needed."""
+        i = min(max(int(i), 0), self.n_frames - 1)
+        self._advance(i, pad)
+        return self._get(i, pad)
+
+    def at(self, step: int, pad: int = 0):
+        """
+        Frames needed at env step `step`: (i, alpha, frame_i, frame_i+1 or None), frames
+        edge-padded by `pad`; the cost is (1 - alpha) * frame_i + alpha * frame_i+1.
+        """
+        i, alpha = self.position(step)
+        cur = self.frame(i, pad)
+        nxt = self._get(i + 1, pad) if alpha != 0.0 else None
+        return i, alpha, cur, nxt
+
+    def get(self, step: int) -> np.ndarray:
+        """(H, W) cost map at env step `step` (blended if interpolating)."""
+        _, alpha, cur, nxt = self.at(step)
+        if nxt is None:
+            return cur
+        return (1.0 - alpha) * cur + alpha * nxt
+
+    def _advance(self, i: int, pad: int):
+        window = range(i, min(i + self.prefetch + (2 if self.interpolate else 1), self.n_frames))
+        for j in list(self._resident):
+            if j not in window:
+                del self._resident[j]
+        for j in window:
+            self._get(j, pad)
+
+    def _get(self, i: int, pad: int) -> np.ndarray:
+        entry = self._resident.get(i)
+        if entry is None or entry[1] < pad:
+            if entry is None:
+                # materialize this frame only (a memmap slice reads just these pages)
+                raw = np.array(self.frames[i], dtype=self.dtype)
+            else:
+                raw = _crop(entry[0], entry[1])
+            entry = (np.pad(raw, pad_width=pad, mode="edge") if pad else raw, pad)
+            self._resident[i] = entry
+        arr, p = entry
+        return _crop(arr, p - pad)
+
+
+def _crop(arr: np.ndarray, n: int) -> np.ndarray:
+    # cropping n cells off an edge-padded frame equals padding the frame n cells less
+    if n == 0:
+        return arr
+    return arr[n : arr.shape[0] - n, n : arr.shape[1] - n]
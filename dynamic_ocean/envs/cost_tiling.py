@@ -0,0 +1,280 @@
+# envs/cost_tiling.py
+"""
+Out-of-core version of aggregate_cost for grids larger than memory.
+
+aggregate_cost_tiled reads the (C, H, W) channels tile by tile (from a np.memmap, a
+.npy path opened with mmap_mode='r', or any array-like supporting channels[i, rows, cols])
+and writes the cost map into a memory-mapped .npy file:
+
+1. statistics: exact per-channel clip percentiles without holding a channel in memory.
+   A min/max pass is followed by histogram passes over the tiles that narrow the bin
+   containing each needed order statistic until it holds at most `max_exact` values,
+   which are then gathered and partitioned. Percentiles are interpolated between order
+   statistics like np.nanpercentile (linear method).
+2. cost: every tile is read with a halo of int(4 * smooth_sigma + 0.5) cells (the
+   gaussian_filter kernel radius), normalized with the global bounds, weighted, summed,
+   smoothed, and its interior written to the output.
+3. the output is divided by its global maximum, tile by tile.
+
+Tiles run in a process pool (workers > 1). Transforms must be elementwise so a tile of
+the transformed channel equals the transform of the tile. The result matches
+aggregate_cost on the same data up to floating point rounding.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+from .cost_functions import apply_clip_bounds
+
+# state of a pool worker (or of the parent process when workers <= 1)
+_worker = {}
+
+
+def _init_worker(channels, transforms, out_path):
+    if isinstance(channels, (str, Path)):
+        channels = np.load(channels, mmap_mode="r")
+    _worker["channels"] = channels
+    _worker["transforms"] = transforms
+    _worker["out_path"] = out_path
+    _worker["out"] = None
+
+
+def _read(i, rows, cols):
+    ch = _worker["channels"][i, rows, cols]
+    transforms = _worker["transforms"]
+    if transforms is not None:
+        ch = transforms[i](ch)
+    return np.asarray(ch, dtype=float)
+
+
+def _in_interval(v, lo, hi, closed):
+    return v[(v >= lo) & ((v <= hi) if closed else (v < hi))]
+
+
+def _tile_minmax(task):
+    rows, cols, C = task
+    out = np.empty((C, 3))
+    for i in range(C):
+        v = _read(i, rows, cols)
+        v = v[~np.isnan(v)]
+        out[i] = (v.min(), v.max(), v.size) if v.size else (np.inf, -np.inf, 0)
+    return out
+
+
+def _bin_index(v, lo, hi, bins):
+    # same bins as np.searchsorted(np.linspace(lo, hi, bins + 1), v, "right") - 1 with the
+    # top edge in the last bin, but computed arithmetically and then settled against the
+    # edges (the estimate is off by at most a bin or so from rounding)
+    edges = np.linspace(lo, hi, bins + 1)
+    idx = ((v - lo) * (bins / (hi - lo))).astype(np.intp)
+    np.clip(idx, 0, bins - 1, out=idx)
+    while True:
+        down = v < edges[idx]
+        up = (v >= edges[idx + 1]) & (idx < bins - 1)
+        if not (down.any() or up.any()):
+            return idx
+        idx -= down
+        idx += up
+
+
+def _tile_query(task):
+    # queries: (channel, lo, hi, closed, kind, bins); kind 'hist' | 'minmax' | 'collect'
+    rows, cols, queries = task
+    data, done, results = {}, {}, []
+    for query in queries:
+        if query in done:
+            results.append(done[query])
+            continue
+        i, lo, hi, closed, kind, bins = query
+        if i not in data:
+            data[i] = _read(i, rows, cols).ravel()
+        v = _in_interval(data[i], lo, hi, closed)
+        if kind == "hist":
+            result = np.bincount(_bin_index(v, lo, hi, bins), minlength=bins)
+        elif kind == "minmax":
+            result = (v.min(), v.max()) if v.size else (np.inf, -np.inf)
+        else:
+            result = v
+        done[query] = result
+        results.append(result)
+    return results
+
+
+def _tile_cost(task):
+    (r0, r1, c0, c1), halo, (H, W), bounds, weights, smooth_sigma, dtype = task
+    if _worker["out"] is None:
+        _worker["out"] = np.load(_worker["out_path"], mmap_mode="r+")
+    # read the tile plus a halo so smoothing near tile edges sees the real neighbours
+    R0, R1, C0, C1 = max(r0 - halo, 0), min(r1 + halo, H), max(c0 - halo, 0), min(c1 + halo, W)
+    rows, cols = slice(R0, R1), slice(C0, C1)
+    acc = np.zeros((R1 - R0, C1 - C0), dtype=dtype)
+    scratch = np.empty_like(acc)
+    for i, w in enumerate(weights):
+        apply_clip_bounds(_read(i, rows, cols), bounds[i], out=scratch)
+        scratch *= w
+        acc += scratch
+    if smooth_sigma and smooth_sigma > 0.0:
+        gaussian_filter(acc, sigma=smooth_sigma, output=acc)
+    tile = acc[r0 - R0 : r1 - R0, c0 - C0 : c1 - C0]
+    _worker["out"][r0:r1, c0:c1] = tile
+    _worker["out"].flush()
+    return np.nanmax(tile) if tile.size else -np.inf
+
+
+def _tile_scale(task):
+    (r0, r1, c0, c1), peak = task
+    if _worker["out"] is None:
+        _worker["out"] = np.load(_worker["out_path"], mmap_mode="r+")
+    _worker["out"][r0:r1, c0:c1] /= peak
+    _worker["out"].flush()
+
+
+def _lerp(a, b, t):
+    # np.percentile's linear interpolation between neighbouring order statistics
+    diff = b - a
+    return b - diff * (1 - t) if t >= 0.5 else a + diff * t
+
+
+def _order_stat_queries(run, tiles, mins, maxs, ranks, bins, max_exact):
+    """Exact k-th smallest value per (channel, rank) pair in `ranks` via histogram narrowing."""
+    # state: [lo, hi, closed, rank within the interval, kind]
+    state = {key: [mins[key[0]], maxs[key[0]], True, key[1], "hist"] for key in ranks}
+    values = {}
+    for key, (lo, hi, _, _, _) in state.items():
+        if lo == hi:
+            values[key] = lo
+    while len(values) < len(state):
+        keys = [k for k in state if k not in values]
+        queries = [(k[0],) + tuple(state[k][:3]) + (state[k][4], bins) for k in keys]
+        partial = run(_tile_query, [(rows, cols, queries) for rows, cols in tiles])
+        for q, key in enumerate(keys):
+            lo, hi, closed, rank, kind = state[key]
+            parts = [p[q] for p in partial]
+            if kind == "hist":
+                counts = np.sum(parts, axis=0)
+                cum = np.cumsum(counts)
+                k = int(np.searchsorted(cum, rank, side="right"))
+                edges = np.linspace(lo, hi, bins + 1)
+                rank -= int(cum[k - 1]) if k > 0 else 0
+                closed = closed and k == bins - 1
+                kind = "collect" if counts[k] <= max_exact else "minmax"
+                state[key] = [edges[k], edges[k + 1], closed, rank, kind]
+            elif kind == "minmax":
+                lo, hi = min(p[0] for p in parts), max(p[1] for p in parts)
+                if lo == hi:
+                    values[key] = lo
+                else:
+                    # same values as before, now as a closed interval that fits them
+                    state[key] = [lo, hi, True, rank, "hist"]
+            else:
+                v = np.concatenate(parts)
+                values[key] = float(np.partition(v, rank)[rank])
+    return values
+
+
+def _percentile_bounds(run, tiles, C, clip_percentiles, bins=4096, max_exact=1 << 20):
+    """Per-channel (lo, hi) clip bounds as normalize_channel would compute them."""
+    stats = np.array(run(_tile_minmax, [(rows, cols, C) for rows, cols in tiles]))
+    mins, maxs, counts = stats[:, :, 0].min(axis=0), stats[:, :, 1].max(axis=0), stats[:, :, 2].sum(axis=0)
+    if clip_percentiles is None:
+        return [(float(mins[i]), float(maxs[i])) if counts[i] else (np.nan, np.nan) for i in range(C)]
+
+    # order statistics needed for each percentile (linear interpolation)
+    wanted, ranks = {}, set()
+    for i in range(C):
+        n = int(counts[i])
+        if n == 0:
+            continue
+        for p in clip_percentiles:
+            virtual = p / 100.0 * (n - 1)
+            j = int(np.floor(virtual))
+            j1 = min(j + 1, n - 1)
+            wanted[i, p] = (j, j1, virtual - j)
+            ranks.update([(i, j), (i, j1)])
+    values = _order_stat_queries(run, tiles, mins, maxs, sorted(ranks), bins, max_exact)
+
+    bounds = []
+    for i in range(C):
+        if counts[i] == 0:
+            bounds.append((np.nan, np.nan))
+            continue
+        lo, hi = (_lerp(values[i, a], values[i, b], t) for a, b, t in (wanted[i, p] for p in clip_percentiles))
+        bounds.append((float(lo), float(hi)))
+    return bounds
+
+
+def aggregate_cost_tiled(
+    channels,
+    weights: Iterable[float],
+    out_path,
+    transforms: Optional[Iterable[Callable[[np.ndarray], np.ndarray]]] = None,
+    smooth_sigma: float = 0.0,
+    clip_percentiles: Optional[tuple] = (1, 99),
+    tile: int = 1024,
+    workers: Optional[int] = None,
+    dtype=float,
+) -> np.ndarray:
+    """
+    Tiled aggregate_cost writing to a memory-mapped .npy file.
+
+    Args:
+        channels: (C, H, W) array-like (e.g. np.memmap) or path to a .npy file
+        weights: length-C iterable of non-negative weights
+        out_path: output .npy path
+        transforms: optional list of elementwise per-channel transform functions
+        smooth_sigma: gaussian smoothing sigma (0 => no smoothing)
+        clip_percentiles: (low_pct, high_pct) per channel - if None, use min/max
+        tile: tile edge length in cells (the halo comes on top)
+        workers: processes in the pool (default os.cpu_count()); <= 1 runs in this process
+        dtype: output dtype
+
+    Returns:
+        cost_map: (H, W) np.memmap of `out_path` (read-only), normalized to [0,1]
+    """
+    src = np.load(channels, mmap_mode="r") if isinstance(channels, (str, Path)) else channels
+    assert len(src.shape) == 3, "channels must be shape (C, H, W)"
+    C, H, W = (int(n) for n in src.shape)
+    weights = list(weights)
+    assert len(weights) == C, "weights length must match channel count"
+    if transforms is not None:
+        transforms = list(transforms)
+        assert len(transforms) == C
+    assert tile >= 1, "tile must be >= 1"
+
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=(H, W))
+    del out
+    halo = int(4.0 * smooth_sigma + 0.5) if smooth_sigma and smooth_sigma > 0.0 else 0
+    boxes = [(r, min(r + tile, H), c, min(c + tile, W)) for r in range(0, H, tile) for c in range(0, W, tile)]
+    tiles = [(slice(r0, r1), slice(c0, c1)) for r0, r1, c0, c1 in boxes]
+
+    workers = os.cpu_count() if workers is None else workers
+    initargs = (channels, transforms, str(out_path))
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+
+        def run(fn, tasks):
+            return list(pool.map(fn, tasks))
+    else:
+        _init_worker(*initargs)
+
+        def run(fn, tasks):
+            return [fn(task) for task in tasks]
+
+    try:
+        bounds = _percentile_bounds(run, tiles, C, clip_percentiles)
+        peaks = run(_tile_cost, [(box, halo, (H, W), bounds, weights, smooth_sigma, dtype) for box in boxes])
+        # optional re-normalize to [0,1] for stability
+        peak = np.nanmax(peaks) if peaks else 0.0
+        if peak > 0:
+            run(_tile_scale, [(box, peak) for box in boxes])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _worker.clear()
+    return np.load(out_path, mmap_mode="r")
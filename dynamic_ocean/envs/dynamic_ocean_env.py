@@ -6,23 +6,68 @@ Observation:
     - 'local_patch' : numpy array shape (C, K, K) where K is patch size
     - 'agent_pos'   : numpy array shape (2,) (row, col)
     - 'goal_pos'    : numpy array shape (2,) (row, col)
+    - 'local_channels' (only with channels=...): the raw (C, H, W) input channels around
+      the agent, (K, K, C) with channel_layout='last' or (C, K, K) with 'first'
+    - 'pyramid' (only with pyramid_levels=L): (L, K, K) coarse cost patches centred on
+      the agent, level l pooled over 2**l x 2**l blocks (see envs.pyramid)
 
 Action space (Discrete(9)):
     0: stay
     1: N, 2: NE, 3: E, 4: SE, 5: S, 6: SW, 7: W, 8: NW
 
+Observation modes (obs_mode):
+    - 'alloc'  : a new obs dict and position arrays on every call (default)
+    - 'view'   : 'local_patch' is a read-only view into the padded cost map; the same
+                 obs dict (with read-only 'agent_pos'/'goal_pos') is returned every step
+    - 'buffer' : values are written into preallocated arrays reused across steps
+    In 'view' and 'buffer' mode an observation is only valid until the next step/reset;
+    copy it if you need to keep it.
+
+Multi-channel observations:
+    channels (e.g. the wave / current / temperature / depth fields that aggregate_cost
+    collapses) are converted to channel_dtype and edge-padded once at construction, in
+    the requested layout ((H+2p, W+2p, C) for 'last', (C, H+2p, W+2p) for 'first'; see
+    pad_channels). Each step then reads one K x K window of that tensor: a copy in
+    'alloc' mode, a read-only strided view in 'view' mode and a copy into a reused buffer
+    in 'buffer' mode, so the cost is O(K^2 C) with no full-map work. float32 (default) or
+    float16 halves or quarters the bytes moved compared with float64. Channels are static;
+    with a time-varying cost_map only 'local_patch' changes over time.
+
+Observation pyramid:
+    pyramid_levels=L adds coarse context to the fine K x K 'local_patch': the mean- or
+    min-pooled (pyramid_pool) levels of cost_map are built and edge-padded once in
+    __init__, and each step copies one K x K window per level (O(L K^2)). The pyramid
+    array is reused between steps in 'view' and 'buffer' mode. Needs a static cost_map.
+
+Time-varying fields:
+    cost_map may also be a (T, H, W) array or an envs.cost_series.CostSeries. Frames are
+    then loaded lazily: step s uses frame s // steps_per_frame (optionally blended with
+    the next one). Observations show the field at the current step and the reward of a
+    step uses the field at the step it departs from. self.cost_map is the current frame.
+
 Reward:
     - negative of the cost of the cell moved into (so agents minimize cumulative cost)
+    - optional potential-based shaping: with a precomputed goal distance field d
+      (e.g. utils.pathfinding.cost_to_go or geodesic_distance) and potential
+      Phi(s) = -d(s), each step adds gamma * Phi(s') - Phi(s); Phi is 0 at the goal.
+      The field is only read, never copied, so one array can back many envs.
 Episode ends:
     - agent reaches goal
     - agent exceeds max_steps
 """
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import gymnasium as gym
 from gymnasium import spaces
 from typing import Tuple, Optional
 
+from .cost_series import CostSeries
+from .pyramid import CostPyramid
+
+OBS_MODES = ("alloc", "view", "buffer")
+CHANNEL_LAYOUTS = ("last", "first")
+
 # 8-neighborhood moves plus stay
 MOVES = {
     0: (0, 0),    # stay
@@ -36,6 +81,58 @@ MOVES = {
     8: (-1, -1),  # NW
 }
 
+# same table as an array, indexed by action: MOVE_DELTAS[a] == MOVES[a]
+MOVE_DELTAS = np.array([MOVES[a] for a in range(len(MOVES))], dtype=int)
+
+
+def pad_channels(channels: np.ndarray, patch_size: int, layout: str = "last", dtype=np.float32) -> np.ndarray:
+    """
+    Edge-pad (C, H, W) channels by patch_size // 2 once, as a contiguous
+    (H+2p, W+2p, C) array for layout='last' or (C, H+2p, W+2p) for 'first'.
+    """
+    assert layout in CHANNEL_LAYOUTS, f"channel_layout must be one of {CHANNEL_LAYOUTS}"
+    channels = np.asarray(channels)
+    assert channels.ndim == 3, "channels must be (C, H, W)"
+    p = patch_size // 2
+    if layout == "last":
+        channels = np.moveaxis(channels, 0, -1)
+        pad_width = ((p, p), (p, p), (0, 0))
+    else:
+        pad_width = ((0, 0), (p, p), (p, p))
+    return np.ascontiguousarray(np.pad(channels.astype(dtype, copy=False), pad_width, mode="edge"))
+
+
+def _channel_windows(padded_channels: np.ndarray, patch_size: int, layout: str) -> np.ndarray:
+    # (H, W, K, K, C) or (H, W, C, K, K) read-only view: [r, c] is the window centred on (r, c)
+    K = patch_size
+    if layout == "last":
+        return np.moveaxis(sliding_window_view(padded_channels, (K, K), axis=(0, 1)), 2, 4)
+    return np.moveaxis(sliding_window_view(padded_channels, (K, K), axis=(1, 2)), 0, 2)
+
+
+def _observation_space(H: int, W: int, patch_size: int, channel_shape: Optional[Tuple[int, ...]] = None,
+                       channel_dtype=np.float32, pyramid_levels: int = 0) -> spaces.Dict:
+    # local_patch: shape (1, K, K), the aggregated cost; raw channels go to local_channels
+    obs_spaces = {
+        "local_patch": spaces.Box(
+            low=0.0, high=float("inf"), shape=(1, patch_size, patch_size), dtype=float
+        ),
+        "agent_pos": spaces.Box(low=0, high=max(H, W), shape=(2,), dtype=int),
+        "goal_pos": spaces.Box(low=0, high=max(H, W), shape=(2,), dtype=int),
+    }
+    if channel_shape is not None:
+        obs_spaces["local_channels"] = spaces.Box(low=-np.inf, high=np.inf, shape=channel_shape, dtype=channel_dtype)
+    if pyramid_levels:
+        obs_spaces["pyramid"] = spaces.Box(
+            low=0.0, high=float("inf"), shape=(pyramid_levels, patch_size, patch_size), dtype=float
+        )
+    return spaces.Dict(obs_spaces)
+
+
+def _channel_shape(num_channels: int, patch_size: int, layout: str) -> Tuple[int, int, int]:
+    K = patch_size
+    return (K, K, num_channels) if layout == "last" else (num_channels, K, K)
+
 
 class DynamicOceanEnv(gym.Env):
     metadata = {"render.modes": ["human"]}
@@ -47,37 +144,89 @@ class DynamicOceanEnv(gym.Env):
         goal: Tuple[int, int],
         patch_size: int = 3,
         max_steps: Optional[int] = None,
+        obs_mode: str = "alloc",
+        shaping_field: Optional[np.ndarray] = None,
+        shaping_gamma: float = 0.99,
+        padded_cost: Optional[np.ndarray] = None,
+        channels: Optional[np.ndarray] = None,
+        channel_layout: str = "last",
+        channel_dtype=np.float32,
+        padded_channels: Optional[np.ndarray] = None,
+        pyramid_levels: int = 0,
+        pyramid_pool: str = "mean",
     ):
         """
         Args:
-            cost_map: 2D numpy array of shape (H, W) with normalized cell costs (float).
+            cost_map: 2D numpy array of shape (H, W) with normalized cell costs (float),
+                or a (T, H, W) array / CostSeries of cost frames over time
             start: (row, col)
             goal: (row, col)
             patch_size: size of square local observation patch (odd integer, default 3)
             max_steps: maximum allowed steps in episode (defaults to H*W*2)
+            obs_mode: 'alloc', 'view' or 'buffer' (see module docstring)
+            shaping_field: optional (H, W) finite goal distance field enabling reward shaping
+            shaping_gamma: discount gamma used in the shaping term
+            padded_cost: optional precomputed np.pad(cost_map, patch_size // 2, mode="edge")
+                (e.g. a shared read-only memmap); used as-is instead of padding a copy
+            channels: optional (C, H, W) raw channels observed as 'local_channels'
+            channel_layout: 'last' ((K, K, C) patches) or 'first' ((C, K, K) patches)
+            channel_dtype: dtype of the channel observations (e.g. np.float32, np.float16)
+            padded_channels: optional precomputed pad_channels(channels, patch_size,
+                channel_layout, channel_dtype) (e.g. shared); used instead of channels
+            pyramid_levels: number of coarse levels L observed as 'pyramid' (0 = none)
+            pyramid_pool: 'mean' or 'min' pooling of the pyramid levels
         """
-        assert cost_map.ndim == 2, "cost_map must be 2D"
         assert patch_size % 2 == 1 and patch_size >= 1, "patch_size must be odd >=1"
+        assert obs_mode in OBS_MODES, f"obs_mode must be one of {OBS_MODES}"
 
-        self.cost_map = cost_map.astype(float)
-        self.H, self.W = self.cost_map.shape
+        self.cost_series = None
+        if isinstance(cost_map, CostSeries) or cost_map.ndim == 3:
+            # a view: envs given the same series must not share (and evict) its resident frames
+            self.cost_series = cost_map.view() if isinstance(cost_map, CostSeries) else CostSeries(cost_map)
+            self.H, self.W = self.cost_series.frame_shape
+        else:
+            assert cost_map.ndim == 2, "cost_map must be 2D"
+            # float64 maps (including read-only memmaps) are referenced, not copied
+            self.cost_map = np.asarray(cost_map, dtype=float)
+            self.H, self.W = self.cost_map.shape
         self.start = tuple(start)
         self.goal = tuple(goal)
         self.patch_size = patch_size
         self.pad = patch_size // 2
         self.max_steps = max_steps or (self.H * self.W * 2)
+        self.obs_mode = obs_mode
+        self.shaping_gamma = float(shaping_gamma)
+        self.shaping_field = None
+        if shaping_field is not None:
+            self.shaping_field = np.asarray(shaping_field, dtype=float)
+            assert self.shaping_field.shape == (self.H, self.W), "shaping_field must match cost_map shape"
+
+        self.channel_layout = channel_layout
+        self._channel_windows = None
+        channel_shape = None
+        if channels is not None or padded_channels is not None:
+            if padded_channels is None:
+                assert np.shape(channels)[1:] == (self.H, self.W), "channels must be (C, H, W) matching cost_map"
+                padded_channels = pad_channels(channels, patch_size, channel_layout, channel_dtype)
+            else:
+                assert channel_layout in CHANNEL_LAYOUTS, f"channel_layout must be one of {CHANNEL_LAYOUTS}"
+            spatial = padded_channels.shape[:2] if channel_layout == "last" else padded_channels.shape[1:]
+            assert spatial == (self.H + 2 * self.pad, self.W + 2 * self.pad), \
+                "padded_channels must be channels padded by patch_size // 2"
+            self._padded_channels = padded_channels
+            self._channel_windows = _channel_windows(padded_channels, patch_size, channel_layout)
+            num_channels = padded_channels.shape[2 if channel_layout == "last" else 0]
+            channel_shape = _channel_shape(num_channels, patch_size, channel_layout)
+            channel_dtype = padded_channels.dtype
+
+        self.pyramid = None
+        if pyramid_levels:
+            assert self.cost_series is None, "pyramid observations need a static 2D cost_map"
+            self.pyramid = CostPyramid(self.cost_map, pyramid_levels, patch_size, pyramid_pool)
 
         # observation spaces
-        # local_patch: shape (1, K, K) for now (single-channel cost); can be extended
-        self.observation_space = spaces.Dict(
-            {
-                "local_patch": spaces.Box(
-                    low=0.0, high=float("inf"), shape=(1, patch_size, patch_size), dtype=float
-                ),
-                "agent_pos": spaces.Box(low=0, high=max(self.H, self.W), shape=(2,), dtype=int),
-                "goal_pos": spaces.Box(low=0, high=max(self.H, self.W), shape=(2,), dtype=int),
-            }
-        )
+        self.observation_space = _observation_space(self.H, self.W, patch_size, channel_shape, channel_dtype,
+                                                    pyramid_levels)
 
         # action space: 9 discrete actions
         self.action_space = spaces.Discrete(len(MOVES))
@@ -85,14 +234,75 @@ class DynamicOceanEnv(gym.Env):
         # internal state
         self.agent_pos = None
         self.step_count = None
-        self._padded_cost = np.pad(self.cost_map, pad_width=self.pad, mode="edge")
         self.last_reward = 0.0
+        # windows of the next frame while blending two forecast frames, else None
+        self._next_windows = None
+        if self.cost_series is None:
+            if padded_cost is None:
+                padded_cost = np.pad(self.cost_map, pad_width=self.pad, mode="edge")
+            else:
+                padded_cost = np.asarray(padded_cost, dtype=float)
+                assert padded_cost.shape == (self.H + 2 * self.pad, self.W + 2 * self.pad), \
+                    "padded_cost must be cost_map padded by patch_size // 2"
+            self._set_padded_cost(padded_cost)
+        else:
+            self._frame = None
+            self._sync_frame(0)
+        self._init_obs_buffers()
+
+    def _set_padded_cost(self, padded: np.ndarray):
+        self._padded_cost = padded
+        # (H, W, K, K) read-only view: window [r, c] is the patch centred on cell (r, c)
+        self._patch_windows = sliding_window_view(padded, (self.patch_size, self.patch_size))
+
+    def _sync_frame(self, step: int):
+        # point the padded map / windows at the frame(s) for `step`
+        i, self._alpha, cur, nxt = self.cost_series.at(step, self.pad)
+        if i != self._frame:
+            self._frame = i
+            self._set_padded_cost(cur)
+            self.cost_map = cur[self.pad : self.pad + self.H, self.pad : self.pad + self.W]
+        self._next_windows = None
+        if nxt is not None:
+            self._next_padded = nxt
+            self._next_windows = sliding_window_view(nxt, (self.patch_size, self.patch_size))
+
+    def _series_cell_cost(self, r: int, c: int) -> float:
+        r_p = r + self.pad
+        c_p = c + self.pad
+        v = float(self._padded_cost[r_p, c_p])
+        if self._next_windows is not None:
+            v = (1.0 - self._alpha) * v + self._alpha * float(self._next_padded[r_p, c_p])
+        return v
+
+    def _init_obs_buffers(self):
+        if self.obs_mode == "alloc":
+            self._obs = None
+            return
+        self._agent_pos_buf = np.zeros(2, dtype=int)
+        goal_pos = np.array(self.goal, dtype=int)
+        if self.obs_mode == "view":
+            agent_pos = self._agent_pos_buf.view()
+            agent_pos.flags.writeable = False
+            goal_pos.flags.writeable = False
+            patch = None
+        else:
+            agent_pos = self._agent_pos_buf
+            patch = np.empty((1, self.patch_size, self.patch_size), dtype=float)
+        self._obs = {"local_patch": patch, "agent_pos": agent_pos, "goal_pos": goal_pos}
+        if self._channel_windows is not None:
+            space = self.observation_space["local_channels"]
+            self._obs["local_channels"] = None if self.obs_mode == "view" else np.empty(space.shape, space.dtype)
+        if self.pyramid is not None:
+            self._obs["pyramid"] = np.empty(self.pyramid.shape)
 
     def reset(self, seed: Optional[int] = None, options: dict = None):
         super().reset(seed=seed)
         self.agent_pos = np.array(self.start, dtype=int)
         self.step_count = 0
         self.last_reward = 0.0
+        if self.cost_series is not None:
+            self._sync_frame(0)
         obs = self._get_obs()
         info = {"start": self.start, "goal": self.goal}
         return obs, info
@@ -100,25 +310,41 @@ class DynamicOceanEnv(gym.Env):
     def step(self, action):
         assert self.action_space.contains(action), f"Invalid action {action}"
         dr, dc = MOVES[int(action)]
-        nr = int(self.agent_pos[0] + dr)
-        nc = int(self.agent_pos[1] + dc)
+        r = int(self.agent_pos[0])
+        c = int(self.agent_pos[1])
+        nr = r + dr
+        nc = c + dc
 
         # clip to grid boundaries
-        nr = int(np.clip(nr, 0, self.H - 1))
-        nc = int(np.clip(nc, 0, self.W - 1))
+        nr = min(max(nr, 0), self.H - 1)
+        nc = min(max(nc, 0), self.W - 1)
 
-        # move agent
-        self.agent_pos = np.array([nr, nc], dtype=int)
-        self.step_count += 1
+        # move agent (in place; reset() allocates a fresh position array)
+        self.agent_pos[0] = nr
+        self.agent_pos[1] = nc
 
-        # reward is negative cost of the entered cell
-        cell_cost = float(self.cost_map[nr, nc])
+        # reward is negative cost of the entered cell (at the departure step)
+        if self.cost_series is None:
+            cell_cost = float(self.cost_map[nr, nc])
+        else:
+            cell_cost = self._series_cell_cost(nr, nc)
         reward = -cell_cost
-        self.last_reward = reward
+        self.step_count += 1
+        if self.cost_series is not None:
+            self._sync_frame(self.step_count)
 
         done = False
         info = {"cell_cost": cell_cost}
-        if (nr, nc) == tuple(self.goal):
+        at_goal = (nr, nc) == self.goal
+        if self.shaping_field is not None:
+            # gamma * Phi(s') - Phi(s) with Phi = -distance, Phi(goal) = 0
+            next_dist = 0.0 if at_goal else float(self.shaping_field[nr, nc])
+            shaping = float(self.shaping_field[r, c]) - self.shaping_gamma * next_dist
+            reward += shaping
+            info["shaping"] = shaping
+        self.last_reward = reward
+
+        if at_goal:
             done = True
             info["success"] = True
         elif self.step_count >= self.max_steps:
@@ -129,19 +355,59 @@ class DynamicOceanEnv(gym.Env):
         return obs, reward, done, False, info
 
     def _get_obs(self):
+        if self._obs is not None:
+            return self._get_obs_reused()
         r, c = tuple(self.agent_pos)
         # extract patch from padded cost map
         r_p = r + self.pad
         c_p = c + self.pad
         patch = self._padded_cost[r_p - self.pad : r_p + self.pad + 1, c_p - self.pad : c_p + self.pad + 1]
         patch = np.asarray(patch, dtype=float).reshape((1, self.patch_size, self.patch_size))
+        if self._next_windows is not None:
+            patch = self._blended_patch(r, c)[None]
         obs = {
             "local_patch": patch,
             "agent_pos": np.array(self.agent_pos, dtype=int),
             "goal_pos": np.array(self.goal, dtype=int),
         }
+        if self._channel_windows is not None:
+            obs["local_channels"] = self._channel_windows[r, c].copy()
+        if self.pyramid is not None:
+            obs["pyramid"] = self.pyramid.patch(r, c)
+        return obs
+
+    def _get_obs_reused(self):
+        r = int(self.agent_pos[0])
+        c = int(self.agent_pos[1])
+        obs = self._obs
+        self._agent_pos_buf[0] = r
+        self._agent_pos_buf[1] = c
+        if self._next_windows is not None:
+            # between two forecast frames the patch has to be computed
+            if self.obs_mode == "view":
+                obs["local_patch"] = self._blended_patch(r, c)[None]
+            else:
+                self._blended_patch(r, c, out=obs["local_patch"][0])
+        elif self.obs_mode == "view":
+            # (1, K, K) window centred on (r, c); no data is copied
+            obs["local_patch"] = self._patch_windows[r, c : c + 1]
+        else:
+            np.copyto(obs["local_patch"][0], self._patch_windows[r, c])
+        if self._channel_windows is not None:
+            if self.obs_mode == "view":
+                obs["local_channels"] = self._channel_windows[r, c]
+            else:
+                np.copyto(obs["local_channels"], self._channel_windows[r, c])
+        if self.pyramid is not None:
+            self.pyramid.patch(r, c, out=obs["pyramid"])
         return obs
 
+    def _blended_patch(self, r: int, c: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        a = self._alpha
+        out = np.multiply(self._patch_windows[r, c], 1.0 - a, out=out)
+        out += a * self._next_windows[r, c]
+        return out
+
     def render(self, mode="human"):
         # Minimal textual render — users should use utils.visualization for plots
         print(f"Step {self.step_count} | Agent: {tuple(self.agent_pos)} | Last reward: {self.last_reward:.4f}")
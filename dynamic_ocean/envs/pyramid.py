@@ -0,0 +1,89 @@
+# envs/pyramid.py
+"""
+Multi-scale cost pyramid for egocentric coarse-context observations.
+
+Level l (1..L) downsamples the cost map by 2**l: cell (i, j) pools the block
+cost_map[i*2**l : (i+1)*2**l, j*2**l : (j+1)*2**l] (blocks on the bottom / right edge
+may be partial), by mean or by min. Each level is edge-padded by patch_size // 2 once,
+so the K x K window centred on the agent's coarse cell (r >> l, c >> l) is a plain
+slice. A K x K patch at level l covers K * 2**l cells per side of the full map, so L
+levels give lookahead growing like 2**L for L * K^2 observation values.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PYRAMID_POOLS = ("mean", "min")
+
+
+def _pool2(a: np.ndarray, fill: float, reduce) -> np.ndarray:
+    # 2 x 2 blocks; odd trailing rows / columns are padded with `fill`
+    H, W = a.shape
+    if H % 2 or W % 2:
+        a = np.pad(a, ((0, H % 2), (0, W % 2)), constant_values=fill)
+    return reduce(a.reshape(a.shape[0] // 2, 2, a.shape[1] // 2, 2), axis=(1, 3))
+
+
+def build_pyramid(cost_map: np.ndarray, levels: int, pool: str = "mean") -> List[np.ndarray]:
+    """[level 1, ..., level L] of cost_map, level l of shape (ceil(H / 2**l), ceil(W / 2**l))."""
+    assert pool in PYRAMID_POOLS, f"pool must be one of {PYRAMID_POOLS}"
+    out = []
+    if pool == "min":
+        level = np.asarray(cost_map, dtype=float)
+        for _ in range(levels):
+            level = _pool2(level, np.inf, np.min)
+            out.append(level)
+        return out
+    # pool sums and cell counts, so partial edge blocks are averaged over their real cells
+    total = np.asarray(cost_map, dtype=float)
+    count = np.ones(total.shape)
+    for _ in range(levels):
+        total = _pool2(total, 0.0, np.sum)
+        count = _pool2(count, 0.0, np.sum)
+        out.append(total / count)
+    return out
+
+
+class CostPyramid:
+    def __init__(self, cost_map: np.ndarray, levels: int, patch_size: int, pool: str = "mean"):
+        """
+        Args:
+            cost_map: 2D array (H, W)
+            levels: number of coarse levels L (>= 1)
+            patch_size: odd window size K
+            pool: 'mean' or 'min'
+        """
+        assert levels >= 1, "levels must be >= 1"
+        self.levels = build_pyramid(cost_map, levels, pool)
+        self.patch_size = K = patch_size
+        pad = patch_size // 2
+        padded = [np.pad(level, pad, mode="edge") for level in self.levels]
+        # (Hl, Wl, K, K) read-only views: window [i, j] is centred on coarse cell (i, j)
+        self._windows = [sliding_window_view(p, (K, K)) for p in padded]
+        self._shifts = np.arange(1, levels + 1)
+        # all padded levels in one flat array for batched gathers: window (l, i, j) starts at
+        # offsets[l] + i * widths[l] + j and its cell (di, dj) is `_rel[l, di, dj]` further on
+        self._flat = np.concatenate([p.ravel() for p in padded])
+        self._widths = np.array([p.shape[1] for p in padded])
+        self._offsets = np.cumsum([0] + [p.size for p in padded[:-1]])
+        offsets = np.arange(K)
+        self._rel = offsets[None, :, None] * self._widths[:, None, None] + offsets[None, None, :]
+
+    @property
+    def shape(self):
+        return (len(self.levels), self.patch_size, self.patch_size)
+
+    def patch(self, r: int, c: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """(L, K, K) windows centred on full-map cell (r, c), written into `out` if given."""
+        if out is None:
+            out = np.empty(self.shape)
+        for l, windows in enumerate(self._windows, start=1):
+            out[l - 1] = windows[r >> l, c >> l]
+        return out
+
+    def gather(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """(N, L, K, K) windows centred on cells (rows[i], cols[i]), one fancy index for all."""
+        start = self._offsets + (rows[:, None] >> self._shifts) * self._widths + (cols[:, None] >> self._shifts)
+        return self._flat[start[:, :, None, None] + self._rel]
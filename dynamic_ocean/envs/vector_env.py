@@ -0,0 +1,212 @@
+# envs/vector_env.py
+"""
+Batched version of DynamicOceanEnv: N ships on one cost map, stepped with array ops.
+
+State is kept as arrays instead of one Python env per ship:
+    - agent_pos  : (N, 2) int
+    - step_count : (N,) int
+    - terminated : (N,) bool (done flags of the last step)
+
+Observations are the single-env observations stacked along a leading axis
+('local_patch' (N, 1, K, K), 'agent_pos' (N, 2), 'goal_pos' (N, 2), and with channels
+'local_channels' (N, K, K, C) or (N, C, K, K)). Channel windows are gathered from the
+tensor padded once at construction (see DynamicOceanEnv), O(N K^2 C) per step; with
+pyramid_levels=L, 'pyramid' (N, L, K, K) is gathered from all levels with one index.
+
+Transitions, rewards and auto-reset follow gymnasium.vector.SyncVectorEnv wrapped
+around DynamicOceanEnv, so both produce the same trajectories for the same actions:
+a ship that finishes is reset to its start straight away, its last observation and
+info go to infos["final_observation"] / infos["final_info"].
+Potential-based reward shaping (shaping_field / shaping_gamma) works as in DynamicOceanEnv;
+time-varying cost series are not supported here.
+"""
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv
+from typing import Optional
+
+from .dynamic_ocean_env import (MOVES, MOVE_DELTAS, CHANNEL_LAYOUTS, _channel_shape, _channel_windows,
+                                _observation_space, pad_channels)
+from .pyramid import CostPyramid
+
+
+class VectorDynamicOceanEnv(VectorEnv):
+    metadata = {"render.modes": []}
+
+    def __init__(
+        self,
+        cost_map: np.ndarray,
+        start,
+        goal,
+        num_envs: int,
+        patch_size: int = 3,
+        max_steps: Optional[int] = None,
+        shaping_field: Optional[np.ndarray] = None,
+        shaping_gamma: float = 0.99,
+        channels: Optional[np.ndarray] = None,
+        channel_layout: str = "last",
+        channel_dtype=np.float32,
+        pyramid_levels: int = 0,
+        pyramid_pool: str = "mean",
+    ):
+        """
+        Args:
+            cost_map: 2D numpy array of shape (H, W) with normalized cell costs (float).
+            start: (row, col) shared by all ships, or (N, 2) array of per-ship starts
+            goal: (row, col) shared by all ships, or (N, 2) array of per-ship goals
+            num_envs: number of ships N
+            patch_size: size of square local observation patch (odd integer, default 3)
+            max_steps: maximum allowed steps in episode (defaults to H*W*2)
+            shaping_field: optional (H, W) finite goal distance field enabling reward shaping
+            shaping_gamma: discount gamma used in the shaping term
+            channels: optional (C, H, W) raw channels observed as 'local_channels'
+            channel_layout: 'last' ((K, K, C) patches) or 'first' ((C, K, K) patches)
+            channel_dtype: dtype of the channel observations (e.g. np.float32, np.float16)
+            pyramid_levels: number of coarse levels L observed as 'pyramid' (0 = none)
+            pyramid_pool: 'mean' or 'min' pooling of the pyramid levels
+        """
+        assert cost_map.ndim == 2, "cost_map must be 2D"
+        assert patch_size % 2 == 1 and patch_size >= 1, "patch_size must be odd >=1"
+        assert num_envs >= 1, "num_envs must be >= 1"
+
+        self.cost_map = cost_map.astype(float)
+        self.H, self.W = self.cost_map.shape
+        self.start = np.broadcast_to(np.asarray(start, dtype=int), (num_envs, 2)).copy()
+        self.goal = np.broadcast_to(np.asarray(goal, dtype=int), (num_envs, 2)).copy()
+        self.patch_size = patch_size
+        self.pad = patch_size // 2
+        self.max_steps = max_steps or (self.H * self.W * 2)
+        self.shaping_gamma = float(shaping_gamma)
+        self.shaping_field = None
+        if shaping_field is not None:
+            self.shaping_field = np.asarray(shaping_field, dtype=float)
+            assert self.shaping_field.shape == self.cost_map.shape, "shaping_field must match cost_map shape"
+
+        self._channel_windows = None
+        channel_shape = None
+        if channels is not None:
+            assert channel_layout in CHANNEL_LAYOUTS, f"channel_layout must be one of {CHANNEL_LAYOUTS}"
+            assert np.shape(channels)[1:] == (self.H, self.W), "channels must be (C, H, W) matching cost_map"
+            self._padded_channels = pad_channels(channels, patch_size, channel_layout, channel_dtype)
+            self._channel_windows = _channel_windows(self._padded_channels, patch_size, channel_layout)
+            channel_shape = _channel_shape(len(channels), patch_size, channel_layout)
+        self.pyramid = CostPyramid(self.cost_map, pyramid_levels, patch_size, pyramid_pool) if pyramid_levels else None
+
+        super().__init__(
+            num_envs=num_envs,
+            observation_space=_observation_space(self.H, self.W, patch_size, channel_shape, channel_dtype,
+                                                 pyramid_levels),
+            action_space=spaces.Discrete(len(MOVES)),
+        )
+
+        # internal state
+        self.agent_pos = self.start.copy()
+        self.step_count = np.zeros(num_envs, dtype=int)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self._truncated = np.zeros(num_envs, dtype=bool)
+        self._actions = None
+        self._max_pos = np.array([self.H - 1, self.W - 1], dtype=int)
+        self._padded_cost = np.pad(self.cost_map, pad_width=self.pad, mode="edge")
+        self._patch_offsets = np.arange(patch_size)
+
+    def reset_wait(self, seed=None, options: dict = None):
+        # dynamics are deterministic; the seed only seeds the (batched) action space
+        if seed is not None:
+            self.action_space.seed(seed if isinstance(seed, int) else int(seed[0]))
+        self.agent_pos[:] = self.start
+        self.step_count[:] = 0
+        self.terminated[:] = False
+        infos = {}
+        self._add_reset_info(infos, np.arange(self.num_envs))
+        return self._get_obs(), infos
+
+    def step_async(self, actions):
+        actions = np.asarray(actions, dtype=int).reshape(self.num_envs)
+        assert ((actions >= 0) & (actions < len(MOVES))).all(), f"Invalid actions {actions}"
+        self._actions = actions
+
+    def step_wait(self):
+        pos = self.agent_pos
+        if self.shaping_field is not None:
+            prev_dist = self.shaping_field[pos[:, 0], pos[:, 1]]
+        # move all ships at once and clip to grid boundaries
+        pos += MOVE_DELTAS[self._actions]
+        np.clip(pos, 0, self._max_pos, out=pos)
+        self.step_count += 1
+
+        # reward is negative cost of the entered cell
+        cell_cost = self.cost_map[pos[:, 0], pos[:, 1]]
+        rewards = -cell_cost
+
+        success = (pos == self.goal).all(axis=1)
+        terminated = success | (self.step_count >= self.max_steps)
+        self.terminated = terminated
+
+        infos = {"cell_cost": cell_cost, "_cell_cost": ~terminated}
+        shaping = None
+        if self.shaping_field is not None:
+            # gamma * Phi(s') - Phi(s) with Phi = -distance, Phi(goal) = 0
+            next_dist = self.shaping_field[pos[:, 0], pos[:, 1]]
+            next_dist[success] = 0.0
+            shaping = prev_dist - self.shaping_gamma * next_dist
+            rewards += shaping
+            infos["shaping"], infos["_shaping"] = shaping, ~terminated
+        if terminated.any():
+            done_idx = np.flatnonzero(terminated)
+            self._add_final_info(infos, done_idx, cell_cost, success, shaping)
+            # auto-reset finished ships
+            pos[done_idx] = self.start[done_idx]
+            self.step_count[done_idx] = 0
+            self._add_reset_info(infos, done_idx)
+
+        return self._get_obs(), rewards, terminated, self._truncated.copy(), infos
+
+    def _get_obs(self, idx: Optional[np.ndarray] = None):
+        pos = self.agent_pos if idx is None else self.agent_pos[idx]
+        goal = self.goal if idx is None else self.goal[idx]
+        # patch of ship i covers padded rows r_i .. r_i + K - 1 (same for columns)
+        rows = pos[:, 0, None] + self._patch_offsets
+        cols = pos[:, 1, None] + self._patch_offsets
+        patch = self._padded_cost[rows[:, :, None], cols[:, None, :]]
+        obs = {
+            "local_patch": patch[:, None],
+            "agent_pos": pos.copy(),
+            "goal_pos": goal.copy(),
+        }
+        if self._channel_windows is not None:
+            obs["local_channels"] = self._channel_windows[pos[:, 0], pos[:, 1]]
+        if self.pyramid is not None:
+            obs["pyramid"] = self.pyramid.gather(pos[:, 0], pos[:, 1])
+        return obs
+
+    def _add_final_info(self, infos: dict, done_idx: np.ndarray, cell_cost: np.ndarray, success: np.ndarray,
+                        shaping: Optional[np.ndarray] = None):
+        final_obs = self._get_obs(done_idx)
+        final_observation = np.full(self.num_envs, None, dtype=object)
+        final_info = np.full(self.num_envs, None, dtype=object)
+        for j, i in enumerate(done_idx):
+            final_observation[i] = {k: v[j] for k, v in final_obs.items()}
+            final_info[i] = {"cell_cost": float(cell_cost[i]), "success": bool(success[i])}
+            if shaping is not None:
+                final_info[i]["shaping"] = float(shaping[i])
+        mask = np.zeros(self.num_envs, dtype=bool)
+        mask[done_idx] = True
+        infos["final_observation"], infos["_final_observation"] = final_observation, mask
+        infos["final_info"], infos["_final_info"] = final_info, mask.copy()
+
+    def _add_reset_info(self, infos: dict, idx: np.ndarray):
+        mask = np.zeros(self.num_envs, dtype=bool)
+        mask[idx] = True
+        for key, value in (("start", self.start), ("goal", self.goal)):
+            arr = np.full(self.num_envs, None, dtype=object)
+            for i in idx:
+                arr[i] = tuple(int(v) for v in value[i])
+            infos[key], infos[f"_{key}"] = arr, mask.copy()
+
+    def render(self, mode="human"):
+        for i in range(self.num_envs):
+            print(f"Ship {i} | Step {self.step_count[i]} | Agent: {tuple(self.agent_pos[i])}")
+
+    def close_extras(self, **kwargs):
+        pass
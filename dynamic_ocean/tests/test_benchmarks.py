@@ -0,0 +1,28 @@
+import copy
+import json
+
+from benchmarks import suite
+
+
+def test_suite_results_and_regression_gate(tmp_path):
+    data = suite.run([16], patch_sizes=[3], channel_counts=[2], steps=20, repeat=1)
+    names = {r["name"] for r in data["results"]}
+    assert names == {"env_step", "astar_grid", "dijkstra_grid", "aggregate_cost", "load_grid"}
+    assert all(r["value"] >= 0 and r["better"] in ("higher", "lower") for r in data["results"])
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(data))
+    same = tmp_path / "same.json"
+    same.write_text(json.dumps(data))
+    assert suite.main(["compare", str(baseline), str(same)]) == 0
+
+    slower = copy.deepcopy(data)
+    for r in slower["results"]:
+        if r["name"] == "env_step":
+            r["value"] *= 0.5  # half the steps/sec
+    _, regressions = suite.compare(data, slower, threshold=0.2)
+    assert regressions and all(r["name"] == "env_step" for r, _, _ in regressions)
+    worse = tmp_path / "worse.json"
+    worse.write_text(json.dumps(slower))
+    assert suite.main(["compare", str(baseline), str(worse), "--threshold", "0.2"]) == 1
+    assert suite.main(["compare", str(baseline), str(worse), "--threshold", "0.6"]) == 0
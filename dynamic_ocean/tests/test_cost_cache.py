@@ -0,0 +1,62 @@
+import os
+import time
+
+import numpy as np
+from utils import cost_cache
+from utils.cost_cache import CostCache, file_digest
+
+
+def test_key_covers_contents_and_params(tmp_path):
+    a = np.arange(12.0).reshape(3, 4)
+    key = CostCache.key(grid=a, weights=[1.0, 0.5], smooth_sigma=1.0, transforms=[np.log1p])
+    assert key == CostCache.key(grid=a.copy(), weights=(1.0, 0.5), smooth_sigma=1.0, transforms=[np.log1p])
+    b = a.copy()
+    b[1, 1] += 1e-9
+    assert key != CostCache.key(grid=b, weights=[1.0, 0.5], smooth_sigma=1.0, transforms=[np.log1p])
+    assert key != CostCache.key(grid=a, weights=[1.0, 0.5], smooth_sigma=2.0, transforms=[np.log1p])
+    assert CostCache.key(t=lambda x: x * 2) != CostCache.key(t=lambda x: x * 3)
+
+    path = tmp_path / "g.npy"
+    np.save(path, a)
+    digest = file_digest(path)
+    np.save(path, b)
+    assert file_digest(path) != digest
+
+
+def test_key_is_salted_with_the_cache_format(monkeypatch):
+    key = CostCache.key(grid="abc", smooth_sigma=1.0)
+    monkeypatch.setattr(cost_cache, "CACHE_FORMAT", "dynamic_ocean.cost_cache/0")
+    assert CostCache.key(grid="abc", smooth_sigma=1.0) != key
+
+
+def test_get_or_create_returns_shared_memmap(tmp_path):
+    cache = CostCache(tmp_path)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return np.ones((5, 6))
+
+    first = cache.get_or_create("k", "cost_map", build)
+    second = CostCache(tmp_path).get_or_create("k", "cost_map", build)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap) and not second.flags.writeable
+    np.testing.assert_array_equal(first, second)
+
+
+def test_lru_eviction(tmp_path):
+    cache = CostCache(tmp_path, max_entries=2)
+    cache.put("a", "x", np.zeros(10))
+    cache.put("b", "x", np.zeros(10))
+    # make "a" the most recently used, then add a third entry
+    past = time.time() - 100
+    os.utime(tmp_path / "b", (past, past))
+    os.utime(tmp_path / "a", (past + 50, past + 50))
+    cache.put("c", "x", np.zeros(10))
+    assert cache.get("b", "x") is None
+    assert cache.get("a", "x") is not None and cache.get("c", "x") is not None
+
+    small = CostCache(tmp_path / "small", max_bytes=1000)
+    small.put("a", "x", np.zeros(100))  # ~928 bytes with the .npy header
+    small.put("b", "x", np.zeros(100))
+    assert [key for key, _, _ in small.entries()] == ["b"]
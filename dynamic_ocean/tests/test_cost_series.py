@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from envs.cost_series import CostSeries
+from envs.dynamic_ocean_env import DynamicOceanEnv
+
+
+def _cube(T=6, H=7, W=8):
+    return np.random.RandomState(0).rand(T, H, W)
+
+
+def test_cost_series_memmap_keeps_window_resident(tmp_path):
+    cube = _cube()
+    np.save(tmp_path / "cube.npy", cube)
+    series = CostSeries(str(tmp_path / "cube.npy"), steps_per_frame=2, prefetch=1)
+    assert isinstance(series.frames, np.memmap)
+    for step in range(20):
+        i = min(step // 2, 5)
+        np.testing.assert_array_equal(series.get(step), cube[i])
+        assert series.resident_frames == list(range(i, min(i + 2, 6)))
+
+
+def test_cost_series_interpolates_between_frames():
+    cube = _cube()
+    series = CostSeries(cube, steps_per_frame=4, interpolate=True)
+    np.testing.assert_allclose(series.get(5), 0.75 * cube[1] + 0.25 * cube[2])
+    np.testing.assert_array_equal(series.get(100), cube[-1])
+
+
+@pytest.mark.parametrize("obs_mode", ["alloc", "view", "buffer"])
+@pytest.mark.parametrize("interpolate", [False, True])
+def test_env_follows_cost_series(obs_mode, interpolate):
+    cube = _cube()
+    series = CostSeries(cube, steps_per_frame=3, interpolate=interpolate)
+    env = DynamicOceanEnv(series, (3, 3), (6, 7), patch_size=3, max_steps=50, obs_mode=obs_mode)
+    obs, _ = env.reset()
+    rng = np.random.default_rng(0)
+    for step in range(15):
+        field = series.get(step)
+        r, c = obs["agent_pos"]
+        np.testing.assert_allclose(obs["local_patch"][0], np.pad(field, 1, mode="edge")[r : r + 3, c : c + 3])
+        obs, reward, done, _, info = env.step(int(rng.integers(0, 9)))
+        nr, nc = obs["agent_pos"]
+        # the reward uses the field at the step the ship departs from
+        assert reward == pytest.approx(-field[nr, nc])
+        if done:
+            break
+
+
+def test_envs_sharing_a_series_keep_their_own_frames():
+    cube = _cube()
+    series = CostSeries(cube, steps_per_frame=1, prefetch=0)
+    fast, slow = (DynamicOceanEnv(series, (3, 3), (6, 7), max_steps=50) for _ in range(2))
+    assert fast.cost_series is not slow.cost_series and fast.cost_series.frames is series.frames
+    fast.reset()
+    slow.reset()
+    for step in range(1, 5):
+        fast.step(0)  # stay: only time moves
+        np.testing.assert_array_equal(fast.cost_map, cube[step])
+        np.testing.assert_array_equal(slow.cost_map, cube[0])
+        assert slow.cost_series.resident_frames == [0]
+    slow.step(0)
+    np.testing.assert_array_equal(slow.cost_map, cube[1])
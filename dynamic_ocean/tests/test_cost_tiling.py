@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from envs.cost_functions import aggregate_cost, clip_bounds
+from envs import cost_tiling
+from envs.cost_tiling import aggregate_cost_tiled
+
+
+def _channels():
+    rng = np.random.RandomState(3)
+    ch = rng.rand(4, 45, 38)
+    ch[1, 4, 7] = np.nan
+    ch[2] = np.round(ch[2] * 3)  # heavy ties
+    ch[3] = rng.standard_cauchy((45, 38))  # heavy tails
+    return ch
+
+
+@pytest.mark.parametrize("smooth_sigma, workers", [(0.0, 1), (1.5, 1), (2.0, 2)])
+def test_tiled_matches_in_memory(tmp_path, smooth_sigma, workers):
+    ch = _channels()
+    np.save(tmp_path / "channels.npy", ch)
+    weights = [1.0, 0.8, 0.3, 0.5]
+    cost = aggregate_cost_tiled(str(tmp_path / "channels.npy"), weights, tmp_path / "cost.npy",
+                                smooth_sigma=smooth_sigma, tile=16, workers=workers)
+    assert isinstance(cost, np.memmap) and cost.shape == (45, 38)
+    expected = aggregate_cost(ch, weights, smooth_sigma=smooth_sigma)
+    np.testing.assert_allclose(cost, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_exact_percentiles_with_narrowing():
+    # tiny histograms force several narrowing rounds before the values are gathered
+    ch = _channels()
+    tiles = [(slice(r, r + 10), slice(c, c + 10)) for r in range(0, 45, 10) for c in range(0, 38, 10)]
+    cost_tiling._init_worker(ch, None, None)
+    try:
+        bounds = cost_tiling._percentile_bounds(lambda fn, tasks: [fn(t) for t in tasks], tiles, 4, (1, 99),
+                                                bins=4, max_exact=20)
+    finally:
+        cost_tiling._worker.clear()
+    for i in range(4):
+        assert bounds[i] == pytest.approx(clip_bounds(ch[i]), rel=1e-12)
@@ -14,3 +14,32 @@ def test_aggregate_cost_shapes():
     cost = aggregate_cost(channels, weights)
     assert cost.shape == (H, W)
     assert (cost >= 0.0).all()
+
+def test_aggregate_cost_out_and_float32():
+    channels = np.random.RandomState(1).rand(4, 16, 12)
+    channels[2] = 7.0  # constant channel contributes nothing
+    weights = [1.0, 0.8, 0.3, 0.5]
+    expected = sum(w * np.clip((c - np.percentile(c, 1)) / (np.percentile(c, 99) - np.percentile(c, 1)), 0, 1)
+                   for c, w in zip(channels[[0, 1, 3]], [1.0, 0.8, 0.5]))
+    expected /= expected.max()
+    out = np.full((16, 12), np.nan)
+    cost = aggregate_cost(channels, weights, out=out)
+    assert cost is out
+    np.testing.assert_allclose(cost, expected, rtol=1e-12)
+    cost32 = aggregate_cost(channels, weights, smooth_sigma=1.0, dtype=np.float32)
+    assert cost32.dtype == np.float32
+    np.testing.assert_allclose(cost32, aggregate_cost(channels, weights, smooth_sigma=1.0), atol=1e-6)
+
+def test_cost_model_matches_aggregate_cost():
+    from envs.cost_functions import CostModel
+    rng = np.random.RandomState(2)
+    channels = rng.rand(4, 20, 18)
+    model = CostModel(channels, [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0)
+    np.testing.assert_allclose(model.cost(), aggregate_cost(channels, [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0),
+                               atol=1e-12)
+    model.set_weights([0.0, 2.0, 1.0, 0.1])
+    channels[1] = rng.rand(20, 18) * 4.0
+    model.set_channel(1, channels[1])
+    np.testing.assert_allclose(model.cost(), aggregate_cost(channels, [0.0, 2.0, 1.0, 0.1], smooth_sigma=1.0),
+                               atol=1e-12)
+    assert model.cost() is model.cost()  # cached until weights or channels change
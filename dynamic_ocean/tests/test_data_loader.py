@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from utils.data_loader import generate_random_grid, save_grid, load_grid, open_grid
+from utils.grid_store import ChunkedGrid
+
+
+def test_npz_roundtrip(tmp_path):
+    ch = generate_random_grid(C=3, H=10, W=12, seed=0)
+    save_grid(str(tmp_path / "g.npz"), ch, meta={"seed": 0})
+    loaded, meta = load_grid(str(tmp_path / "g.npz"), channels=[0, 2], window=(slice(2, 5), slice(0, 4)))
+    np.testing.assert_array_equal(loaded, ch[[0, 2], 2:5, 0:4])
+    assert meta["seed"] == 0
+
+
+def test_chunked_roundtrip_and_window(tmp_path):
+    ch = generate_random_grid(C=3, H=50, W=70, seed=1)
+    path = tmp_path / "g.grid"
+    save_grid(str(path), ch, meta={"goal": (49, 69)}, chunks=(1, 16, 16))
+    loaded, meta = load_grid(str(path))
+    np.testing.assert_array_equal(loaded, ch)
+    assert tuple(meta["goal"]) == (49, 69)
+    # drop every chunk outside channel 1, rows 16..31, cols 32..47: the window still reads
+    store = open_grid(str(path))
+    for f in store.path.glob("chunks/*.npy"):
+        if f.name != "1.1.2.npy":
+            f.unlink()
+    window, _ = load_grid(str(path), channels=1, window=(slice(18, 30), slice(33, 40)))
+    np.testing.assert_array_equal(window, ch[1, 18:30, 33:40])
+
+
+def test_chunked_partial_writes(tmp_path):
+    store = ChunkedGrid.create(tmp_path / "s.grid", shape=(2, 3, 20, 20), chunks=(1, 1, 8, 8), fill_value=-1.0)
+    np.testing.assert_array_equal(store[1, 2], np.full((20, 20), -1.0))
+    block = np.arange(60, dtype=float).reshape(6, 10)
+    store[0, 1, 5:11, 3:13] = block
+    expected = np.full((20, 20), -1.0)
+    expected[5:11, 3:13] = block
+    np.testing.assert_array_equal(store[0, 1], expected)
+    np.testing.assert_array_equal(store.read(channels=[1], window=(slice(5, 11), slice(3, 13)))[0, 0], block)
+    with pytest.raises(IndexError):
+        store[0, 0, ::2]
+    # overwriting the store drops its chunks instead of reading them back
+    store = ChunkedGrid.create(tmp_path / "s.grid", shape=(2, 3, 20, 20), chunks=(1, 1, 8, 8), fill_value=-1.0)
+    np.testing.assert_array_equal(store[0, 1], np.full((20, 20), -1.0))
+    assert not any(store.path.glob("chunks/*.npy"))
+
+
+def _write_netcdf(path, lat, lon, T=3, seed=0):
+    import xarray as xr
+    rng = np.random.default_rng(seed)
+    data = {
+        var: (("time", "lat", "lon"), rng.random((T, len(lat), len(lon))))
+        for var in ("hs", "current_mag")
+    }
+    ds = xr.Dataset(data, coords={"time": np.arange(T), "lat": lat, "lon": lon})
+    ds.to_netcdf(path)
+    return ds
+
+
+def test_convert_netcdf_streaming(tmp_path):
+    from utils.data_loader import convert_netcdf_streaming, convert_netcdf_to_grid
+    nc = tmp_path / "fields.nc"
+    # descending latitudes, as in most reanalysis products
+    ds = _write_netcdf(nc, lat=np.linspace(10.0, -10.0, 21), lon=np.linspace(100.0, 130.0, 31))
+
+    # native grid, all time steps -> (T, C, H, W), written in blocks of 8 rows
+    store = convert_netcdf_streaming(str(nc), ["hs", "current_mag"], str(tmp_path / "native.grid"),
+                                     chunks=(1, 1, 8, 16))
+    assert store.shape == (3, 2, 21, 31)
+    expected = np.stack([ds[v].values for v in ("hs", "current_mag")], axis=1)
+    np.testing.assert_allclose(load_grid(str(tmp_path / "native.grid"))[0], expected)
+    np.testing.assert_allclose(store[1], convert_netcdf_to_grid(str(nc), ["hs", "current_mag"], time_index=1))
+
+    # regridded snapshot matches interpolating the whole field at once
+    lat, lon = np.linspace(-9.5, 9.5, 40), np.linspace(101.0, 129.0, 15)
+    store = convert_netcdf_streaming(str(nc), ["hs"], str(tmp_path / "regrid.grid"), time_indices=2,
+                                     target_lat=lat, target_lon=lon, block_rows=7, dtype=np.float32)
+    assert store.shape == (1, 40, 15) and store.dtype == np.float32
+    full = ds["hs"].isel(time=2).interp(lat=lat, lon=lon).values
+    np.testing.assert_allclose(store[0], full, rtol=1e-6)
+    assert store.meta["varnames"] == ["hs"]
@@ -1,6 +1,6 @@
 # tests/test_env.py
 import numpy as np
-from envs.dynamic_ocean_env import DynamicOceanEnv
+from envs.dynamic_ocean_env import DynamicOceanEnv, MOVES
 from envs.cost_functions import aggregate_cost
 
 def test_env_basic_run():
@@ -23,3 +23,73 @@ def test_env_basic_run():
     env.agent_pos = np.array(goal)
     obs, r, done, _, info = env.step(0)  # staying on goal should mark done
     assert done is True
+
+def test_env_obs_modes_match_alloc():
+    cost_map = np.random.RandomState(0).rand(9, 11)
+    envs = {m: DynamicOceanEnv(cost_map, (0, 0), (8, 10), patch_size=5, obs_mode=m)
+            for m in ("alloc", "view", "buffer")}
+    obs = {m: e.reset()[0] for m, e in envs.items()}
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        for m in ("view", "buffer"):
+            for k in obs["alloc"]:
+                np.testing.assert_array_equal(obs[m][k], obs["alloc"][k])
+        a = int(rng.integers(0, 9))
+        obs = {m: e.step(a)[0] for m, e in envs.items()}
+    assert not obs["view"]["local_patch"].flags.writeable
+    # buffer mode reuses the same arrays across steps
+    patch = obs["buffer"]["local_patch"]
+    assert envs["buffer"].step(0)[0]["local_patch"] is patch
+
+def test_env_potential_shaping_telescopes():
+    from utils.pathfinding import cost_to_go, extract_path
+    cost_map = np.random.RandomState(1).rand(8, 8)
+    start, goal = (0, 0), (6, 5)
+    dist, parent_dir = cost_to_go(cost_map, goal)
+    env = DynamicOceanEnv(cost_map, start, goal, shaping_field=dist, shaping_gamma=1.0)
+    env.reset()
+    deltas = {(dr, dc): a for a, (dr, dc) in MOVES.items()}
+    path = extract_path(parent_dir, start)
+    total_shaping = 0.0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        _, r, done, _, info = env.step(deltas[(r2 - r1, c2 - c1)])
+        assert r == -info["cell_cost"] + info["shaping"]
+        total_shaping += info["shaping"]
+    assert done and info["success"]
+    # with gamma=1 the shaping terms sum to Phi(goal) - Phi(start) = dist[start]
+    assert np.isclose(total_shaping, dist[start])
+
+
+def test_env_references_float_maps_without_copying():
+    cost_map = np.random.RandomState(0).rand(6, 7)
+    cost_map.flags.writeable = False
+    padded = np.pad(cost_map, 1, mode="edge")
+    env = DynamicOceanEnv(cost_map, (0, 0), (5, 6), patch_size=3, padded_cost=padded)
+    assert np.shares_memory(env.cost_map, cost_map) and np.shares_memory(env._padded_cost, padded)
+    obs, _ = env.reset()
+    np.testing.assert_array_equal(obs["local_patch"][0], padded[0:3, 0:3])
+
+
+def test_env_channel_observations():
+    channels = np.random.RandomState(2).rand(4, 9, 11)
+    cost_map = aggregate_cost(channels, [1.0, 0.5, 0.3, 0.2])
+    padded = np.pad(channels, ((0, 0), (2, 2), (2, 2)), mode="edge")
+    for layout in ("last", "first"):
+        envs = {m: DynamicOceanEnv(cost_map, (0, 0), (8, 10), patch_size=5, obs_mode=m, channels=channels,
+                                   channel_layout=layout, channel_dtype=np.float16)
+                for m in ("alloc", "view", "buffer")}
+        obs = {m: e.reset()[0] for m, e in envs.items()}
+        rng = np.random.default_rng(0)
+        for _ in range(30):
+            r, c = obs["alloc"]["agent_pos"]
+            expected = padded[:, r : r + 5, c : c + 5].astype(np.float16)
+            if layout == "last":
+                expected = expected.transpose(1, 2, 0)
+            for m, e in envs.items():
+                assert obs[m]["local_channels"].dtype == np.float16
+                assert e.observation_space["local_channels"].contains(obs[m]["local_channels"])
+                np.testing.assert_array_equal(obs[m]["local_channels"], expected)
+            a = int(rng.integers(0, 9))
+            obs = {m: e.step(a)[0] for m, e in envs.items()}
+        # view mode reads the padded tensor in place
+        assert np.shares_memory(obs["view"]["local_channels"], envs["view"]._padded_channels)
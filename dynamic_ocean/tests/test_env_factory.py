@@ -0,0 +1,104 @@
+import importlib.util
+import os
+import sys
+
+import cloudpickle
+import numpy as np
+import pytest
+from utils.data_loader import generate_random_grid, save_grid
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)  # the loaders import the installed dynamic_ocean package
+
+from dynamic_ocean import env_factory  # noqa: E402
+from dynamic_ocean.utils.shared import SharedNDArray  # noqa: E402
+
+LOADERS = ["environments/dynamic-ocean-fields/load_environment.py",
+           "environments/dynamic_ocean_fields/load_environment.py",
+           "dynamic_ocean/environments/dynamic_ocean_fields/load_environment.py"]
+
+
+def _loader(path):
+    spec = importlib.util.spec_from_file_location(f"loader_{LOADERS.index(path)}", os.path.join(REPO_ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.load_environment
+
+
+@pytest.fixture
+def grid_path(tmp_path):
+    path = str(tmp_path / "grid.npz")
+    save_grid(path, generate_random_grid(C=3, H=12, W=15, seed=0), meta={"start": (1, 2), "goal": (10, 13)})
+    return path
+
+
+def test_cache_hit_and_miss(grid_path, tmp_path, monkeypatch):
+    builds = []
+    aggregate = env_factory.aggregate_cost
+    monkeypatch.setattr(env_factory, "aggregate_cost", lambda *a, **kw: builds.append(1) or aggregate(*a, **kw))
+    cache_dir = str(tmp_path / "cache")
+    first = env_factory.make_env_factory(grid_path=grid_path, cache_dir=cache_dir, shaping="cost_to_go")
+    hit = env_factory.make_env_factory(grid_path=grid_path, cache_dir=cache_dir, shaping="cost_to_go")
+    assert len(builds) == 1
+    assert isinstance(hit().cost_map.base, np.memmap) or isinstance(hit().cost_map, np.memmap)
+    np.testing.assert_array_equal(hit().cost_map, first().cost_map)
+    np.testing.assert_array_equal(hit.cost_to_go()[0], first.cost_to_go()[0])
+    assert hit().start == (1, 2) and hit().goal == (10, 13)  # from the cached meta
+    env_factory.make_env_factory(grid_path=grid_path, cache_dir=cache_dir, weights=[1.0, 2.0, 1.0])
+    assert len(builds) == 2  # other weights: a different entry
+
+
+def test_share_memory():
+    channels = generate_random_grid(C=2, H=64, W=64, seed=1)
+    factory = env_factory.make_env_factory(channels=channels, share_memory=True, shaping="geodesic")
+    dist, parent_dir = factory.cost_to_go()  # published at load time
+    assert isinstance(dist, SharedNDArray) and isinstance(parent_dir, SharedNDArray)
+    env = factory()
+    assert not env.cost_map.flags.writeable
+    payload = cloudpickle.dumps(factory)
+    assert len(payload) < env.cost_map.nbytes / 4  # handles, not copies
+    clone = cloudpickle.loads(payload)()
+    np.testing.assert_array_equal(clone.cost_map, env.cost_map)
+    np.testing.assert_array_equal(clone.shaping_field, env.shaping_field)
+
+
+@pytest.mark.parametrize("layout", ["last", "first"])
+def test_observe_channels(grid_path, layout):
+    channels = np.load(grid_path)["channels"]
+    factory = env_factory.make_env_factory(grid_path=grid_path, patch_size=5, observe_channels=True,
+                                           channel_layout=layout, channel_dtype="float16", max_steps=7)
+    env = factory()
+    obs, _ = env.reset()
+    padded = np.pad(channels, ((0, 0), (2, 2), (2, 2)), mode="edge").astype(np.float16)
+    expected = padded[:, 1:6, 2:7]  # centred on start (1, 2)
+    if layout == "last":
+        expected = expected.transpose(1, 2, 0)
+    np.testing.assert_array_equal(obs["local_channels"], expected)
+    assert env.max_steps == 7
+    # a different patch size per env falls back to the env's own padding
+    assert factory(patch_size=3).reset()[0]["local_channels"].shape[-1 if layout == "first" else 0] == 3
+
+
+@pytest.mark.parametrize("path", LOADERS)
+def test_loaders_delegate(path, grid_path, tmp_path):
+    factory = _loader(path)(grid_path=grid_path, cache_dir=str(tmp_path / "cache"), observe_channels=True,
+                            pyramid_levels=2, weights=[1.0, 1.0, 1.0])
+    ref = env_factory.make_env_factory(grid_path=grid_path, weights=[1.0, 1.0, 1.0])
+    obs, _ = factory().reset()
+    assert {"local_channels", "pyramid"} <= set(obs)
+    np.testing.assert_array_equal(factory().cost_map, ref().cost_map)
+
+
+def test_repo_root_loader(tmp_path):
+    grid_path = str(tmp_path / "grid4.npz")
+    save_grid(grid_path, generate_random_grid(C=4, H=12, W=15, seed=0), meta={"goal": (5, 5)})
+    spec = importlib.util.spec_from_file_location("root_loader", os.path.join(REPO_ROOT, "load_environment.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    env = module.load_environment(grid_size=(10, 12), max_steps=9, shaping="cost_to_go", observe_channels=True)
+    assert env.cost_map.shape == (10, 12) and env.goal == (9, 11) and env.max_steps == 9
+    assert "local_channels" in env.reset()[0]
+    np.testing.assert_array_equal(env.env_factory().cost_map, env.cost_map)
+    env = module.load_environment(grid_path, start=(3, 3))
+    assert env.start == (3, 3) and env.goal == (11, 14)  # the root loader ignores the grid's meta
@@ -0,0 +1,55 @@
+import random
+
+import numpy as np
+from gymnasium import spaces
+from agents.greedy_agent import GreedyAgent
+from envs.vector_env import VectorDynamicOceanEnv
+
+
+def test_act_batch_matches_act_distribution():
+    patches = np.round(np.random.RandomState(0).rand(6, 1, 5, 5), 1)  # ties in most rows
+    patches[0, 0, 1:4, 1:4] = 0.5  # all 9 moves tie
+    patches[1, 0, 2, 3] = -1.0  # unique argmin: E
+    agent = GreedyAgent(spaces.Discrete(9), seed=0)
+    random.seed(0)
+    n = 3000
+    batch = agent.act_batch({"local_patch": np.repeat(patches, n, axis=0)}).reshape(len(patches), n)
+    for i, patch in enumerate(patches):
+        scalar = np.bincount([agent.act({"local_patch": patch}) for _ in range(n)], minlength=9) / n
+        batched = np.bincount(batch[i], minlength=9) / n
+        np.testing.assert_allclose(batched, scalar, atol=0.05)
+    assert (batch[1] == 3).all()
+    assert np.bincount(batch[0], minlength=9).min() > n / 9 * 0.8
+    # seeded: the same seed gives the same actions
+    obs = {"local_patch": np.repeat(patches, 50, axis=0)}
+    np.testing.assert_array_equal(GreedyAgent(None, seed=3).act_batch(obs), GreedyAgent(None, seed=3).act_batch(obs))
+
+
+def test_act_batch_skips_nan_cells():
+    patches = np.ones((3, 1, 3, 3))
+    patches[0, 0, 0, 0] = np.nan  # NW unknown
+    patches[0, 0, 1, 2] = 0.0  # unique argmin: E
+    patches[1, 0, 1, 2] = np.nan  # E unknown, the rest tie
+    patches[2] = np.nan
+    agent = GreedyAgent(spaces.Discrete(9), seed=0)
+    batch = agent.act_batch({"local_patch": np.repeat(patches, 500, axis=0)}).reshape(3, 500)
+    assert set(batch[0]) == {3} == {agent.act({"local_patch": patches[0]}) for _ in range(50)}
+    assert set(batch[1]) == set(range(9)) - {3}
+    assert set(batch[2]) == set(range(9))  # all NaN: uniform over every move
+
+
+def test_goal_biased_act_batch_on_vector_env():
+    cost_map = np.ones((12, 12))
+    env = VectorDynamicOceanEnv(cost_map, [(0, 0), (11, 11), (0, 11), (6, 6)], (6, 9), num_envs=4, max_steps=50)
+    agent = GreedyAgent(env.single_action_space, seed=0, goal_weight=0.1)
+    obs, _ = env.reset()
+    arrived = np.zeros(4, dtype=int)
+    for step in range(1, 12):
+        obs, _, term, _, info = env.step(agent.act_batch(obs))
+        for i in np.flatnonzero(term):
+            assert info["final_info"][i]["success"]
+            arrived[i] = arrived[i] or step
+    # on a flat map the goal term alone steers every ship straight to the goal
+    np.testing.assert_array_equal(arrived, [9, 5, 6, 3])
+    single = {k: v[0] for k, v in env.reset()[0].items()}
+    assert agent.act(single) == 4  # SE from (0, 0) towards (6, 9)
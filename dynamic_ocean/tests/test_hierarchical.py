@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from utils.hierarchical import HierarchicalPlanner
+from utils.pathfinding import dijkstra_grid
+from utils.data_loader import generate_random_grid
+from envs.cost_functions import aggregate_cost
+
+
+def _cost_map(H=50, W=61, seed=4):
+    return aggregate_cost(generate_random_grid(C=4, H=H, W=W, seed=seed), [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0) + 0.05
+
+
+def _walk(cost_map, path):
+    total = 0.0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        assert max(abs(r1 - r2), abs(c1 - c2)) == 1
+        mult = np.sqrt(2) if r1 != r2 and c1 != c2 else 1.0
+        total += mult * 0.5 * (cost_map[r1, c1] + cost_map[r2, c2])
+    return total
+
+
+@pytest.mark.parametrize("corridor", [0, 1])
+def test_plan_is_valid_and_near_optimal(corridor):
+    cost_map = _cost_map()
+    planner = HierarchicalPlanner(cost_map, cluster=12, entrance=6, span=3, corridor=corridor)
+    for start, goal in [((0, 0), (49, 60)), ((45, 3), (2, 57)), ((5, 5), (9, 8)), ((30, 30), (30, 30))]:
+        stats = {}
+        path, cost = planner.plan(start, goal, stats=stats)
+        assert path[0] == start and path[-1] == goal
+        assert cost == pytest.approx(_walk(cost_map, path))
+        _, optimal = dijkstra_grid(cost_map, start, goal)
+        assert optimal - 1e-9 <= cost <= 1.1 * optimal
+        assert stats["seconds"] >= 0 and stats["abstract_nodes"] == len(planner.graph)
+
+
+def test_set_region_matches_fresh_build():
+    cost_map = _cost_map()
+    planner = HierarchicalPlanner(cost_map, cluster=12, entrance=6)
+    patch = np.random.RandomState(0).rand(15, 20) * 3
+    patch[4:9, :] = np.inf  # a new impassable band
+    planner.set_region(20, 14, patch)
+    cost_map[20:35, 14:34] = patch
+    fresh = HierarchicalPlanner(cost_map, cluster=12, entrance=6)
+    assert planner.graph.keys() == fresh.graph.keys()
+    for u, nbrs in fresh.graph.items():
+        assert planner.graph[u] == pytest.approx(nbrs)
+    assert planner.plan((0, 0), (49, 60)) == fresh.plan((0, 0), (49, 60))
+
+
+def test_plan_through_gap_and_unreachable():
+    cost_map = np.ones((40, 40))
+    cost_map[:, 20] = np.inf
+    cost_map[33, 20] = 1.0  # single gap in the wall
+    planner = HierarchicalPlanner(cost_map, cluster=10, entrance=4)
+    path, cost = planner.plan((2, 2), (2, 37))
+    assert (33, 20) in path and np.isfinite(cost)
+    cost_map[33, 20] = np.inf
+    planner.set_region(33, 20, cost_map[33:34, 20:21])
+    assert planner.plan((2, 2), (2, 37)) == (None, float("inf"))
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from utils.incremental import IncrementalPlanner
+from utils.pathfinding import dijkstra_grid, numba
+from utils.data_loader import generate_random_grid
+from envs.cost_functions import aggregate_cost
+
+BACKENDS = ["flat"] + (["numba"] if numba is not None else [])
+
+
+def _cost_map(H=30, W=41, seed=2):
+    return aggregate_cost(generate_random_grid(C=4, H=H, W=W, seed=seed), [1.0, 0.8, 0.3, 0.5], smooth_sigma=1.0) + 0.05
+
+
+def _check(planner, path, cost):
+    _, optimal = dijkstra_grid(planner.cost_map, planner.start, planner.goal)
+    assert cost == pytest.approx(optimal, rel=1e-12)
+    assert path[0] == planner.start and path[-1] == planner.goal
+    walked = 0.0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        assert max(abs(r1 - r2), abs(c1 - c2)) == 1
+        mult = np.sqrt(2) if r1 != r2 and c1 != c2 else 1.0
+        walked += mult * 0.5 * (planner.cost_map[r1, c1] + planner.cost_map[r2, c2])
+    assert walked == pytest.approx(cost)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_repairs_match_replanning_from_scratch(backend):
+    planner = IncrementalPlanner(_cost_map(), (1, 2), (27, 38), backend=backend)
+    stats = {}
+    path, cost = planner.plan(stats=stats)
+    _check(planner, path, cost)
+    initial_expanded = stats["expanded"]
+
+    rng = np.random.RandomState(0)
+    for step, scale in enumerate([3.0, 0.2, np.inf, 1.5, 0.5]):
+        planner.move_to(path[2])
+        r, c = path[min(4, len(path) - 1)]
+        r0, c0 = max(r - 2, 0), max(c - 2, 0)
+        block = planner.cost_map[r0 : r0 + 5, c0 : c0 + 5] * scale
+        sr, sc = planner.start[0] - r0, planner.start[1] - c0
+        if 0 <= sr < block.shape[0] and 0 <= sc < block.shape[1]:
+            block[sr, sc] = planner.cost_map[planner.start]  # the agent's own cell stays as it is
+        planner.set_region(r0, c0, block)
+        planner.update_cells([(rng.randint(30), rng.randint(41))], [rng.rand() + 0.05])
+        path, cost = planner.plan(stats=stats)
+        _check(planner, path, cost)
+        if scale == 3.0:
+            assert stats["expanded"] < initial_expanded
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_goal_cut_off_and_reopened(backend):
+    cost_map = np.ones((12, 12))
+    planner = IncrementalPlanner(cost_map, (0, 0), (9, 9), backend=backend)
+    _check(planner, *planner.plan())
+    ring = [(r, c) for r in range(7, 12) for c in range(7, 12) if max(abs(r - 9), abs(c - 9)) == 2]
+    planner.update_cells(ring, np.inf)
+    assert planner.plan() == (None, float("inf"))
+    planner.update_cells([(7, 9)], 0.5)  # reopen one cell, cheaper than anything before
+    path, cost = planner.plan()
+    assert (7, 9) in path
+    _check(planner, path, cost)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_walled_in_agent(backend):
+    planner = IncrementalPlanner(np.ones((10, 10)), (4, 4), (8, 8), backend=backend)
+    _check(planner, *planner.plan())
+    ring = [(r, c) for r in range(3, 6) for c in range(3, 6) if (r, c) != (4, 4)]
+    planner.update_cells(ring, np.inf)
+    # read out before the repair: the start's cost-to-go is stale, every edge out is infinite
+    assert planner._extract_path() == (None, float("inf"))
+    assert planner.plan() == (None, float("inf"))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_zero_cost_cells(backend):
+    # equal g on zero-cost plateaus: the readout must not bounce between tied neighbours
+    ch = np.zeros((1, 5, 5))
+    ch[0, 2, 2] = 10
+    planner = IncrementalPlanner(aggregate_cost(ch, [1.0]), (0, 0), (4, 4), backend=backend)
+    _check(planner, *planner.plan())
+    cost_map = np.ones((6, 6))
+    cost_map[:3] = 0
+    planner = IncrementalPlanner(cost_map, (2, 2), (0, 5), backend=backend)
+    _check(planner, *planner.plan())
+    # a free corridor that leads away from the goal before reaching it
+    cost_map = np.full((7, 7), 5.0)
+    cost_map[0, :] = cost_map[:, 6] = cost_map[6, 1:] = 0.0
+    planner = IncrementalPlanner(cost_map, (0, 0), (6, 1), backend=backend)
+    path, cost = planner.plan()
+    _check(planner, path, cost)
+    assert cost == 0.0 and (3, 6) in path
@@ -0,0 +1,72 @@
+import urllib.request
+
+import numpy as np
+from envs.dynamic_ocean_env import DynamicOceanEnv
+from utils import pathfinding
+from utils.incremental import IncrementalPlanner
+from utils.instrument import DEFAULT_METHODS, Recorder
+
+
+def test_env_calls_are_recorded_and_restored():
+    env = DynamicOceanEnv(np.ones((20, 20)), (0, 0), (19, 19), patch_size=3)
+    rec = Recorder().instrument(env, DEFAULT_METHODS["env"], prefix="env")
+    env.reset(seed=0)
+    for _ in range(25):
+        env.step(env.action_space.sample())
+    calls = rec.snapshot()["calls"]
+    assert calls["env.reset"]["count"] == 1
+    assert calls["env.step"]["count"] == 25
+    assert calls["env._get_obs"]["count"] == 26  # reset and every step build an observation
+    assert calls["env.step"]["buckets"][-1] == (float("inf"), 25)
+    assert 0 < calls["env.step"]["p50_seconds"] <= calls["env.step"]["p99_seconds"]
+
+    rec.uninstrument()
+    assert "step" not in vars(env) and "_get_obs" not in vars(env)
+    env.step(0)
+    assert rec.snapshot()["calls"]["env.step"]["count"] == 25
+
+
+def test_planner_nodes_expanded():
+    cost_map = np.random.default_rng(0).random((30, 30)) + 0.1
+    with Recorder().instrument(pathfinding, DEFAULT_METHODS["planner"], prefix="planner") as rec:
+        pathfinding.astar_grid(cost_map, (0, 0), (29, 29))
+        mine = {}
+        pathfinding.dijkstra_grid(cost_map, (0, 0), (29, 29), "flat", mine)  # caller's own stats dict
+    assert mine["expanded"] > 0
+    counts = rec.snapshot()["nodes_expanded"]
+    assert counts["planner.dijkstra_grid"] == mine["expanded"]
+    assert 0 < counts["planner.astar_grid"] <= mine["expanded"]
+    assert not hasattr(pathfinding.astar_grid, "__wrapped__")
+
+    planner = IncrementalPlanner(cost_map, (0, 0), (29, 29))
+    with Recorder().instrument(planner, ["plan"]) as rec:
+        planner.plan()
+    assert rec.nodes_expanded["IncrementalPlanner.plan"] > 0
+
+
+def test_allocations_and_prometheus_export():
+    def inner():
+        return np.ones(200_000)  # 1.6 MB
+
+    holder = type("Holder", (), {})()
+    holder.inner = inner
+    holder.outer = lambda: holder.inner().sum() + np.zeros(10).sum()
+    rec = Recorder(track_allocations=True)
+    with rec.instrument(holder, ["inner", "outer"]):
+        holder.outer()
+    assert rec.alloc_bytes["Holder.inner"] >= 1_600_000
+    assert rec.alloc_bytes["Holder.outer"] >= rec.alloc_bytes["Holder.inner"]
+
+    text = rec.prometheus()
+    assert '# TYPE dynamic_ocean_call_duration_seconds histogram' in text
+    assert 'dynamic_ocean_call_duration_seconds_bucket{call="Holder.outer",le="+Inf"} 1' in text
+    assert 'dynamic_ocean_call_duration_seconds_count{call="Holder.inner"} 1' in text
+    assert 'dynamic_ocean_alloc_bytes_total{call="Holder.inner"}' in text
+
+    server = rec.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        assert urllib.request.urlopen(url).read().decode() == rec.prometheus()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,224 @@
+import numpy as np
+import pytest
+from utils.pathfinding import astar_grid, dijkstra_grid, numba
+from utils.data_loader import generate_random_grid
+from envs.cost_functions import aggregate_cost
+
+BACKENDS = ["flat"] + (["numba"] if numba is not None else [])
+
+
+def _cost_map(H=24, W=31, seed=3):
+    return aggregate_cost(generate_random_grid(C=4, H=H, W=W, seed=seed), [1.0, 0.8, 0.3, 0.5])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("heuristic", ["manhattan", "euclidean", "octile", "alt", "none"])
+def test_astar_backends_match_dict(backend, heuristic):
+    cost_map = _cost_map()
+    ref_path, ref_cost = astar_grid(cost_map, (0, 0), (23, 30), heuristic=heuristic, backend="dict")
+    path, cost = astar_grid(cost_map, (0, 0), (23, 30), heuristic=heuristic, backend=backend)
+    assert path == ref_path
+    assert cost == pytest.approx(ref_cost)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dijkstra_backends_match_dict(backend):
+    cost_map = _cost_map()
+    ref_path, ref_cost = dijkstra_grid(cost_map, (20, 2), (1, 28), backend="dict")
+    path, cost = dijkstra_grid(cost_map, (20, 2), (1, 28), backend=backend)
+    assert path == ref_path
+    assert cost == pytest.approx(ref_cost)
+
+
+@pytest.mark.parametrize("backend", BACKENDS + ["dict"])
+def test_admissible_heuristics_stay_optimal(backend):
+    from utils.pathfinding import alt_landmarks
+    cost_map = _cost_map()
+    cost_map[5:20, 12] = np.inf  # a wall the heuristics know nothing about
+    landmarks = alt_landmarks(cost_map, count=4)
+    for start, goal in [((0, 0), (23, 30)), ((10, 2), (10, 25)), ((23, 0), (0, 13))]:
+        _, optimal = dijkstra_grid(cost_map, start, goal, backend="dict")
+        expanded = {}
+        for heuristic in ["none", "octile", "alt"]:
+            stats = {}
+            _, cost = astar_grid(cost_map, start, goal, heuristic=heuristic, backend=backend,
+                                 landmarks=landmarks, stats=stats)
+            assert cost == pytest.approx(optimal, rel=1e-12)
+            expanded[heuristic] = stats["expanded"]
+        assert expanded["alt"] <= expanded["octile"] <= expanded["none"]
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        astar_grid(np.ones((3, 3)), (0, 0), (2, 2), backend="gpu")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cost_to_go_matches_dijkstra(backend):
+    from utils.pathfinding import cost_to_go, extract_path, PARENT_GOAL
+    cost_map = _cost_map()
+    goal = (17, 9)
+    dist, parent_dir = cost_to_go(cost_map, goal, backend=backend)
+    assert dist.shape == cost_map.shape and parent_dir[goal] == PARENT_GOAL
+    for start in [(0, 0), (23, 30), (5, 20), goal]:
+        _, ref_cost = dijkstra_grid(cost_map, start, goal, backend="dict")
+        assert dist[start] == pytest.approx(ref_cost)
+        path = extract_path(parent_dir, start)
+        assert path[0] == start and path[-1] == goal
+        # walking the parent field accumulates exactly the field value
+        walked = 0.0
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            mult = np.sqrt(2) if r1 != r2 and c1 != c2 else 1.0
+            walked += mult * 0.5 * (cost_map[r1, c1] + cost_map[r2, c2])
+        assert walked == pytest.approx(dist[start])
+
+
+def test_cost_to_go_sweep_matches_dijkstra():
+    from utils.pathfinding import cost_to_go, extract_path, PARENT_NONE
+    cost_map = _cost_map()
+    cost_map[3:21, 10] = np.inf  # wall with a way round, so some paths turn back
+    cost_map[21:, 20] = np.inf
+    cost_map[0:2, 0:2] = 0.0  # zero-cost plateau: parents must not cycle
+    for goal in [(12, 15), (0, 0), (23, 30)]:
+        exact, _ = cost_to_go(cost_map, goal)
+        stats = {}
+        dist, parent_dir = cost_to_go(cost_map, goal, method="sweep", stats=stats)
+        assert stats["sweeps"] >= 2 and stats["max_change"] == 0.0
+        finite = np.isfinite(exact)
+        assert np.array_equal(finite, np.isfinite(dist))
+        np.testing.assert_allclose(dist[finite], exact[finite], rtol=1e-12, atol=1e-12)
+        assert np.all(parent_dir[~finite] == PARENT_NONE)
+        for start in [(0, 1), (23, 0), (5, 30), (22, 25)]:
+            path = extract_path(parent_dir, start)
+            assert path[0] == start and path[-1] == goal
+
+
+def test_cost_to_go_sweep_capped():
+    from utils.pathfinding import cost_to_go
+    cost_map = _cost_map()
+    cost_map[3:, 10] = np.inf
+    exact, _ = cost_to_go(cost_map, (20, 5))
+    dist, _ = cost_to_go(cost_map, (20, 5), method="sweep", max_sweeps=2)
+    assert np.all(dist >= exact - 1e-12)  # an upper bound until converged
+    with pytest.raises(ValueError):
+        cost_to_go(cost_map, (20, 5), method="fmm")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_plan_many_matches_dijkstra(workers):
+    from utils.pathfinding import plan_many
+    cost_map = _cost_map()
+    rng = np.random.RandomState(5)
+    goals = [(17, 9), (0, 30)]
+    queries = [((rng.randint(24), rng.randint(31)), goals[k % 2]) for k in range(12)]
+    queries += [((0, 0), (23, 30)), ((23, 0), (3, 3))]  # goals asked once
+    stats = {}
+    results = list(plan_many(cost_map, queries, workers=workers, chunk=1, stats=stats))
+    assert sorted(i for i, _, _ in results) == list(range(len(queries)))
+    for i, path, cost in results:
+        start, goal = queries[i]
+        assert path[0] == start and path[-1] == goal
+        assert cost == pytest.approx(dijkstra_grid(cost_map, start, goal)[1])
+    assert stats["queries"] == stats["done"] == len(queries)
+    assert stats["goals"] == stats["searches"] == 4
+    assert stats["queries_per_sec"] > 0
+
+
+@pytest.mark.parametrize("heuristic", ["octile", "alt"])
+def test_plan_many_prepares_the_heuristic_once(heuristic, monkeypatch):
+    from utils import pathfinding
+    calls = []
+    for name in ("min_cell_cost", "alt_landmarks", "array_digest", "_flat_landmarks"):
+        fn = getattr(pathfinding, name)
+        counted = lambda *a, _fn=fn, _name=name, **kw: calls.append(_name) or _fn(*a, **kw)  # noqa: E731
+        monkeypatch.setattr(pathfinding, name, counted)
+    cost_map = _cost_map()
+    queries = [((0, k), (23, 30 - k)) for k in range(6)]  # six goals asked once: six A* searches
+    results = list(pathfinding.plan_many(cost_map, queries, workers=1, heuristic=heuristic, backend="flat"))
+    assert calls == (["min_cell_cost", "_flat_landmarks"] if heuristic == "octile"
+                     else ["alt_landmarks", "_flat_landmarks"])  # tables listed once, not per query
+    for i, _, cost in results:
+        assert cost == pytest.approx(dijkstra_grid(cost_map, *queries[i])[1])
+
+
+def test_plan_many_serial_generators_interleave():
+    from utils.pathfinding import plan_many
+    maps = [_cost_map(seed=3), _cost_map(seed=4)]
+    queries = [((0, 0), (23, 30)), ((23, 0), (3, 3)), ((5, 5), (10, 20))]
+    gens = [plan_many(m, queries, workers=1, chunk=1) for m in maps]
+    first = [next(g) for g in gens]
+    gens[0].close()  # must not clear the other generator's state
+    results = [[first[0]], [first[1]] + list(gens[1])]
+    assert len(results[1]) == len(queries)
+    for cost_map, res in zip(maps, results):
+        for i, _, cost in res:
+            assert cost == pytest.approx(dijkstra_grid(cost_map, *queries[i])[1])
+
+
+def _time_expanded_optimum(cube, start, goal, horizon):
+    # brute-force DP over every (t, r, c) up to `horizon` steps
+    from utils.pathfinding import NEIGHBORS
+    T, H, W = cube.shape
+    best = np.full((H, W), np.inf)
+    best[start] = 0.0
+    answer = 0.0 if start == goal else np.inf
+    for t in range(horizon):
+        cost = cube[min(t, T - 1)]
+        nxt = best + cost  # waiting
+        for dr, dc, mult in NEIGHBORS:
+            for r in range(H):
+                for c in range(W):
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < H and 0 <= nc < W:
+                        cand = best[r, c] + mult * 0.5 * (cost[r, c] + cost[nr, nc])
+                        nxt[nr, nc] = min(nxt[nr, nc], cand)
+        best = nxt
+        answer = min(answer, best[goal])
+    return answer
+
+
+def _time_path_cost(cube, path):
+    T = cube.shape[0]
+    total = 0.0
+    for (r1, c1, t1), (r2, c2, t2) in zip(path, path[1:]):
+        cost = cube[min(t1, T - 1)]
+        assert t2 == min(t1 + 1, T - 1) or t1 >= T - 1
+        if (r1, c1) == (r2, c2):
+            total += cost[r1, c1]
+        else:
+            mult = np.sqrt(2) if r1 != r2 and c1 != c2 else 1.0
+            total += mult * 0.5 * (cost[r1, c1] + cost[r2, c2])
+    return total
+
+
+def test_astar_time_grid_static_cube_matches_dijkstra():
+    from utils.pathfinding import astar_time_grid
+    cost_map = _cost_map()
+    path, cost = astar_time_grid(np.stack([cost_map] * 3), (0, 0), (23, 30))
+    assert cost == pytest.approx(dijkstra_grid(cost_map, (0, 0), (23, 30))[1])
+
+
+def test_astar_time_grid_waits_for_opening():
+    from utils.pathfinding import astar_time_grid
+    cube = np.full((6, 5, 9), 0.1)
+    cube[:4, :, 4] = 50.0  # wall across the map that drops at frame 4
+    path, cost = astar_time_grid(cube, (2, 0), (2, 8))
+    assert cost < 1.0 and any(p[:2] == q[:2] for p, q in zip(path, path[1:]))
+    _, cost_no_wait = astar_time_grid(cube, (2, 0), (2, 8), allow_wait=False)
+    assert cost_no_wait > 10.0
+    # the wall drops one step after the ship first reaches it
+    assert astar_time_grid(cube, (2, 0), (2, 8), max_wait=0)[1] == pytest.approx(cost_no_wait)
+    assert astar_time_grid(cube, (2, 0), (2, 8), max_wait=1)[1] == pytest.approx(cost)
+
+
+@pytest.mark.parametrize("prune", [False, True])
+def test_astar_time_grid_against_time_expanded_dp(prune):
+    from utils.pathfinding import astar_time_grid
+    cube = np.random.RandomState(4).rand(5, 5, 6) ** 3
+    optimum = _time_expanded_optimum(cube, (0, 0), (4, 5), horizon=30)
+    path, cost = astar_time_grid(cube, (0, 0), (4, 5), prune=prune)
+    assert cost == pytest.approx(_time_path_cost(cube, path))
+    if prune:
+        assert cost >= optimum - 1e-9
+    else:
+        assert cost == pytest.approx(optimum)
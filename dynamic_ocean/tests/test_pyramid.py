@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from gymnasium.vector import SyncVectorEnv
+from envs.dynamic_ocean_env import DynamicOceanEnv
+from envs.pyramid import CostPyramid, build_pyramid
+from envs.vector_env import VectorDynamicOceanEnv
+
+
+@pytest.mark.parametrize("pool", ["mean", "min"])
+def test_levels_pool_blocks_including_partial_edges(pool):
+    cost_map = np.random.RandomState(0).rand(13, 22)
+    reduce = np.mean if pool == "mean" else np.min
+    for l, level in enumerate(build_pyramid(cost_map, 3, pool), start=1):
+        f = 2 ** l
+        assert level.shape == (-(-13 // f), -(-22 // f))
+        for i in range(level.shape[0]):
+            for j in range(level.shape[1]):
+                assert level[i, j] == pytest.approx(reduce(cost_map[i * f : (i + 1) * f, j * f : (j + 1) * f]))
+
+
+def test_patch_and_gather_are_centred_windows():
+    cost_map = np.random.RandomState(1).rand(20, 17)
+    pyramid = CostPyramid(cost_map, 2, patch_size=5, pool="min")
+    rows, cols = np.array([0, 7, 19, 12]), np.array([0, 16, 3, 9])
+    batch = pyramid.gather(rows, cols)
+    for n, (r, c) in enumerate(zip(rows, cols)):
+        patch = pyramid.patch(r, c)
+        np.testing.assert_array_equal(batch[n], patch)
+        for l, level in enumerate(pyramid.levels, start=1):
+            padded = np.pad(level, 2, mode="edge")
+            np.testing.assert_array_equal(patch[l - 1], padded[(r >> l) : (r >> l) + 5, (c >> l) : (c >> l) + 5])
+
+
+def test_env_and_vector_env_pyramid_observations():
+    cost_map = np.random.RandomState(2).rand(15, 12)
+    kw = {"patch_size": 3, "max_steps": 10, "pyramid_levels": 3}
+    envs = {m: DynamicOceanEnv(cost_map, (0, 0), (14, 11), obs_mode=m, **kw) for m in ("alloc", "view", "buffer")}
+    ref = SyncVectorEnv([lambda: DynamicOceanEnv(cost_map, (0, 0), (14, 11), **kw)] * 3)
+    vec = VectorDynamicOceanEnv(cost_map, (0, 0), (14, 11), num_envs=3, **kw)
+    obs = {m: e.reset()[0] for m, e in envs.items()}
+    obs_ref, obs_vec = ref.reset()[0], vec.reset()[0]
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        r, c = obs["alloc"]["agent_pos"]
+        np.testing.assert_array_equal(obs["alloc"]["pyramid"], envs["alloc"].pyramid.patch(r, c))
+        for m in ("view", "buffer"):
+            np.testing.assert_array_equal(obs[m]["pyramid"], obs["alloc"]["pyramid"])
+        np.testing.assert_array_equal(obs_vec["pyramid"], obs_ref["pyramid"])
+        a = int(rng.integers(0, 9))
+        obs = {m: e.step(a)[0] for m, e in envs.items()}
+        actions = rng.integers(0, 9, size=3)
+        obs_ref, obs_vec = ref.step(actions)[0], vec.step(actions)[0]
+    assert envs["alloc"].observation_space["pyramid"].shape == (3, 3, 3)
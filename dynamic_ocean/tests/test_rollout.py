@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from agents.rollout import numba, rollout
+from envs.dynamic_ocean_env import MOVE_DELTAS, DynamicOceanEnv
+
+BACKENDS = ["numpy"] + (["numba"] if numba is not None else [])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("policy", ["greedy", "random"])
+def test_rollouts_replay_in_env(backend, policy):
+    # downhill towards the goal so greedy gets there; rounded for plenty of ties
+    rows, cols = np.indices((7, 9))
+    slope = np.hypot(rows - 5, cols - 6)
+    cost_map = np.round(slope / slope.max() + 0.1 * np.random.RandomState(0).rand(7, 9), 1)
+    starts = np.array([[0, 0], [3, 4], [6, 8], [2, 7]] * 3)
+    res = rollout(cost_map, starts, (5, 6), num_episodes=len(starts), policy=policy, max_steps=40, seed=1,
+                  record=True, backend=backend)
+    assert res.actions.shape == (len(starts), res.lengths.max())  # trimmed to the longest episode
+    assert res.success.any()
+    env = DynamicOceanEnv(cost_map, (0, 0), (5, 6), max_steps=40)
+    for i, start in enumerate(starts):
+        env.start = tuple(start)
+        obs, _ = env.reset()
+        total = 0.0
+        for t in range(res.lengths[i]):
+            a = int(res.actions[i, t])
+            if policy == "greedy":
+                # the chosen destination is a lowest-cost cell of the 3x3 patch
+                patch = obs["local_patch"][0]
+                dr, dc = res.trajectories[i, t + 1] - res.trajectories[i, t]
+                assert patch[1 + dr, 1 + dc] == patch.min()
+            obs, r, done, _, info = env.step(a)
+            total += r
+            np.testing.assert_array_equal(obs["agent_pos"], res.trajectories[i, t + 1])
+        assert done and info["success"] == res.success[i]
+        assert total == pytest.approx(res.returns[i])
+        assert (res.actions[i, res.lengths[i]:] == -1).all()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_greedy_ties_are_broken_at_random(backend):
+    res = rollout(np.ones((5, 5)), (2, 2), (0, 0), num_episodes=2000, max_steps=1, record=True, backend=backend)
+    counts = np.bincount(res.actions[:, 0], minlength=9)
+    assert counts.min() > 150  # uniform over the 9 equally cheap actions
+    assert res.trajectories is not None and rollout(np.ones((5, 5)), (2, 2), (0, 0), 3, record=False).actions is None
+
+
+def test_imports_through_the_package():
+    # from the repo root, where the envs / utils top-level packages are not importable
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    code = "from dynamic_ocean.agents.rollout import MOVE_DELTAS; print(MOVE_DELTAS.tolist())"
+    out = subprocess.run([sys.executable, "-c", code], cwd=repo_root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == str(MOVE_DELTAS.tolist())
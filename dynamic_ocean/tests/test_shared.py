@@ -0,0 +1,127 @@
+import gc
+import multiprocessing as mp
+import os
+import pickle
+import sys
+from multiprocessing import shared_memory
+
+import cloudpickle
+import numpy as np
+import pytest
+from envs.dynamic_ocean_env import DynamicOceanEnv
+from utils.data_loader import generate_random_grid, save_grid
+from utils.shared import SharedArrays, attach
+
+SMAPS = "/proc/self/smaps_rollup"
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _private_bytes():
+    total = 0
+    with open(SMAPS) as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def _worker(conn, payload):
+    # payload is a pickled (cost_map, padded_cost) pair, as an env factory would carry it
+    # a collection rewrites the GC headers of every object inherited from the parent;
+    # do it first so those copy-on-write pages are not counted as map copies
+    gc.collect()
+    before = _private_bytes()
+    cost_map, padded_cost = pickle.loads(payload)
+    env = DynamicOceanEnv(cost_map, (0, 0), (10, 10), padded_cost=padded_cost)
+    env.reset()
+    # touch every page of both maps
+    checksum = float(np.sum(env.cost_map)) + float(np.sum(env._padded_cost))
+    conn.send((_private_bytes() - before, checksum))
+    conn.close()
+
+
+def _spawned_env(conn, payload):
+    env = pickle.loads(payload)()
+    env.reset()
+    conn.send(float(np.sum(env.cost_map)))
+    conn.close()
+
+
+def _make_env_factory():
+    # the Hub loaders' shared implementation, imported as the installed package
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from dynamic_ocean.env_factory import make_env_factory
+    return make_env_factory
+
+
+def _run_workers(payload, n=3):
+    ctx = mp.get_context("fork")
+    results = []
+    for _ in range(n):
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_worker, args=(child, payload))
+        proc.start()
+        results.append(parent.recv())
+        proc.join()
+    return results
+
+
+def test_attached_arrays_are_read_only_and_pickle_as_handles():
+    with SharedArrays() as shared:
+        arr = attach(shared.publish("a", np.arange(100000.0)))
+        assert not arr.flags.writeable
+        assert len(pickle.dumps(arr)) < 1000
+        np.testing.assert_array_equal(pickle.loads(pickle.dumps(arr)), np.arange(100000.0))
+        np.testing.assert_array_equal(pickle.loads(pickle.dumps(arr[10:20])), np.arange(10.0, 20.0))
+        name = shared["a"].name
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)  # unlinked when the owner closed
+
+
+@pytest.mark.skipif(not os.path.exists(SMAPS), reason="needs /proc/self/smaps_rollup")
+def test_worker_private_memory_stays_flat():
+    cost_map = np.random.RandomState(0).rand(1024, 1024)  # 8 MB
+    padded = np.pad(cost_map, 1, mode="edge")
+    map_bytes = cost_map.nbytes + padded.nbytes
+
+    copied = _run_workers(pickle.dumps((cost_map, padded)))
+    assert all(grown > 0.9 * map_bytes for grown, _ in copied)
+
+    with SharedArrays() as shared:
+        payload = pickle.dumps((attach(shared.publish("cost", cost_map)), attach(shared.publish("padded", padded))))
+        assert len(payload) < 1000
+        attached = _run_workers(payload)
+    assert all(grown < 0.1 * map_bytes for grown, _ in attached)
+    assert [c for _, c in attached] == pytest.approx([c for _, c in copied])
+
+
+def test_owner_does_not_pickle():
+    with SharedArrays() as shared:
+        with pytest.raises(TypeError):
+            pickle.dumps(shared)
+
+
+def test_factory_survives_a_spawned_worker(tmp_path):
+    grid_path = str(tmp_path / "grid.npz")
+    save_grid(grid_path, generate_random_grid(C=2, H=16, W=16, seed=0))
+    factory = _make_env_factory()(grid_path=grid_path, share_memory=True)
+    env = factory()
+    names = [field._handle.name for field in factory.cost_to_go()]
+    payload = cloudpickle.dumps(factory)
+    assert len(payload) < 10000
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_spawned_env, args=(child, payload))
+    proc.start()
+    checksum = parent.recv()
+    proc.join()
+    assert proc.exitcode == 0
+    assert checksum == pytest.approx(float(np.sum(env.cost_map)))
+    # the worker attached without registering the segments, so its exit unlinked none
+    for name in names:
+        shared_memory.SharedMemory(name=name).close()
+    del factory
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=names[0])  # released with the factory
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from gymnasium.vector import SyncVectorEnv
+from envs.dynamic_ocean_env import DynamicOceanEnv
+from envs.vector_env import VectorDynamicOceanEnv
+from envs.cost_functions import aggregate_cost
+from utils.pathfinding import cost_to_go
+
+@pytest.mark.parametrize("shaped", [False, True])
+def test_vector_env_matches_sync_vector_env(shaped):
+    H, W, N = 6, 7, 5
+    channels = np.random.RandomState(0).rand(2, H, W)
+    cost_map = aggregate_cost(channels, [1.0, 0.5])
+    start, goal = (0, 0), (2, 2)
+    kw = {"shaping_field": cost_to_go(cost_map, goal)[0]} if shaped else {}
+    ref = SyncVectorEnv([lambda: DynamicOceanEnv(cost_map, start, goal, patch_size=3, max_steps=12, **kw)] * N)
+    env = VectorDynamicOceanEnv(cost_map, start, goal, num_envs=N, patch_size=3, max_steps=12, **kw)
+    obs_ref, _ = ref.reset()
+    obs, _ = env.reset()
+    rng = np.random.default_rng(1)
+    n_done = 0
+    for _ in range(200):
+        for k in obs_ref:
+            np.testing.assert_array_equal(obs[k], obs_ref[k])
+        actions = rng.integers(0, 9, size=N)
+        obs_ref, r_ref, term_ref, trunc_ref, info_ref = ref.step(actions)
+        obs, r, term, trunc, info = env.step(actions)
+        np.testing.assert_allclose(r, r_ref)
+        np.testing.assert_array_equal(term, term_ref)
+        np.testing.assert_array_equal(trunc, trunc_ref)
+        for i in np.flatnonzero(term):
+            n_done += 1
+            assert info["final_info"][i] == info_ref["final_info"][i]
+            for k, v in info_ref["final_observation"][i].items():
+                np.testing.assert_array_equal(info["final_observation"][i][k], v)
+    assert n_done > 0
+
+
+@pytest.mark.parametrize("layout", ["last", "first"])
+def test_vector_env_channel_observations(layout):
+    H, W, N = 6, 7, 4
+    channels = np.random.RandomState(3).rand(3, H, W)
+    cost_map = aggregate_cost(channels, [1.0, 0.5, 0.2])
+    kw = {"channels": channels, "channel_layout": layout, "patch_size": 5, "max_steps": 9}
+    ref = SyncVectorEnv([lambda: DynamicOceanEnv(cost_map, (0, 0), (2, 2), **kw)] * N)
+    env = VectorDynamicOceanEnv(cost_map, (0, 0), (2, 2), num_envs=N, **kw)
+    obs_ref, _ = ref.reset()
+    obs, _ = env.reset()
+    rng = np.random.default_rng(2)
+    for _ in range(40):
+        assert obs["local_channels"].dtype == np.float32
+        np.testing.assert_array_equal(obs["local_channels"], obs_ref["local_channels"])
+        actions = rng.integers(0, 9, size=N)
+        obs_ref, _, term, _, info_ref = ref.step(actions)
+        obs, _, _, _, info = env.step(actions)
+        for i in np.flatnonzero(term):
+            np.testing.assert_array_equal(info["final_observation"][i]["local_channels"],
+                                          info_ref["final_observation"][i]["local_channels"])
@@ -0,0 +1,198 @@
+# utils/cost_cache.py
+"""
+Content-addressed on-disk cache for cost maps and fields derived from them.
+
+An entry is a directory named by a blake2b key over everything that determines its
+contents (the grid bytes, cost weights, smoothing, transforms, ...):
+    <root>/<key>/meta.json      small JSON payload (e.g. start / goal)
+    <root>/<key>/<name>.npy     one array per name (cost map, padded map, distance fields)
+
+Arrays are returned as read-only np.memmap views, so processes on the same host that
+open the same entry share its pages in the OS page cache instead of each holding a
+private copy. Files are written to a temporary name and os.replace'd, so concurrent
+workers computing the same entry never see a partial file. Entries are evicted least
+recently used first (by directory mtime, touched on every access) once the cache is
+over max_bytes or max_entries; evicting a file that another process has mapped is safe
+on POSIX (the mapping stays valid).
+
+Usage:
+    cache = CostCache("~/.cache/dynamic_ocean", max_bytes=8 * 2**30)
+    key = cache.key(grid=file_digest(grid_path), weights=weights, smooth_sigma=1.0)
+    cost_map = cache.get_or_create(key, "cost_map", lambda: aggregate_cost(...))
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+META_FILE = "meta.json"
+# salted into every key; bump when the entry layout or the meaning of a cached array changes,
+# so stale entries written by older code are never read back
+CACHE_FORMAT = "dynamic_ocean.cost_cache/2"
+_BLOCK = 1 << 20
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=20)
+
+
+def file_digest(path) -> str:
+    """Digest of a file's bytes, or of every file under a directory (e.g. a chunked grid store)."""
+    path = Path(path)
+    h = _new_hash()
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for f in files:
+        if path.is_dir():
+            h.update(str(f.relative_to(path)).encode())
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(_BLOCK), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def array_digest(arr: np.ndarray) -> str:
+    """Digest of an array's dtype, shape and contents."""
+    arr = np.ascontiguousarray(arr)
+    h = _new_hash()
+    h.update(f"{arr.dtype.str}{arr.shape}".encode())
+    h.update(memoryview(arr).cast("B"))
+    return h.hexdigest()
+
+
+def callable_token(fn: Callable) -> str:
+    """Stable token for a transform: its qualified name plus a digest of its bytecode and constants."""
+    name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return name
+    h = _new_hash()
+    h.update(code.co_code)
+    h.update(repr(code.co_consts).encode())
+    return f"{name}:{h.hexdigest()}"
+
+
+def _canonical(value):
+    if callable(value):
+        return callable_token(value)
+    if isinstance(value, np.ndarray):
+        return array_digest(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+class CostCache:
+    def __init__(self, root, max_bytes: Optional[int] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            root: cache directory (created if missing)
+            max_bytes: evict least recently used entries while the cache is larger than this
+            max_entries: evict least recently used entries while there are more than this
+        """
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(**parts) -> str:
+        """blake2b key over CACHE_FORMAT and keyword parts (arrays, callables and nested containers allowed)."""
+        payload = json.dumps([CACHE_FORMAT, _canonical(parts)], sort_keys=True, default=repr)
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def entry(self, key: str) -> Path:
+        return self.root / key
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self.entry(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str, name: str) -> Optional[np.ndarray]:
+        """Read-only memmap of array `name` in entry `key`, or None if not cached."""
+        try:
+            arr = np.load(self.entry(key) / f"{name}.npy", mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        self._touch(key)
+        return arr
+
+    def put(self, key: str, name: str, array: np.ndarray) -> np.ndarray:
+        """Store `array` as `name` in entry `key` and return it as a read-only memmap."""
+        entry = self.entry(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        tmp = entry / f".{name}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.ascontiguousarray(array))
+        os.replace(tmp, entry / f"{name}.npy")
+        self._touch(key)
+        self.evict(keep=key)
+        return np.load(entry / f"{name}.npy", mmap_mode="r")
+
+    def get_or_create(self, key: str, name: str, create: Callable[[], np.ndarray]) -> np.ndarray:
+        arr = self.get(key, name)
+        if arr is None:
+            arr = self.put(key, name, create())
+        return arr
+
+    def get_meta(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.entry(key) / META_FILE) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._touch(key)
+        return meta
+
+    def put_meta(self, key: str, meta: dict):
+        entry = self.entry(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        tmp = entry / f".{META_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(_canonical(meta), f)
+        os.replace(tmp, entry / META_FILE)
+        self._touch(key)
+
+    def entries(self):
+        """[(key, size in bytes, last access time)], least recently used first."""
+        out = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                out.append((entry.name, size, entry.stat().st_mtime))
+            except FileNotFoundError:
+                continue  # evicted concurrently
+        return sorted(out, key=lambda e: e[2])
+
+    def evict(self, keep: Optional[str] = None):
+        """Drop least recently used entries (never `keep`) until within max_bytes / max_entries."""
+        if self.max_bytes is None and self.max_entries is None:
+            return
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for key, size, _ in entries:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_bytes or over_count):
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.entry(key), ignore_errors=True)
+            total -= size
+            count -= 1
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            shutil.rmtree(self.entry(key), ignore_errors=True)
@@ -1,6 +1,11 @@
 """
 Utilities to generate sample grids and load saved grids.
 
+Grids are stored either as a single compressed .npz (channels + pickled meta) or as a
+chunked, memory-mapped directory store (see utils.grid_store) for large regions;
+load_grid detects the format. convert_netcdf_streaming regrids netCDF fields straight
+into a chunked store without loading them whole.
+
 Run:
     python -m utils.data_loader --generate-sample --out data/sample_grid.npz
 """
@@ -11,6 +16,8 @@ import xarray as xr
 from pathlib import Path
 from typing import Optional
 
+from .grid_store import ChunkedGrid, is_chunked_grid
+
 
 def generate_random_grid(C=3, H=64, W=64, obstacle_prob=0.03, seed: Optional[int] = None):
     rng = np.random.default_rng(seed)
@@ -22,20 +29,63 @@ def generate_random_grid(C=3, H=64, W=64, obstacle_prob=0.03, seed: Optional[int
     return channels
 
 
-def save_grid(path: str, channels: np.ndarray, meta: dict = None):
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
+def save_grid(path: str, channels: np.ndarray, meta: dict = None, format: Optional[str] = None, chunks=None):
+    """
+    Save a (C, H, W) (or (T, C, H, W)) grid.
+
+    Args:
+        path: output path
+        channels: grid array
+        meta: metadata dict (must be JSON serializable for the chunked format)
+        format: 'npz' or 'chunked'; default 'chunked' if path ends with '.grid', else 'npz'
+        chunks: chunk shape for the chunked format (default 1 per leading dim, 256x256 spatial)
+    """
+    if format is None:
+        format = "chunked" if str(path).endswith(".grid") else "npz"
     if meta is None:
         meta = {}
+    if format == "chunked":
+        store = ChunkedGrid.create(path, channels.shape, dtype=channels.dtype, chunks=chunks, meta=meta)
+        store[...] = channels
+        return
+    if format != "npz":
+        raise ValueError(f"unknown grid format {format!r}")
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
     np.savez_compressed(path, channels=channels, meta=meta)
 
 
-def load_grid(path: str):
+def load_grid(path: str, channels=None, window=None):
+    """
+    Load a grid saved by save_grid (format detected from `path`).
+
+    Args:
+        path: .npz file or chunked store directory
+        channels: optional channel selection (int, slice or list of indices, axis -3)
+        window: optional (row_slice, col_slice) spatial window
+    For chunked stores only the chunks overlapping the selection are read; .npz files
+    are always read whole and then sliced.
+
+    Returns:
+        (channels array, meta dict)
+    """
+    if is_chunked_grid(path):
+        store = ChunkedGrid(path)
+        return store.read(channels=channels, window=window), store.meta
     data = np.load(path, allow_pickle=True)
-    channels = data["channels"]
+    arr = data["channels"]
     meta = data.get("meta", {})
     if hasattr(meta, "item"):
         meta = meta.item()
-    return channels, meta
+    if channels is not None:
+        arr = arr[..., channels, :, :] if not isinstance(channels, (list, tuple)) else arr[..., list(channels), :, :]
+    if window is not None:
+        arr = arr[..., window[0], window[1]]
+    return arr, meta
+
+
+def open_grid(path: str) -> ChunkedGrid:
+    """Open a chunked store for lazy, sliceable access (e.g. as CostSeries frames)."""
+    return ChunkedGrid(path)
 
 
 def convert_netcdf_to_grid(nc_path: str, varnames: list, time_index: int = 0):
@@ -43,7 +93,8 @@ def convert_netcdf_to_grid(nc_path: str, varnames: list, time_index: int = 0):
     Convert a netCDF (xarray) with lat/lon grid into a simple (C,H,W) array.
     - varnames: list of variable names to extract (e.g. ['hs','current_mag'])
     - time_index: index along the time dimension to take a single snapshot
-    Note: This is intentionally simple. For production you should handle regridding and projections.
+    Note: This reads the whole snapshot into memory and does no regridding; see
+    convert_netcdf_streaming for large files, many time steps and regridding.
     """
     ds = xr.open_dataset(nc_path)
     channels = []
@@ -56,6 +107,93 @@ def convert_netcdf_to_grid(nc_path: str, varnames: list, time_index: int = 0):
     return channels
 
 
+def convert_netcdf_streaming(
+    nc_path: str,
+    varnames: list,
+    out_path: str,
+    time_indices=None,
+    target_lat=None,
+    target_lon=None,
+    block_rows: Optional[int] = None,
+    chunks=None,
+    dtype=float,
+    lat_name: str = "lat",
+    lon_name: str = "lon",
+    time_name: str = "time",
+):
+    """
+    Stream a netCDF file into a chunked grid store (see utils.grid_store), block by block.
+
+    The dataset is opened lazily and each (time step, variable, block of target rows) is
+    read and regridded on its own, so memory stays bounded by one block of source rows
+    regardless of the file size. Regridding is bilinear interpolation onto the target
+    lat/lon axes (xarray .interp); without target axes the native grid is copied.
+
+    Args:
+        nc_path: input netCDF path
+        varnames: variables to extract, in channel order
+        out_path: output store directory (e.g. 'data/region.grid')
+        time_indices: None (all steps), an int (single snapshot) or a list of indices
+        target_lat, target_lon: 1D target coordinates; both None keeps the native grid
+        block_rows: target rows processed per block (default: the store's row chunk, so
+            every block write replaces whole chunks)
+        chunks: chunk shape of the output store (default 1 per leading dim, 256x256)
+        dtype: output dtype (float32 halves the output size)
+        lat_name, lon_name, time_name: coordinate names in the dataset
+
+    Returns:
+        ChunkedGrid of shape (T, C, H, W), or (C, H, W) if time_indices is an int
+    """
+    with xr.open_dataset(nc_path) as ds:
+        for var in varnames:
+            if var not in ds:
+                raise KeyError(f"{var} not in {nc_path}")
+        src_lat = ds[lat_name].values
+        src_lon = ds[lon_name].values
+        regrid = target_lat is not None or target_lon is not None
+        lat = np.asarray(target_lat if target_lat is not None else src_lat, dtype=float)
+        lon = np.asarray(target_lon if target_lon is not None else src_lon, dtype=float)
+
+        single = isinstance(time_indices, (int, np.integer))
+        if time_indices is None:
+            times = list(range(ds.sizes[time_name])) if time_name in ds.dims else [None]
+        else:
+            times = [int(time_indices)] if single else [int(t) for t in time_indices]
+        C, H, W = len(varnames), len(lat), len(lon)
+        shape = (C, H, W) if single else (len(times), C, H, W)
+        meta = {"source": str(nc_path), "varnames": list(varnames), "lat": lat.tolist(), "lon": lon.tolist()}
+        if not single:
+            meta["time_indices"] = times
+        store = ChunkedGrid.create(out_path, shape, dtype=dtype, chunks=chunks, meta=meta)
+        block_rows = block_rows or store.chunks[-2]
+
+        ascending = src_lat[0] <= src_lat[-1]
+        for ti, t in enumerate(times):
+            for ci, var in enumerate(varnames):
+                da = ds[var] if t is None else ds[var].isel({time_name: t})
+                for r0 in range(0, H, block_rows):
+                    r1 = min(r0 + block_rows, H)
+                    if regrid:
+                        # source rows bracketing this block of target latitudes
+                        lo, hi = lat[r0:r1].min(), lat[r0:r1].max()
+                        if ascending:
+                            i0 = max(np.searchsorted(src_lat, lo, side="right") - 1, 0)
+                            i1 = min(np.searchsorted(src_lat, hi, side="left") + 1, len(src_lat))
+                        else:
+                            i0 = max(len(src_lat) - np.searchsorted(src_lat[::-1], hi, side="left") - 1, 0)
+                            i1 = min(len(src_lat) - np.searchsorted(src_lat[::-1], lo, side="right") + 1, len(src_lat))
+                        block = da.isel({lat_name: slice(i0, i1)}).load()
+                        block = block.interp({lat_name: lat[r0:r1], lon_name: lon})
+                    else:
+                        block = da.isel({lat_name: slice(r0, r1)}).load()
+                    values = block.transpose(lat_name, lon_name).values
+                    if single:
+                        store[ci, r0:r1, :] = values
+                    else:
+                        store[ti, ci, r0:r1, :] = values
+    return store
+
+
 def _cli():
     parser = argparse.ArgumentParser(description="Data loader for dynamic-ocean-fields hub")
     parser.add_argument("--generate-sample", action="store_true", help="Generate a random sample grid")
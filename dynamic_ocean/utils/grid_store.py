@@ -0,0 +1,194 @@
+# utils/grid_store.py
+"""
+Chunked, memory-mapped on-disk grid store.
+
+A store is a directory:
+    <path>/grid.json          metadata sidecar: shape, dtype, chunk shape, fill value, user meta
+    <path>/chunks/i.j.k.npy   one raw .npy file per chunk, named by its chunk index
+
+Chunks are opened with np.load(mmap_mode='r'), so reading a spatial window or a
+subset of channels only touches the chunk files (and pages) it overlaps. Chunks
+that were never written read as fill_value.
+
+Usage:
+    grid = ChunkedGrid.create("data/region.grid", shape=(4, 4096, 4096), chunks=(1, 512, 512))
+    grid[0] = wave_height                # (H, W)
+    patch = grid[:, 1000:1200, 300:500]  # (4, 200, 200), reads 4 * 1 chunk
+"""
+
+import itertools
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+META_FILE = "grid.json"
+CHUNK_DIR = "chunks"
+FORMAT_VERSION = 1
+DEFAULT_SPATIAL_CHUNK = 256
+
+
+def is_chunked_grid(path) -> bool:
+    return (Path(path) / META_FILE).is_file()
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"meta value of type {type(obj).__name__} is not JSON serializable")
+
+
+class ChunkedGrid:
+    """N-D array stored as a directory of .npy chunks; leading dims are typically (T,) C, trailing H, W."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / META_FILE) as f:
+            info = json.load(f)
+        if info.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} was written by a newer grid store version")
+        self.shape = tuple(info["shape"])
+        self.dtype = np.dtype(info["dtype"])
+        self.chunks = tuple(info["chunks"])
+        self.fill_value = info.get("fill_value", 0.0)
+        self.meta = info.get("meta", {})
+
+    @classmethod
+    def create(
+        cls,
+        path,
+        shape: Tuple[int, ...],
+        dtype=float,
+        chunks: Optional[Tuple[int, ...]] = None,
+        meta: Optional[dict] = None,
+        fill_value: float = 0.0,
+    ) -> "ChunkedGrid":
+        """Create an empty store (overwriting an existing one at `path`, chunks included)."""
+        shape = tuple(int(n) for n in shape)
+        if chunks is None:
+            chunks = tuple(1 for _ in shape[:-2]) + tuple(min(n, DEFAULT_SPATIAL_CHUNK) for n in shape[-2:])
+        chunks = tuple(int(n) for n in chunks)
+        assert len(chunks) == len(shape), "chunks must have one entry per dimension"
+        assert all(n >= 1 for n in chunks), "chunk sizes must be >= 1"
+        path = Path(path)
+        # chunks of a previous store would otherwise show through the new one
+        shutil.rmtree(path / CHUNK_DIR, ignore_errors=True)
+        (path / CHUNK_DIR).mkdir(parents=True, exist_ok=True)
+        info = {
+            "format_version": FORMAT_VERSION,
+            "shape": list(shape),
+            "dtype": np.dtype(dtype).str,
+            "chunks": list(chunks),
+            "fill_value": fill_value,
+            "meta": meta or {},
+        }
+        tmp = path / (META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(info, f, indent=2, default=_json_default)
+        os.replace(tmp, path / META_FILE)
+        return cls(path)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def chunk_path(self, index: Tuple[int, ...]) -> Path:
+        return self.path / CHUNK_DIR / (".".join(str(i) for i in index) + ".npy")
+
+    def _normalize(self, key):
+        # -> list of (start, stop) per dim, and which dims are dropped (integer index)
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = next(j for j, k in enumerate(key) if k is Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1 :]
+        if len(key) > self.ndim:
+            raise IndexError(f"too many indices for grid of dimension {self.ndim}")
+        key = key + (slice(None),) * (self.ndim - len(key))
+        bounds, dropped = [], []
+        for k, n in zip(key, self.shape):
+            if isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                if step != 1:
+                    raise IndexError("grid store slices must have step 1")
+                bounds.append((start, max(start, stop)))
+                dropped.append(False)
+            else:
+                i = int(k)
+                if i < 0:
+                    i += n
+                if not 0 <= i < n:
+                    raise IndexError(f"index {k} out of range for size {n}")
+                bounds.append((i, i + 1))
+                dropped.append(True)
+        return bounds, dropped
+
+    def _chunk_overlaps(self, bounds):
+        """Yield (chunk index, slices into the chunk, slices into the selection)."""
+        ranges = [range(lo // ch, (hi - 1) // ch + 1) if hi > lo else range(0)
+                  for (lo, hi), ch in zip(bounds, self.chunks)]
+        for index in itertools.product(*ranges):
+            in_chunk, in_sel = [], []
+            for i, (lo, hi), ch in zip(index, bounds, self.chunks):
+                c0 = i * ch
+                a, b = max(lo, c0), min(hi, c0 + ch)
+                in_chunk.append(slice(a - c0, b - c0))
+                in_sel.append(slice(a - lo, b - lo))
+            yield index, tuple(in_chunk), tuple(in_sel)
+
+    def _chunk_shape(self, index):
+        return tuple(min(ch, n - i * ch) for i, ch, n in zip(index, self.chunks, self.shape))
+
+    def __getitem__(self, key) -> np.ndarray:
+        bounds, dropped = self._normalize(key)
+        out = np.empty(tuple(hi - lo for lo, hi in bounds), dtype=self.dtype)
+        for index, in_chunk, in_sel in self._chunk_overlaps(bounds):
+            path = self.chunk_path(index)
+            if path.exists():
+                out[in_sel] = np.load(path, mmap_mode="r")[in_chunk]
+            else:
+                out[in_sel] = self.fill_value
+        return out.reshape(tuple(n for n, d in zip(out.shape, dropped) if not d))
+
+    def __setitem__(self, key, value):
+        bounds, dropped = self._normalize(key)
+        sel_shape = tuple(hi - lo for lo, hi in bounds)
+        # value is shaped like the selection without its integer-indexed dims
+        squeezed = tuple(n for n, d in zip(sel_shape, dropped) if not d)
+        value = np.broadcast_to(np.asarray(value, dtype=self.dtype), squeezed).reshape(sel_shape)
+        for index, in_chunk, in_sel in self._chunk_overlaps(bounds):
+            path = self.chunk_path(index)
+            chunk_shape = self._chunk_shape(index)
+            full = all(s.stop - s.start == n for s, n in zip(in_chunk, chunk_shape))
+            if full:
+                chunk = np.ascontiguousarray(value[in_sel])
+            else:
+                # partial update: read-modify-write this chunk only
+                if path.exists():
+                    chunk = np.load(path)
+                else:
+                    chunk = np.full(chunk_shape, self.fill_value, dtype=self.dtype)
+                chunk[in_chunk] = value[in_sel]
+            tmp = path.with_name(path.name + ".tmp.npy")
+            np.save(tmp, chunk)
+            os.replace(tmp, path)
+
+    def read(self, channels=None, window=None) -> np.ndarray:
+        """
+        Read a (..., C, h, w) selection.
+
+        Args:
+            channels: None (all), an int, a slice, or a list of channel indices (axis -3)
+            window: None (full extent) or (row_slice, col_slice)
+        """
+        rows, cols = window if window is not None else (slice(None), slice(None))
+        lead = (slice(None),) * (self.ndim - 3)
+        if channels is None or isinstance(channels, (int, np.integer, slice)):
+            key = lead + (slice(None) if channels is None else channels, rows, cols)
+            return self[key]
+        return np.stack([self[lead + (int(c), rows, cols)] for c in channels], axis=-3)
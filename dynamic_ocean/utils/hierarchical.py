@@ -0,0 +1,322 @@
+# utils/hierarchical.py
+"""
+Hierarchical (HPA*-style) planning on large cost maps, layered on utils.pathfinding.
+
+The map is cut into cluster x cluster tiles. Along each border between two tiles the
+passable (finite-cost) cells are split into entrances of at most `entrance` cells, and
+each entrance gets one transition: its cheapest pair of facing cells. Transition cells
+are the nodes of an abstract graph with
+- inter edges across a border (the fine-grid step between the two facing cells), and
+- intra edges between the nodes of one tile, weighted by the optimal path cost inside
+  that tile (one Dijkstra per node, over the tile only).
+
+A query connects start and goal to the nodes of their tiles, runs A* on the abstract
+graph, and refines the abstract path on the fine grid. The path is cut into legs of
+`span` abstract nodes, and each leg is re-planned with astar_grid restricted to the tiles
+it passes through (plus `corridor` tiles around them), so only a corridor of the grid is
+searched. The result is a valid fine-grid path. Its cost is at least the optimum and
+usually within a few percent of it, because each leg must pass through abstract nodes.
+
+The abstraction is built once and reused by every query. set_region() changes part of
+the map and rebuilds only the tiles it touches and their neighbours.
+"""
+
+import heapq
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .pathfinding import _resolve_backend, _search_flat, astar_grid
+
+Cell = Tuple[int, int]
+Tile = Tuple[int, int]
+
+
+class HierarchicalPlanner:
+    def __init__(
+        self,
+        cost_map: np.ndarray,
+        cluster: int = 64,
+        entrance: int = 16,
+        span: int = 4,
+        corridor: int = 0,
+        backend: str = "auto",
+    ):
+        """
+        Args:
+            cost_map: 2D array (H, W); non-finite cells are impassable (the planner keeps a copy)
+            cluster: tile edge length in cells
+            entrance: longest run of border cells that shares one transition
+            span: abstract nodes per refinement leg
+            corridor: tiles added around each leg's tiles when refining
+            backend: search backend, as for astar_grid
+        """
+        self.cost_map = np.array(cost_map, dtype=float)
+        assert self.cost_map.ndim == 2, "cost_map must be 2D"
+        assert cluster >= 2 and entrance >= 1 and span >= 1 and corridor >= 0
+        self.cluster = cluster
+        self.entrance = entrance
+        self.span = span
+        self.corridor = corridor
+        self.backend = _resolve_backend(backend)
+        H, W = self.cost_map.shape
+        self.tiles = (-(-H // cluster), -(-W // cluster))
+
+        # abstract graph: node cell -> {neighbour cell: edge cost}
+        self.graph: Dict[Cell, Dict[Cell, float]] = {}
+        # edges by origin, so a rebuild can drop exactly what it replaces
+        self._border_edges: Dict[tuple, List[tuple]] = {}
+        self._tile_edges: Dict[Tile, List[tuple]] = {}
+
+        t0 = time.perf_counter()
+        self._rebuild({(i, j) for i in range(self.tiles[0]) for j in range(self.tiles[1])})
+        self._update_min_cost()
+        self.build_seconds = time.perf_counter() - t0
+
+    # --- abstraction ---------------------------------------------------------
+
+    def _tile_of(self, cell: Cell) -> Tile:
+        return cell[0] // self.cluster, cell[1] // self.cluster
+
+    def _tile_box(self, tile: Tile):
+        H, W = self.cost_map.shape
+        cl = self.cluster
+        return tile[0] * cl, min((tile[0] + 1) * cl, H), tile[1] * cl, min((tile[1] + 1) * cl, W)
+
+    def _borders(self, tile: Tile):
+        # a border is (tile, axis): axis 0 faces the tile below, axis 1 the tile to the right
+        i, j = tile
+        out = []
+        if i + 1 < self.tiles[0]:
+            out.append(((i, j), 0))
+        if j + 1 < self.tiles[1]:
+            out.append(((i, j), 1))
+        if i > 0:
+            out.append(((i - 1, j), 0))
+        if j > 0:
+            out.append(((i, j - 1), 1))
+        return out
+
+    @staticmethod
+    def _far_side(border) -> Tile:
+        (i, j), axis = border
+        return (i + 1, j) if axis == 0 else (i, j + 1)
+
+    def _transitions(self, border) -> List[tuple]:
+        """Inter edges (a, b, cost) across a border, one per entrance."""
+        tile, axis = border
+        r0, r1, c0, c1 = self._tile_box(tile)
+        if axis == 0:
+            a_cells = [(r1 - 1, c) for c in range(c0, c1)]
+            b_cells = [(r1, c) for c in range(c0, c1)]
+        else:
+            a_cells = [(r, c1 - 1) for r in range(r0, r1)]
+            b_cells = [(r, c1) for r in range(r0, r1)]
+        a = self.cost_map[tuple(np.array(a_cells).T)]
+        b = self.cost_map[tuple(np.array(b_cells).T)]
+        passable = np.isfinite(a) & np.isfinite(b)
+        pair = a + b
+
+        edges = []
+        k, n = 0, len(a_cells)
+        while k < n:
+            if not passable[k]:
+                k += 1
+                continue
+            end = k
+            while end < n and passable[end]:
+                end += 1
+            # split the run into entrances of at most `entrance` cells
+            for piece in np.array_split(np.arange(k, end), -(-(end - k) // self.entrance)):
+                m = int(piece[np.argmin(pair[piece])])
+                edges.append((a_cells[m], b_cells[m], 0.5 * float(pair[m])))
+            k = end
+        return edges
+
+    def _tile_nodes(self, tile: Tile) -> List[Cell]:
+        nodes = set()
+        for border in self._borders(tile):
+            side = 0 if border[0] == tile else 1
+            nodes.update(edge[side] for edge in self._border_edges.get(border, ()))
+        return sorted(nodes)
+
+    def _dist_in_tile(self, tile: Tile, cell: Cell) -> np.ndarray:
+        """Optimal costs from `cell` to every cell of `tile`, moving inside the tile only."""
+        r0, r1, c0, c1 = self._tile_box(tile)
+        g, _, _ = _search_flat(self.cost_map[r0:r1, c0:c1], (cell[0] - r0, cell[1] - c0), None, 0, self.backend)
+        return np.asarray(g, dtype=float).reshape(r1 - r0, c1 - c0)
+
+    def _intra_edges(self, tile: Tile) -> List[tuple]:
+        r0, _, c0, _ = self._tile_box(tile)
+        nodes = self._tile_nodes(tile)
+        edges = []
+        for k, u in enumerate(nodes[:-1]):
+            dist = self._dist_in_tile(tile, u)
+            for v in nodes[k + 1 :]:
+                d = dist[v[0] - r0, v[1] - c0]
+                if np.isfinite(d):
+                    edges.append((u, v, float(d)))
+        return edges
+
+    def _link(self, edges):
+        for u, v, w in edges:
+            self.graph.setdefault(u, {})[v] = w
+            self.graph.setdefault(v, {})[u] = w
+
+    def _unlink(self, edges):
+        for u, v, _ in edges:
+            for a, b in ((u, v), (v, u)):
+                nbrs = self.graph.get(a)
+                if nbrs is not None:
+                    nbrs.pop(b, None)
+                    if not nbrs:
+                        del self.graph[a]
+
+    def _rebuild(self, tiles):
+        """Recompute the transitions on every border of `tiles` and the intra edges they affect."""
+        borders = {border for tile in tiles for border in self._borders(tile)}
+        # tiles across a changed border gain or lose nodes, so their intra edges change too
+        affected = set(tiles) | {self._far_side(b) for b in borders} | {b[0] for b in borders}
+        for border in borders:
+            self._unlink(self._border_edges.pop(border, ()))
+        for tile in affected:
+            self._unlink(self._tile_edges.pop(tile, ()))
+        for border in borders:
+            self._border_edges[border] = self._transitions(border)
+            self._link(self._border_edges[border])
+        for tile in affected:
+            self._tile_edges[tile] = self._intra_edges(tile)
+            self._link(self._tile_edges[tile])
+
+    def _update_min_cost(self):
+        finite = self.cost_map[np.isfinite(self.cost_map)]
+        # admissible scale for the octile heuristic on the abstract graph
+        self.min_cost = max(float(finite.min()), 0.0) if finite.size else 0.0
+
+    def set_region(self, r0: int, c0: int, values: np.ndarray):
+        """Overwrite cost_map[r0:r0+h, c0:c0+w] and rebuild the abstraction around it."""
+        values = np.asarray(values, dtype=float)
+        h, w = values.shape
+        self.cost_map[r0 : r0 + h, c0 : c0 + w] = values
+        cl = self.cluster
+        tiles = {(i, j) for i in range(r0 // cl, (r0 + h - 1) // cl + 1) for j in range(c0 // cl, (c0 + w - 1) // cl + 1)}
+        self._rebuild(tiles)
+        self._update_min_cost()
+
+    # --- queries -------------------------------------------------------------
+
+    def _abstract_path(self, start: Cell, goal: Cell, stats: Optional[dict]):
+        # temporary edges joining start and goal to the nodes of their tiles
+        extra: Dict[Cell, Dict[Cell, float]] = {}
+        for cell in (start, goal):
+            tile = self._tile_of(cell)
+            r0, _, c0, _ = self._tile_box(tile)
+            dist = self._dist_in_tile(tile, cell)
+            targets = self._tile_nodes(tile)
+            if cell == start and self._tile_of(goal) == tile:
+                targets.append(goal)
+            for v in targets:
+                d = dist[v[0] - r0, v[1] - c0]
+                if v != cell and np.isfinite(d):
+                    extra.setdefault(cell, {})[v] = float(d)
+                    extra.setdefault(v, {})[cell] = float(d)
+
+        def h(cell):
+            dr, dc = abs(cell[0] - goal[0]), abs(cell[1] - goal[1])
+            return self.min_cost * (max(dr, dc) - min(dr, dc) + math.sqrt(2) * min(dr, dc))
+
+        g = {start: 0.0}
+        prev = {start: None}
+        closed = set()
+        heap = [(h(start), start)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u == goal:
+                break
+            if u in closed:
+                continue
+            closed.add(u)
+            for nbrs in (self.graph.get(u, {}), extra.get(u, {})):
+                for v, w in nbrs.items():
+                    ng = g[u] + w
+                    if ng < g.get(v, math.inf):
+                        g[v] = ng
+                        prev[v] = u
+                        heapq.heappush(heap, (ng + h(v), v))
+        if stats is not None:
+            stats.update(abstract_expanded=len(closed), abstract_cost=g.get(goal, math.inf))
+        if goal not in g:
+            return None
+        path = [goal]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        return path[::-1]
+
+    def _refine_leg(self, nodes: List[Cell]):
+        tiles = {self._tile_of(cell) for cell in nodes}
+        k = self.corridor
+        if k:
+            tiles = {
+                (i + di, j + dj)
+                for i, j in tiles
+                for di in range(-k, k + 1)
+                for dj in range(-k, k + 1)
+                if 0 <= i + di < self.tiles[0] and 0 <= j + dj < self.tiles[1]
+            }
+        # the corridor's bounding box, impassable outside the corridor tiles
+        R0 = min(self._tile_box(t)[0] for t in tiles)
+        R1 = max(self._tile_box(t)[1] for t in tiles)
+        C0 = min(self._tile_box(t)[2] for t in tiles)
+        C1 = max(self._tile_box(t)[3] for t in tiles)
+        local = np.full((R1 - R0, C1 - C0), np.inf)
+        cells = 0
+        for t in tiles:
+            r0, r1, c0, c1 = self._tile_box(t)
+            local[r0 - R0 : r1 - R0, c0 - C0 : c1 - C0] = self.cost_map[r0:r1, c0:c1]
+            cells += (r1 - r0) * (c1 - c0)
+        a, b = nodes[0], nodes[-1]
+        path, cost = astar_grid(local, (a[0] - R0, a[1] - C0), (b[0] - R0, b[1] - C0), heuristic="octile",
+                                backend=self.backend)
+        path = [(r + R0, c + C0) for r, c in path] if path is not None else None
+        return path, cost, cells
+
+    def plan(self, start: Cell, goal: Cell, stats: Optional[dict] = None):
+        """
+        Plan from start to goal through the abstraction, refined on the fine grid.
+
+        Args:
+            start, goal: (row, col)
+            stats: optional dict filled with 'abstract_nodes', 'abstract_expanded',
+                'abstract_cost', 'legs', 'corridor_cells' and 'seconds'
+
+        Returns:
+            path: list of (r, c) or None if no path was found
+            cost: total cost (inf if no path)
+        """
+        t0 = time.perf_counter()
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        if stats is not None:
+            stats.update(abstract_nodes=len(self.graph), legs=0, corridor_cells=0)
+        if start == goal:
+            path, cost = [start], 0.0
+        else:
+            abstract = self._abstract_path(start, goal, stats)
+            path, cost = (None, math.inf) if abstract is None else ([start], 0.0)
+            if abstract is not None:
+                cuts = list(range(0, len(abstract) - 1, self.span)) + [len(abstract) - 1]
+                for a, b in zip(cuts, cuts[1:]):
+                    leg, leg_cost, cells = self._refine_leg(abstract[a : b + 1])
+                    if stats is not None:
+                        stats["legs"] += 1
+                        stats["corridor_cells"] += cells
+                    if leg is None:
+                        path, cost = None, math.inf
+                        break
+                    path.extend(leg[1:])
+                    cost += leg_cost
+        if stats is not None:
+            stats["seconds"] = time.perf_counter() - t0
+        return path, cost
@@ -0,0 +1,331 @@
+# utils/incremental.py
+"""
+Incremental replanning with D* Lite for cost maps that change during a voyage.
+
+IncrementalPlanner searches from the goal towards the agent and keeps its search state
+(g / rhs per cell and the open list) between calls. When part of the map changes, only
+the affected cells are re-examined and the search repairs the previous solution instead
+of starting over; when the agent moves, the start is moved without re-searching (the
+key modifier km keeps the old queue keys valid). Edges are the 8-neighbour averaged-cost
+edges of utils.pathfinding, non-finite cells are impassable, and the heuristic is the
+admissible octile distance scaled by the smallest cell cost, so every plan has the
+optimal cost (the same cost as astar_grid / dijkstra_grid on the current map).
+
+    planner = IncrementalPlanner(cost_map, start, goal)
+    path, cost = planner.plan()
+    planner.move_to(path[5])                    # agent underway
+    planner.set_region(r0, c0, new_costs)       # new forecast for part of the map
+    path, cost = planner.plan()                 # repaired, not replanned
+
+Reference: S. Koenig and M. Likhachev, "D* Lite", AAAI 2002 (the optimized version).
+"""
+
+import collections
+import heapq
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .pathfinding import _NB_DC, _NB_DR, _NB_MULT, _SQRT2_M1, _resolve_backend, min_cell_cost, numba
+
+Cell = Tuple[int, int]
+
+
+def _dstar_kernel(cost, g, rhs, key1, key2, in_open, H, W, start, goal, km, hscale, open_idx, dirty,
+                  nb_dr, nb_dc, nb_mult):
+    """
+    D* Lite ComputeShortestPath over flat arrays (index r*W + c), searching from `goal`.
+    The open list is stored as in_open flags with keys (key1, key2); `open_idx` lists the
+    open cells on entry and the heap is rebuilt from them. `dirty` lists cells whose edge
+    costs changed since the last call; their rhs is recomputed first.
+    Returns n_expanded. Written to compile unchanged under numba.njit.
+    """
+    sr = start // W
+    sc = start - sr * W
+    # the sentinel is the key of an empty queue
+    heap = [(math.inf, math.inf, -1)]
+    for i in open_idx:
+        heap.append((key1[i], key2[i], i))
+    heapq.heapify(heap)
+
+    def h(u):
+        dr = abs(u // W - sr)
+        dc = abs(u - (u // W) * W - sc)
+        return hscale * (max(dr, dc) + _SQRT2_M1 * min(dr, dc))
+
+    def best_rhs(u):
+        r = u // W
+        c = u - r * W
+        best = math.inf
+        for k in range(8):
+            nr = r + nb_dr[k]
+            nc = c + nb_dc[k]
+            if nr < 0 or nr >= H or nc < 0 or nc >= W:
+                continue
+            v = nr * W + nc
+            d = nb_mult[k] * 0.5 * (cost[u] + cost[v]) + g[v]
+            if d < best:
+                best = d
+        return best
+
+    def update_vertex(u):
+        if g[u] != rhs[u]:
+            m = min(g[u], rhs[u])
+            key1[u] = m + h(u) + km
+            key2[u] = m
+            in_open[u] = 1
+            heapq.heappush(heap, (key1[u], key2[u], u))
+        else:
+            in_open[u] = 0
+
+    for u in dirty:
+        if u != goal:
+            rhs[u] = best_rhs(u)
+        update_vertex(u)
+
+    n_expanded = 0
+    while True:
+        k1, k2, u = heap[0]
+        if u >= 0 and (not in_open[u] or k1 != key1[u] or k2 != key2[u]):
+            heapq.heappop(heap)  # stale entry
+            continue
+        m = min(g[start], rhs[start])
+        s1 = m + h(start) + km
+        if not ((k1, k2) < (s1, m) or rhs[start] > g[start]) or u < 0:
+            break
+        m = min(g[u], rhs[u])
+        n1 = m + h(u) + km
+        if (k1, k2) < (n1, m):
+            key1[u] = n1
+            key2[u] = m
+            heapq.heapreplace(heap, (n1, m, u))
+            continue
+        heapq.heappop(heap)
+        n_expanded += 1
+        r = u // W
+        c = u - r * W
+        if g[u] > rhs[u]:
+            # overconsistent: settle u and relax its neighbours
+            g[u] = rhs[u]
+            in_open[u] = 0
+            for k in range(8):
+                nr = r + nb_dr[k]
+                nc = c + nb_dc[k]
+                if nr < 0 or nr >= H or nc < 0 or nc >= W:
+                    continue
+                v = nr * W + nc
+                if v != goal:
+                    d = nb_mult[k] * 0.5 * (cost[u] + cost[v]) + g[u]
+                    if d < rhs[v]:
+                        rhs[v] = d
+                update_vertex(v)
+        else:
+            # underconsistent: u got more expensive, re-derive it and its dependants
+            g_old = g[u]
+            g[u] = math.inf
+            for k in range(9):
+                if k < 8:
+                    nr = r + nb_dr[k]
+                    nc = c + nb_dc[k]
+                    if nr < 0 or nr >= H or nc < 0 or nc >= W:
+                        continue
+                    v = nr * W + nc
+                    through_u = nb_mult[k] * 0.5 * (cost[u] + cost[v]) + g_old
+                else:
+                    v = u
+                    through_u = rhs[u]
+                if v != goal and rhs[v] == through_u:
+                    rhs[v] = best_rhs(v)
+                update_vertex(v)
+    return n_expanded
+
+
+_dstar_kernel_jit = numba.njit(_dstar_kernel) if numba is not None else None
+
+
+class IncrementalPlanner:
+    def __init__(self, cost_map: np.ndarray, start: Cell, goal: Cell, backend: str = "auto"):
+        """
+        Args:
+            cost_map: 2D array (H, W); non-finite cells are impassable (the planner keeps a copy)
+            start: (row, col) of the agent
+            goal: (row, col)
+            backend: 'auto', 'numba' or 'flat' ('dict' uses 'flat')
+        """
+        self.cost_map = np.array(cost_map, dtype=float)
+        assert self.cost_map.ndim == 2, "cost_map must be 2D"
+        backend = _resolve_backend(backend)
+        self.backend = "flat" if backend == "dict" else backend
+        self.goal = (int(goal[0]), int(goal[1]))
+        self.start = (int(start[0]), int(start[1]))
+        self._reset()
+
+    def _index(self, cell: Cell) -> int:
+        return cell[0] * self.cost_map.shape[1] + cell[1]
+
+    def _reset(self):
+        """Drop all search state; the next plan() searches from scratch."""
+        n = self.cost_map.size
+        self.hscale = min_cell_cost(self.cost_map)
+        self.km = 0.0
+        self.g = np.full(n, np.inf)
+        self.rhs = np.full(n, np.inf)
+        self.key1 = np.zeros(n)
+        self.key2 = np.zeros(n)
+        self.in_open = np.zeros(n, dtype=np.uint8)
+        self._dirty = {self._index(self.goal)}
+        self.rhs[self._index(self.goal)] = 0.0
+        self._anchor = self.start  # start when the keys were last made consistent with km
+
+    def _rekey(self, hscale: float):
+        """
+        Switch to a smaller heuristic scale. g and rhs do not depend on the heuristic, so
+        recomputing the keys of the open cells for the current start is enough.
+        """
+        self.hscale = hscale
+        self.km = 0.0
+        self._anchor = self.start
+        idx = np.flatnonzero(self.in_open)
+        W = self.cost_map.shape[1]
+        dr, dc = np.abs(idx // W - self.start[0]), np.abs(idx % W - self.start[1])
+        m = np.minimum(self.g[idx], self.rhs[idx])
+        self.key1[idx] = m + hscale * (np.maximum(dr, dc) + _SQRT2_M1 * np.minimum(dr, dc))
+        self.key2[idx] = m
+
+    def _octile(self, a: Cell, b: Cell) -> float:
+        dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+        return self.hscale * (max(dr, dc) + _SQRT2_M1 * min(dr, dc))
+
+    def move_to(self, cell: Cell):
+        """The agent is now at `cell`; plans start from here."""
+        cell = (int(cell[0]), int(cell[1]))
+        self.km += self._octile(self._anchor, cell)
+        self._anchor = self.start = cell
+
+    def update_cells(self, cells, values):
+        """Set cost_map at `cells` ((N, 2) rows/cols) to `values`; repaired on the next plan()."""
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        values = np.broadcast_to(np.asarray(values, dtype=float), (len(cells),))
+        changed = self.cost_map[cells[:, 0], cells[:, 1]] != values
+        cells, values = cells[changed], values[changed]
+        if not len(cells):
+            return
+        self.cost_map[cells[:, 0], cells[:, 1]] = values
+        finite = values[np.isfinite(values)]
+        if finite.size and finite.min() < self.hscale:
+            # the heuristic would overestimate on the new costs
+            self._rekey(max(float(finite.min()), 0.0))
+        # every edge touching a changed cell changed, so both ends need a new rhs
+        H, W = self.cost_map.shape
+        for dr, dc in [(0, 0)] + list(zip(_NB_DR.tolist(), _NB_DC.tolist())):
+            r, c = cells[:, 0] + dr, cells[:, 1] + dc
+            ok = (r >= 0) & (r < H) & (c >= 0) & (c < W)
+            self._dirty.update((r[ok] * W + c[ok]).tolist())
+
+    def set_region(self, r0: int, c0: int, values: np.ndarray):
+        """Overwrite cost_map[r0:r0+h, c0:c0+w]; only cells whose cost differs are repaired."""
+        values = np.asarray(values, dtype=float)
+        rows, cols = np.indices(values.shape)
+        self.update_cells(np.stack([rows.ravel() + r0, cols.ravel() + c0], axis=1), values.ravel())
+
+    def plan(self, stats: Optional[dict] = None):
+        """
+        Repair the search for the current start and map and return the optimal path.
+
+        Args:
+            stats: optional dict filled with 'expanded' and 'seconds'
+
+        Returns:
+            path: list of (r, c) from the current start to the goal, or None if unreachable
+            cost: total cost (inf if unreachable)
+        """
+        t0 = time.perf_counter()
+        H, W = self.cost_map.shape
+        start = self._index(self.start)
+        dirty = np.array(sorted(self._dirty), dtype=np.int64)
+        self._dirty = set()
+        open_idx = np.flatnonzero(self.in_open)
+        if self.backend == "numba":
+            expanded = _dstar_kernel_jit(self.cost_map.ravel(), self.g, self.rhs, self.key1, self.key2, self.in_open,
+                                         H, W, start, self._index(self.goal), self.km, self.hscale, open_idx, dirty,
+                                         _NB_DR, _NB_DC, _NB_MULT)
+        else:
+            # plain lists are much faster than numpy arrays for scalar access in Python
+            state = [a.tolist() for a in (self.g, self.rhs, self.key1, self.key2, self.in_open)]
+            expanded = _dstar_kernel(self.cost_map.ravel().tolist(), *state, H, W, start, self._index(self.goal),
+                                     self.km, self.hscale, open_idx.tolist(), dirty.tolist(), _NB_DR.tolist(),
+                                     _NB_DC.tolist(), _NB_MULT.tolist())
+            for arr, values in zip((self.g, self.rhs, self.key1, self.key2, self.in_open), state):
+                arr[:] = values
+        path, cost = self._extract_path()
+        if stats is not None:
+            stats.update(expanded=int(expanded), seconds=time.perf_counter() - t0)
+        return path, cost
+
+    def _successors(self, r: int, c: int):
+        """Neighbours of (r, c) minimising edge + g, as [(octile distance to goal, g, cell)]."""
+        H, W = self.cost_map.shape
+        cost_map, g = self.cost_map, self.g.reshape(H, W)
+        best, out = math.inf, []
+        for dr, dc, mult in zip(_NB_DR.tolist(), _NB_DC.tolist(), _NB_MULT.tolist()):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < H and 0 <= nc < W:
+                d = mult * 0.5 * (cost_map[r, c] + cost_map[nr, nc]) + g[nr, nc]
+                if d < best:
+                    best, out = d, []
+                if d == best and d < math.inf:
+                    out.append((self._octile((nr, nc), self.goal), float(g[nr, nc]), (nr, nc)))
+        return out
+
+    def _descends(self, cell: Cell) -> bool:
+        g = self.g.reshape(self.cost_map.shape)
+        return cell == self.goal or any(ng < g[cell] for _, ng, _ in self._successors(*cell))
+
+    def _cross_plateau(self, cell: Cell):
+        """
+        Cells from `cell` (excluded) to the nearest cell of equal g, joined by zero-cost
+        edges, that has a descending optimal step (or is the goal); None if there is none.
+        """
+        g = self.g.reshape(self.cost_map.shape)
+        level = g[cell]
+        prev = {cell: None}
+        queue = collections.deque([cell])
+        while queue:
+            cur = queue.popleft()
+            if cur != cell and self._descends(cur):
+                path = []
+                while cur != cell:
+                    path.append(cur)
+                    cur = prev[cur]
+                return path[::-1]
+            for _, ng, nxt in self._successors(*cur):
+                if ng == level and nxt not in prev:
+                    prev[nxt] = cur
+                    queue.append(nxt)
+        return None
+
+    def _extract_path(self):
+        H, W = self.cost_map.shape
+        g = self.g.reshape(H, W)
+        cost = float(self.rhs[self._index(self.start)])
+        if not np.isfinite(cost):
+            return None, math.inf
+        r, c = self.start
+        path = [(r, c)]
+        while (r, c) != self.goal:
+            # optimal steps only, and g must fall: equal-g neighbours (zero-cost edges) would
+            # let the walk go back and forth, so a plateau of them is crossed by a BFS instead
+            down = [s for s in self._successors(r, c) if s[1] < g[r, c]]
+            if down:
+                steps = [min(down)[2]]  # ties: nearest the goal (octile), then lowest g
+            else:
+                steps = self._cross_plateau((r, c))
+                if steps is None:
+                    return None, math.inf  # walled in: no neighbour has a finite edge plus cost-to-go
+            path.extend(steps)
+            r, c = path[-1]
+            if len(path) > H * W:
+                return None, math.inf  # g falls along the walk, so only an inconsistent state gets here
+        return path, cost
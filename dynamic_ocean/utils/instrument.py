@@ -0,0 +1,293 @@
+# utils/instrument.py
+"""
+Opt-in instrumentation: per-call latency histograms, allocated bytes and planner nodes.
+
+Nothing is wrapped until Recorder.instrument() is called, so code that is not being
+profiled runs exactly as before (no flag checks on the hot path). instrument() replaces
+named methods of an object (an env, a vector env, a Gymnasium wrapper, a planner) or
+named functions of a module with recording wrappers; uninstrument() puts the originals
+back.
+
+    rec = Recorder()
+    rec.instrument(env, ["reset", "step", "_get_obs"], prefix="env")
+    rec.instrument(pathfinding, ["astar_grid", "dijkstra_grid"], prefix="planner")
+    ...
+    rec.snapshot()      # dict of counts, totals, quantiles and buckets per call
+    rec.prometheus()    # the same in Prometheus text exposition format
+    rec.serve(9100)     # optional /metrics endpoint for a local scrape
+    rec.uninstrument()
+
+Per call name the recorder keeps a latency histogram (log-spaced buckets, seconds).
+Callables with a `stats` argument are given a stats dict when the caller passes none, and
+its 'expanded' count is added to the nodes-expanded counter. With track_allocations=True
+the bytes allocated during each call (tracemalloc peak above the level at entry) are
+summed as well; tracemalloc slows Python code down several times, so use it to find
+allocation hot spots, not for timing.
+
+Wrappers replace the attribute where it is looked up: instrumenting a module function
+does not affect modules that imported it by name before (`from .pathfinding import
+astar_grid`); instrument those modules too.
+"""
+
+import functools
+import inspect
+import threading
+import time
+import tracemalloc
+import types
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+# upper bounds (seconds) of the latency buckets: 1, 2.5, 5 per decade from 1us to 10s
+BUCKETS = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1.0, 2.5, 5.0)) + (10.0,)
+
+DEFAULT_METHODS = {
+    "env": ("reset", "step", "_get_obs"),
+    "vector_env": ("reset_wait", "step_wait", "_get_obs"),
+    "planner": ("astar_grid", "dijkstra_grid", "cost_to_go"),
+}
+
+
+class Histogram:
+    """Latency histogram over BUCKETS (the last count is the +Inf bucket)."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf past the last bucket, nan if empty)."""
+        if not self.count:
+            return float("nan")
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank and seen:
+                return bound
+        return float("inf")
+
+    def cumulative(self):
+        """[(upper bound, cumulative count)] including +Inf, as in the Prometheus format."""
+        out, seen = [], 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            out.append((bound, seen))
+        return out
+
+
+def _own_attribute(target, attr: str, value):
+    """`value` if it is stored on target itself, None if it is a method inherited from the class."""
+    if isinstance(target, (types.ModuleType, type)):
+        return vars(target).get(attr)
+    # not vars(target): reading an instance's __dict__ makes CPython 3.11+ give up its
+    # compact attribute layout for good, slowing every attribute access on it by ~15%
+    inherited = getattr(type(target), attr, None)
+    if getattr(value, "__self__", None) is target and getattr(value, "__func__", None) is inherited:
+        return None
+    return value
+
+
+def _accepts_stats(fn) -> Optional[inspect.Signature]:
+    try:
+        sig = inspect.signature(fn)
+    except (TypeError, ValueError):
+        return None
+    return sig if "stats" in sig.parameters else None
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class Recorder:
+    def __init__(self, track_allocations: bool = False, namespace: str = "dynamic_ocean"):
+        """
+        Args:
+            track_allocations: also sum bytes allocated per call (starts tracemalloc)
+            namespace: prefix of the Prometheus metric names
+        """
+        self.track_allocations = track_allocations
+        self.namespace = namespace
+        self.latency: Dict[str, Histogram] = {}
+        self.alloc_bytes: Dict[str, int] = {}
+        self.nodes_expanded: Dict[str, int] = {}
+        self._patches = []  # (target, attribute, original or None if it was inherited)
+        self._alloc_stack = []
+        self._started_tracing = False
+
+    # ----- wrapping -----
+
+    def instrument(self, target, names: Iterable[str], prefix: Optional[str] = None) -> "Recorder":
+        """
+        Record calls to target.<name> for each name, as '<prefix>.<name>'. prefix defaults
+        to the module name or the class name of `target`. Returns self (usable as a
+        context manager that uninstruments on exit).
+        """
+        if prefix is None:
+            prefix = getattr(target, "__name__", type(target).__name__).rsplit(".", 1)[-1]
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        for attr in names:
+            original = getattr(target, attr)
+            self._patches.append((target, attr, _own_attribute(target, attr, original)))
+            setattr(target, attr, self._wrap(original, f"{prefix}.{attr}"))
+        return self
+
+    def uninstrument(self):
+        """Restore every wrapped attribute (most recent first) and stop tracemalloc if we started it."""
+        while self._patches:
+            target, attr, original = self._patches.pop()
+            if original is None:
+                delattr(target, attr)  # was inherited from the class
+            else:
+                setattr(target, attr, original)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstrument()
+
+    def _wrap(self, fn, name: str):
+        hist = self.latency.setdefault(name, Histogram())
+        sig = _accepts_stats(fn)
+        track = self.track_allocations
+        perf = time.perf_counter
+
+        if sig is None and not track:
+            @functools.wraps(fn)
+            def timed(*args, **kwargs):
+                t0 = perf()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.observe(perf() - t0)
+            return timed
+
+        @functools.wraps(fn)
+        def recorded(*args, **kwargs):
+            stats = None
+            if sig is not None:
+                bound = sig.bind_partial(*args, **kwargs)
+                stats = bound.arguments.get("stats")
+                if stats is None:
+                    bound.arguments["stats"] = stats = {}
+                    args, kwargs = bound.args, bound.kwargs
+            frame = self._alloc_enter() if track else None
+            t0 = perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(perf() - t0)
+                if frame is not None:
+                    self._alloc_exit(name, frame)
+                if stats is not None and "expanded" in stats:
+                    self.nodes_expanded[name] = self.nodes_expanded.get(name, 0) + int(stats["expanded"])
+        return recorded
+
+    def _alloc_enter(self):
+        # tracemalloc has a single peak; nested calls reset it, so every open frame keeps the
+        # highest peak seen so far and passes it up to its parent on exit
+        current, peak = tracemalloc.get_traced_memory()
+        if self._alloc_stack:
+            parent = self._alloc_stack[-1]
+            parent[1] = max(parent[1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]  # [traced bytes at entry, highest peak seen]
+        self._alloc_stack.append(frame)
+        return frame
+
+    def _alloc_exit(self, name: str, frame):
+        peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+        self._alloc_stack.pop()
+        self.alloc_bytes[name] = self.alloc_bytes.get(name, 0) + (peak - frame[0])
+        if self._alloc_stack:
+            parent = self._alloc_stack[-1]
+            parent[1] = max(parent[1], peak)
+
+    # ----- export -----
+
+    def clear(self):
+        """Zero all counts (wrappers stay installed)."""
+        for hist in self.latency.values():
+            hist.clear()
+        self.alloc_bytes.clear()
+        self.nodes_expanded.clear()
+
+    def snapshot(self) -> dict:
+        calls = {}
+        for name, hist in self.latency.items():
+            calls[name] = {
+                "count": hist.count,
+                "total_seconds": hist.sum,
+                "mean_seconds": hist.sum / hist.count if hist.count else float("nan"),
+                "p50_seconds": hist.quantile(0.5),
+                "p99_seconds": hist.quantile(0.99),
+                "buckets": hist.cumulative(),
+            }
+        return {"calls": calls, "alloc_bytes": dict(self.alloc_bytes), "nodes_expanded": dict(self.nodes_expanded)}
+
+    def prometheus(self) -> str:
+        ns = self.namespace
+        lines = [f"# HELP {ns}_call_duration_seconds Latency of instrumented calls.",
+                 f"# TYPE {ns}_call_duration_seconds histogram"]
+        for name, hist in sorted(self.latency.items()):
+            call = _label(name)
+            for bound, n in hist.cumulative():
+                lines.append(f'{ns}_call_duration_seconds_bucket{{call="{call}",le="{_le(bound)}"}} {n}')
+            lines.append(f'{ns}_call_duration_seconds_sum{{call="{call}"}} {hist.sum!r}')
+            lines.append(f'{ns}_call_duration_seconds_count{{call="{call}"}} {hist.count}')
+        for metric, values, help_text in (
+            ("alloc_bytes_total", self.alloc_bytes, "Bytes allocated during instrumented calls."),
+            ("nodes_expanded_total", self.nodes_expanded, "Search nodes expanded by instrumented planners."),
+        ):
+            if values:
+                lines += [f"# HELP {ns}_{metric} {help_text}", f"# TYPE {ns}_{metric} counter"]
+                lines += [f'{ns}_{metric}{{call="{_label(k)}"}} {v}' for k, v in sorted(values.items())]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9100, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve prometheus() at http://host:port/metrics from a daemon thread. Returns the
+        server (server.server_address has the bound port when port=0; call shutdown() to stop).
+        """
+        recorder = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -4,14 +4,53 @@ Simple pathfinding utilities: A* and Dijkstra adapted to grid cost maps.
 
 We provide:
 - dijkstra_grid(cost_map, start, goal)
-- astar_grid(cost_map, start, goal, heuristic='manhattan')
+- astar_grid(cost_map, start, goal, heuristic='octile')
+- alt_landmarks(cost_map, count): landmark distance tables for astar_grid's 'alt' heuristic
+- cost_to_go(cost_map, goal): distance-to-goal and next-step fields for every cell,
+  read out with extract_path(parent_dir, start); method='sweep' computes the same field
+  with whole-array fast-sweeping passes instead of a per-cell Dijkstra
+- geodesic_distance(shape, goal): cost-free octile distance to the goal for every cell
+- plan_many(cost_map, queries, workers): optimal paths for many (start, goal) pairs,
+  one cost_to_go per distinct goal, in a process pool sharing the map
+- astar_time_grid(cost_cube, start, goal): time-dependent A* over (r, c, t) on a
+  (T, H, W) forecast cube, optionally waiting in place (the env's "stay" action)
+
+The static planners take a `backend` argument:
+- 'dict'  : reference implementation keeping the search state in dicts/sets keyed by (r, c)
+- 'flat'  : same search on flat arrays indexed by r*W + c (pure Python)
+- 'numba' : the flat kernel compiled with Numba (optional dependency)
+- 'auto'  : 'numba' when Numba is installed, else 'flat' (default)
+All backends expand nodes in the same order and return the same path and cost.
+
+astar_grid heuristics (edges cost mult * 0.5 * (c_u + c_v)):
+- 'octile' : octile distance times the smallest finite cell cost; admissible (default)
+- 'alt'    : ALT lower bound max_L |d(L, goal) - d(L, n)| from precomputed landmark
+             distance tables; admissible and usually far tighter than 'octile'
+- 'manhattan', 'euclidean' : raw grid distance, admissible only if every cell costs at
+             least sqrt(2) ('manhattan', which counts a diagonal step as 2) or at least 1
+             ('euclidean'); after aggregate_cost, which scales to [0, 1], they are not
+- anything else (e.g. 'zero', 'none') : no heuristic, i.e. Dijkstra
 """
 
 import heapq
 import math
-from typing import Tuple, List, Optional
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, Tuple, List, Optional
 import numpy as np
 
+from .cost_cache import array_digest
+from .shared import SharedArrayHandle, SharedArrays, attach
+
+try:
+    import numba
+except ImportError:  # optional accelerated backend
+    numba = None
+
+BACKENDS = ("auto", "numba", "flat", "dict")
+
 # 8-neighborhood: (dr,dc,move_cost_multiplier)
 NEIGHBORS = [
     (-1, 0, 1.0),
@@ -36,7 +75,749 @@ def _reconstruct(prev, start, goal):
     return path
 
 
-def dijkstra_grid(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int]):
+# flat-kernel version of NEIGHBORS (same order, so ties resolve identically)
+_NB_DR = np.array([n[0] for n in NEIGHBORS], dtype=np.int64)
+_NB_DC = np.array([n[1] for n in NEIGHBORS], dtype=np.int64)
+_NB_MULT = np.array([n[2] for n in NEIGHBORS], dtype=np.float64)
+
+# parent_dir codes of cost_to_go besides the NEIGHBORS index
+PARENT_GOAL = -1
+PARENT_NONE = -2
+# (dr + 1) * 3 + (dc + 1) -> NEIGHBORS index
+_DIR_LOOKUP = np.full(9, PARENT_NONE, dtype=np.int8)
+for _k, (_dr, _dc, _) in enumerate(NEIGHBORS):
+    _DIR_LOOKUP[(_dr + 1) * 3 + (_dc + 1)] = _k
+
+# heuristic codes understood by the flat kernel
+_HEURISTICS = {"zero": 0, "manhattan": 1, "euclidean": 2, "octile": 3, "alt": 4}
+_SQRT2_M1 = math.sqrt(2) - 1.0
+_NO_LANDMARKS = np.zeros(0)
+
+
+def _astar_flat_kernel(cost, g, prev, closed, H, W, start, goal, heur, hscale, lm, lm_goal, nb_dr, nb_dc, nb_mult):
+    """
+    A* over flat arrays (index r*W + c). `g` must be +inf, `prev` -1 and `closed` 0 on entry.
+    heur: 0 zero (Dijkstra), 1 manhattan, 2 euclidean, 3 octile (1-3 scaled by hscale),
+    4 ALT over the flat (L * H * W) landmark tables `lm`, with lm_goal the L distances at
+    the goal. goal < 0 runs until the heap is empty.
+    Returns (found, n_expanded). Written to compile unchanged under numba.njit.
+    """
+    gr = goal // W if goal >= 0 else 0
+    gc = goal - gr * W if goal >= 0 else 0
+    n = H * W
+    g[start] = 0.0
+    heap = [(0.0, start)]
+    n_expanded = 0
+    while len(heap) > 0:
+        f, cur = heapq.heappop(heap)
+        if cur == goal:
+            return True, n_expanded
+        if closed[cur]:
+            continue
+        closed[cur] = 1
+        n_expanded += 1
+        r = cur // W
+        c = cur - r * W
+        gcur = g[cur]
+        ccur = cost[cur]
+        for k in range(8):
+            nr = r + nb_dr[k]
+            nc = c + nb_dc[k]
+            if nr < 0 or nr >= H or nc < 0 or nc >= W:
+                continue
+            nxt = nr * W + nc
+            tentative_g = gcur + nb_mult[k] * 0.5 * (ccur + cost[nxt])
+            if tentative_g < g[nxt]:
+                prev[nxt] = cur
+                g[nxt] = tentative_g
+                h = 0.0
+                if heur == 1:
+                    h = hscale * (abs(nr - gr) + abs(nc - gc))
+                elif heur == 2:
+                    h = hscale * math.hypot(nr - gr, nc - gc)
+                elif heur == 3:
+                    dr = abs(nr - gr)
+                    dc = abs(nc - gc)
+                    h = hscale * (max(dr, dc) + _SQRT2_M1 * min(dr, dc))
+                elif heur == 4:
+                    for j in range(len(lm_goal)):
+                        a = lm_goal[j]
+                        b = lm[j * n + nxt]
+                        # landmarks that cannot reach both cells give no bound
+                        if a < math.inf and b < math.inf and abs(a - b) > h:
+                            h = abs(a - b)
+                heapq.heappush(heap, (tentative_g + h, nxt))
+    return False, n_expanded
+
+
+_astar_flat_kernel_jit = numba.njit(_astar_flat_kernel) if numba is not None else None
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    if backend == "auto":
+        return "numba" if numba is not None else "flat"
+    if backend == "numba" and numba is None:
+        raise ImportError("backend='numba' requires the numba package")
+    return backend
+
+
+def _search_flat(cost_map: np.ndarray, start, goal, heur: int, backend: str, hscale: float = 1.0,
+                 landmarks: Optional[np.ndarray] = None, stats: Optional[dict] = None):
+    """
+    Run the flat kernel; returns (g, prev, found). goal=None searches the whole grid.
+    landmarks: (L, H, W) tables for heur 4, or for the flat backend the list from
+    _flat_landmarks; stats: optional dict receiving 'expanded'.
+    """
+    H, W = cost_map.shape
+    n = H * W
+    cost = np.ascontiguousarray(cost_map, dtype=np.float64).ravel()
+    s = int(start[0]) * W + int(start[1])
+    t = -1 if goal is None else int(goal[0]) * W + int(goal[1])
+    lm, lm_goal = _NO_LANDMARKS, _NO_LANDMARKS
+    if landmarks is not None and goal is not None:
+        if isinstance(landmarks, list):
+            lm, lm_goal = landmarks, landmarks[t::n]  # lm_goal[k] = d(L_k, goal)
+        else:
+            lm = np.ascontiguousarray(landmarks, dtype=np.float64).reshape(-1)
+            lm_goal = np.ascontiguousarray(landmarks[:, int(goal[0]), int(goal[1])], dtype=np.float64)
+    if backend == "numba":
+        g = np.full(n, np.inf)
+        prev = np.full(n, -1, dtype=np.int64)
+        closed = np.zeros(n, dtype=np.uint8)
+        found, expanded = _astar_flat_kernel_jit(cost, g, prev, closed, H, W, s, t, heur, float(hscale), lm,
+                                                 lm_goal, _NB_DR, _NB_DC, _NB_MULT)
+    else:
+        # plain lists are much faster than numpy arrays for scalar access in Python
+        g = [math.inf] * n
+        prev = [-1] * n
+        closed = bytearray(n)
+        found, expanded = _astar_flat_kernel(cost.tolist(), g, prev, closed, H, W, s, t, heur, float(hscale),
+                                             _as_list(lm), _as_list(lm_goal), _NB_DR.tolist(), _NB_DC.tolist(),
+                                             _NB_MULT.tolist())
+    if stats is not None:
+        stats["expanded"] = int(expanded)
+    return g, prev, found
+
+
+def _as_list(values):
+    return values if isinstance(values, list) else values.tolist()
+
+
+def _flat_landmarks(landmarks, backend: str):
+    """
+    landmarks as _search_flat reads them on `backend`: for 'flat' a plain list of the
+    flattened tables, so that L * H * W conversion is paid once per map, not per query.
+    """
+    if landmarks is None or backend != "flat":
+        return landmarks
+    return np.ascontiguousarray(landmarks, dtype=np.float64).ravel().tolist()
+
+
+def _reconstruct_flat(prev, W, start, goal):
+    s = int(start[0]) * W + int(start[1])
+    cur = int(goal[0]) * W + int(goal[1])
+    path = []
+    while cur != s:
+        path.append(divmod(cur, W))
+        cur = int(prev[cur])
+    path.append(divmod(s, W))
+    path.reverse()
+    return path
+
+
+def dijkstra_grid(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int], backend: str = "auto",
+                  stats: Optional[dict] = None):
+    backend = _resolve_backend(backend)
+    if backend == "dict":
+        return _dijkstra_dict(cost_map, start, goal, stats)
+    g, prev, found = _search_flat(cost_map, start, goal, _HEURISTICS["zero"], backend, stats=stats)
+    if not found:
+        return None, float("inf")
+    W = cost_map.shape[1]
+    return _reconstruct_flat(prev, W, start, goal), float(g[int(goal[0]) * W + int(goal[1])])
+
+
+def min_cell_cost(cost_map: np.ndarray) -> float:
+    """Smallest finite cell cost (clipped at 0): the per-unit-length scale of the 'octile' heuristic."""
+    cost_map = np.asarray(cost_map, dtype=float)
+    lo = np.min(cost_map, where=np.isfinite(cost_map), initial=np.inf)
+    return max(float(lo), 0.0) if np.isfinite(lo) else 0.0
+
+
+# alt_landmarks results for maps astar_grid was called on without explicit tables
+_LANDMARK_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_LANDMARK_CACHE_SIZE = 4
+
+
+def alt_landmarks(cost_map: np.ndarray, count: int = 8, backend: str = "auto") -> np.ndarray:
+    """
+    Landmark distance tables for the 'alt' heuristic of astar_grid.
+
+    Landmarks are picked by farthest-point selection: the first is the cell farthest
+    from the grid centre, each next one the cell farthest from all landmarks so far.
+    Costs one full-grid Dijkstra per landmark; compute once per map and pass the result
+    to astar_grid(..., landmarks=...) (or cache it, e.g. with utils.cost_cache).
+
+    Returns:
+        (count, H, W) float array, [k, r, c] = optimal cost between landmark k and (r, c)
+        (inf where unreachable)
+    """
+    backend = _resolve_backend(backend)
+    if backend == "dict":
+        backend = "flat"
+    cost_map = np.asarray(cost_map, dtype=float)
+    H, W = cost_map.shape
+    tables = np.empty((count, H, W))
+
+    def dist_from(cell):
+        g, _, _ = _search_flat(cost_map, cell, None, _HEURISTICS["zero"], backend)
+        return np.asarray(g, dtype=float).reshape(H, W)
+
+    def farthest(dist):
+        return np.unravel_index(int(np.argmax(np.where(np.isfinite(dist), dist, -1.0))), (H, W))
+
+    nearest = dist_from((H // 2, W // 2))
+    for k in range(count):
+        tables[k] = dist_from(farthest(nearest))
+        nearest = tables[k] if k == 0 else np.minimum(nearest, tables[k])
+    return tables
+
+
+def _cached_landmarks(cost_map: np.ndarray, backend: str) -> np.ndarray:
+    key = (array_digest(np.asarray(cost_map, dtype=float)),)
+    tables = _LANDMARK_CACHE.get(key)
+    if tables is None:
+        tables = _LANDMARK_CACHE[key] = alt_landmarks(cost_map, backend=backend)
+        while len(_LANDMARK_CACHE) > _LANDMARK_CACHE_SIZE:
+            _LANDMARK_CACHE.popitem(last=False)
+    _LANDMARK_CACHE.move_to_end(key)
+    return tables
+
+
+def astar_grid(
+    cost_map: np.ndarray,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    heuristic: str = "octile",
+    backend: str = "auto",
+    landmarks: Optional[np.ndarray] = None,
+    stats: Optional[dict] = None,
+    hscale: Optional[float] = None,
+):
+    """
+    A* from start to goal; see the module docstring for heuristics and backends.
+
+    Args:
+        landmarks: (L, H, W) tables from alt_landmarks for heuristic='alt'; if omitted
+            they are computed on first use and cached by map contents (a few maps), which
+            costs a full-map digest per query. The 'flat' backend also converts the tables
+            to a list on every query (L * H * W values); plan_many does that once per map
+        stats: optional dict receiving 'expanded' (nodes expanded)
+        hscale: scale of the 'octile' heuristic (default min_cell_cost(cost_map), a
+            full-map pass per query). Callers running many queries on one map pass it,
+            and the landmarks, once computed.
+
+    Returns:
+        path: list of (r, c), or None if unreachable
+        cost: total cost (inf if unreachable)
+    """
+    backend = _resolve_backend(backend)
+    if heuristic != "octile":
+        hscale = 1.0
+    elif hscale is None:
+        hscale = min_cell_cost(cost_map)
+    if heuristic == "alt" and landmarks is None:
+        landmarks = _cached_landmarks(cost_map, backend)
+    if heuristic != "alt":
+        landmarks = None
+    if backend == "dict":
+        return _astar_dict(cost_map, start, goal, heuristic, hscale, landmarks, stats)
+    g, prev, found = _search_flat(cost_map, start, goal, _HEURISTICS.get(heuristic, 0), backend, hscale,
+                                  landmarks, stats)
+    if not found:
+        return None, float("inf")
+    W = cost_map.shape[1]
+    return _reconstruct_flat(prev, W, start, goal), float(g[int(goal[0]) * W + int(goal[1])])
+
+
+def _row_segments(eh: np.ndarray, W: int):
+    """Per row, [(a, b, C)] for runs a..b-1 of cells joined by finite horizontal edges, C the cumulative edge cost."""
+    segments = []
+    for row in eh:
+        breaks = np.flatnonzero(~np.isfinite(row)) + 1
+        bounds = [0] + breaks.tolist() + [W]
+        segments.append([(a, b, np.concatenate(([0.0], np.cumsum(row[a : b - 1]))))
+                         for a, b in zip(bounds, bounds[1:]) if b - a > 1])
+    return segments
+
+
+def _relax_row(row: np.ndarray, segments):
+    # exact min-plus scans along the row: d[j] = min_k d[k] + |C[j] - C[k]|, both directions
+    for a, b, C in segments:
+        x = row[a:b]
+        np.minimum(x, C + np.minimum.accumulate(x - C), out=x)
+        np.minimum(x, np.minimum.accumulate((x + C)[::-1])[::-1] - C, out=x)
+
+
+def _relax_vertical(row: np.ndarray, other: np.ndarray, e_mid, e_left, e_right):
+    # row[j] from other[j], other[j - 1] (e_left, aligned with row[1:]) and other[j + 1] (e_right)
+    np.minimum(row, other + e_mid, out=row)
+    np.minimum(row[1:], other[:-1] + e_left, out=row[1:])
+    np.minimum(row[:-1], other[1:] + e_right, out=row[:-1])
+
+
+def _cost_to_go_sweep(cost_map: np.ndarray, goal, tol: float, max_sweeps: Optional[int], stats: Optional[dict]):
+    """
+    Fast-sweeping min-plus relaxation: alternate top-down and bottom-up passes over the rows
+    until no cell improves by more than `tol`. Each row takes its vertical and diagonal
+    edges from the previous row in one vector operation, then resolves its horizontal
+    edges exactly with two cumulative-min scans, so one pass carries distances along any
+    monotone run of rows; paths that turn back need another pass. The fixed point is the
+    exact 8-neighbour Dijkstra field (up to float rounding of the cumulative sums).
+    """
+    c = np.asarray(cost_map, dtype=float)
+    H, W = c.shape
+    ev = 0.5 * (c[:-1] + c[1:])  # (i, j) - (i + 1, j)
+    ed = math.sqrt(2) * 0.5 * (c[:-1, :-1] + c[1:, 1:])  # (i, j) - (i + 1, j + 1)
+    ea = math.sqrt(2) * 0.5 * (c[:-1, 1:] + c[1:, :-1])  # (i, j + 1) - (i + 1, j)
+    segments = _row_segments(0.5 * (c[:, :-1] + c[:, 1:]), W)
+
+    d = np.full((H, W), np.inf)
+    gr, gc = int(goal[0]), int(goal[1])
+    d[gr, gc] = 0.0
+    _relax_row(d[gr], segments[gr])
+
+    def relax(i, j, e_mid, e_left, e_right):
+        # relax row i from row j; returns the largest improvement (0.0 if none)
+        row = d[i]
+        old = row.copy()
+        _relax_vertical(row, d[j], e_mid, e_left, e_right)
+        improved = row < old
+        if not improved.any():
+            return 0.0
+        _relax_row(row, segments[i])
+        improved = row < old
+        return float(np.max(old[improved] - row[improved]))
+
+    # rows improved during the last pass in each direction; a row only needs relaxing
+    # when the row it reads from improved since it was last relaxed
+    up_changed = np.ones(H, dtype=bool)
+    sweeps, max_change = 0, math.inf
+    while max_sweeps is None or sweeps < max_sweeps:
+        down_changed = np.zeros(H, dtype=bool)
+        max_change = 0.0
+        for i in range(1, H):
+            if up_changed[i - 1] or down_changed[i - 1]:
+                change = relax(i, i - 1, ev[i - 1], ed[i - 1], ea[i - 1])
+                down_changed[i] = change > 0.0
+                max_change = max(max_change, change)
+        if sweeps == 0:
+            down_changed[gr] = True  # the seeded goal row has not been read upwards yet
+        up_changed = np.zeros(H, dtype=bool)
+        for i in range(H - 2, -1, -1):
+            if down_changed[i + 1] or up_changed[i + 1]:
+                change = relax(i, i + 1, ev[i], ea[i], ed[i])
+                up_changed[i] = change > 0.0
+                max_change = max(max_change, change)
+        sweeps += 2
+        if max_change <= tol:
+            break
+    if stats is not None:
+        stats.update(sweeps=sweeps, max_change=max_change)
+    return d
+
+
+def _parents_from_dist(cost_map: np.ndarray, dist: np.ndarray, goal) -> np.ndarray:
+    """
+    parent_dir for a cost-to-go field without search parents: the neighbour minimising
+    edge + dist. Steps must lower (dist, grid distance to goal) lexicographically, so
+    ties on zero-cost edges cannot form cycles.
+    """
+    H, W = dist.shape
+    geo = geodesic_distance((H, W), goal)
+    pad = lambda a: np.pad(a, 1, constant_values=np.inf)
+    cp, dp, gp = pad(np.asarray(cost_map, dtype=float)), pad(dist), pad(geo)
+    best = np.full((H, W), np.inf)
+    parent_dir = np.full((H, W), PARENT_NONE, dtype=np.int8)
+    for k, (dr, dc, mult) in enumerate(NEIGHBORS):
+        window = (slice(1 + dr, 1 + dr + H), slice(1 + dc, 1 + dc + W))
+        nd = dp[window]
+        cand = mult * 0.5 * (cost_map + cp[window]) + nd
+        better = ((nd < dist) | ((nd == dist) & (gp[window] < geo))) & (cand < best)
+        best[better] = cand[better]
+        parent_dir[better] = k
+    parent_dir[~np.isfinite(dist)] = PARENT_NONE
+    parent_dir[int(goal[0]), int(goal[1])] = PARENT_GOAL
+    return parent_dir
+
+
+def cost_to_go(
+    cost_map: np.ndarray,
+    goal: Tuple[int, int],
+    backend: str = "auto",
+    method: str = "dijkstra",
+    tol: float = 0.0,
+    max_sweeps: Optional[int] = None,
+    stats: Optional[dict] = None,
+):
+    """
+    Goal-rooted cost-to-go field: one Dijkstra from `goal` over the whole grid.
+
+    Uses the same 8-neighbour averaged-cost edges as dijkstra_grid; since those are
+    symmetric, dist[r, c] is the optimal cost from (r, c) to the goal.
+
+    Args:
+        cost_map: 2D array (H, W)
+        goal: (row, col)
+        backend: 'auto', 'numba' or 'flat' ('dict' has no full-grid mode and uses 'flat')
+        method: 'dijkstra' (per-cell search, exact) or 'sweep' (whole-array fast-sweeping
+            passes, NumPy only; same field up to float rounding, backend unused)
+        tol: 'sweep' stops once a pass pair improves no cell by more than this
+        max_sweeps: optional cap on 'sweep' passes (the field may then be an overestimate)
+        stats: optional dict receiving 'expanded' ('dijkstra') or 'sweeps' and
+            'max_change' (the largest improvement in the last pass pair; 'sweep')
+
+    Returns:
+        dist: (H, W) float array of optimal costs to the goal (inf if unreachable)
+        parent_dir: (H, W) int8 array, index into NEIGHBORS of the next step towards
+            the goal; PARENT_GOAL at the goal and PARENT_NONE where unreachable
+    """
+    if method == "sweep":
+        cost_map = np.asarray(cost_map, dtype=float)
+        dist = _cost_to_go_sweep(cost_map, goal, tol, max_sweeps, stats)
+        return dist, _parents_from_dist(cost_map, dist, goal)
+    if method != "dijkstra":
+        raise ValueError(f"method must be 'dijkstra' or 'sweep', got {method!r}")
+    backend = _resolve_backend(backend)
+    if backend == "dict":
+        backend = "flat"
+    H, W = cost_map.shape
+    g, prev, _ = _search_flat(cost_map, goal, None, _HEURISTICS["zero"], backend, stats=stats)
+    dist = np.asarray(g, dtype=float).reshape(H, W)
+    prev = np.asarray(prev, dtype=np.int64)
+
+    parent_dir = np.full(H * W, PARENT_NONE, dtype=np.int8)
+    has_prev = prev >= 0
+    cells = np.flatnonzero(has_prev)
+    dr = prev[cells] // W - cells // W
+    dc = prev[cells] % W - cells % W
+    parent_dir[cells] = _DIR_LOOKUP[(dr + 1) * 3 + (dc + 1)]
+    parent_dir[int(goal[0]) * W + int(goal[1])] = PARENT_GOAL
+    return dist, parent_dir.reshape(H, W)
+
+
+def extract_path(parent_dir: np.ndarray, start: Tuple[int, int]):
+    """
+    Read the optimal path from `start` to the goal out of a cost_to_go parent field.
+    Runs in O(path length). Returns None if the goal is unreachable from `start`.
+    """
+    r, c = int(start[0]), int(start[1])
+    path = [(r, c)]
+    k = parent_dir[r, c]
+    while k != PARENT_GOAL:
+        if k == PARENT_NONE:
+            return None
+        dr, dc, _ = NEIGHBORS[k]
+        r += dr
+        c += dc
+        path.append((r, c))
+        k = parent_dir[r, c]
+    return path
+
+
+def geodesic_distance(shape: Tuple[int, int], goal: Tuple[int, int], scale: float = 1.0) -> np.ndarray:
+    """
+    Octile (8-connected, diagonal = sqrt(2)) distance from every cell to `goal`, times `scale`.
+    This is the geodesic distance on an obstacle-free grid; cost_to_go gives the cost-aware one.
+    """
+    rows = np.abs(np.arange(shape[0]) - int(goal[0]))[:, None]
+    cols = np.abs(np.arange(shape[1]) - int(goal[1]))[None, :]
+    lo = np.minimum(rows, cols)
+    hi = np.maximum(rows, cols)
+    return scale * ((hi - lo) + math.sqrt(2) * lo)
+
+
+# state of a plan_many pool worker, set by the pool initializer
+_planner = {}
+
+
+def _init_planner(cost_map, backend, heuristic, hscale, landmarks):
+    _planner["cost_map"] = attach(cost_map) if not isinstance(cost_map, np.ndarray) else cost_map
+    _planner["backend"] = backend
+    _planner["heuristic"] = heuristic
+    _planner["hscale"] = hscale
+    landmarks = attach(landmarks) if isinstance(landmarks, SharedArrayHandle) else landmarks
+    _planner["landmarks"] = _flat_landmarks(landmarks, backend)
+
+
+def _plan_groups(groups, planner=None):
+    """
+    Solve [(goal, [(query index, start), ...]), ...]; returns ([(index, path, cost)], searches).
+    planner holds cost_map / backend / heuristic and that heuristic's hscale / landmarks,
+    computed once per map (default: this worker's _planner).
+    """
+    planner = _planner if planner is None else planner
+    cost_map, backend = planner["cost_map"], planner["backend"]
+    results = []
+    for goal, items in groups:
+        if len(items) == 1:
+            i, start = items[0]
+            path, cost = astar_grid(cost_map, start, goal, heuristic=planner["heuristic"], backend=backend,
+                                    landmarks=planner["landmarks"], hscale=planner["hscale"])
+            results.append((i, path, cost))
+            continue
+        # one reverse Dijkstra answers every start with this goal
+        dist, parent_dir = cost_to_go(cost_map, goal, backend=backend)
+        for i, start in items:
+            results.append((i, extract_path(parent_dir, start), float(dist[start])))
+    return results, len(groups)
+
+
+def plan_many(
+    cost_map: np.ndarray,
+    queries: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]],
+    workers: Optional[int] = None,
+    backend: str = "auto",
+    heuristic: str = "octile",
+    chunk: int = 16,
+    stats: Optional[dict] = None,
+) -> Iterator[Tuple[int, Optional[List[Tuple[int, int]]], float]]:
+    """
+    Optimal paths for many (start, goal) queries on one map, yielded as they finish.
+
+    Queries are grouped by goal: a goal shared by several queries gets one cost_to_go
+    (reverse Dijkstra) and every path is read out of it; goals asked once use astar_grid.
+    With workers > 1 the groups run in a process pool; the map is published once in
+    shared memory (utils.shared) and workers attach to it instead of receiving copies.
+    With the default heuristic every cost is optimal (equal to dijkstra_grid's); among
+    equal-cost paths the one returned may differ.
+
+    Args:
+        cost_map: 2D array (H, W)
+        queries: iterable of ((start_r, start_c), (goal_r, goal_c))
+        workers: processes (default os.cpu_count()); <= 1 plans in this process
+        backend: search backend, as for astar_grid
+        heuristic: astar_grid heuristic for goals asked once; 'euclidean' is only admissible
+            when every cell costs at least 1, 'manhattan' at least sqrt(2)
+        chunk: single-query goals sent to a worker per task
+        stats: optional dict filled with 'queries', 'goals', 'searches', 'workers',
+            'seconds' and 'queries_per_sec' (updated as results arrive)
+
+    Yields:
+        (query index, path or None if unreachable, cost)
+    """
+    t0 = time.perf_counter()
+    by_goal = OrderedDict()
+    n_queries = 0
+    for start, goal in queries:
+        by_goal.setdefault((int(goal[0]), int(goal[1])), []).append((n_queries, (int(start[0]), int(start[1]))))
+        n_queries += 1
+    shared_goals = [(g, items) for g, items in by_goal.items() if len(items) > 1]
+    single_goals = [(g, items) for g, items in by_goal.items() if len(items) == 1]
+    tasks = [[group] for group in shared_goals]
+    tasks += [single_goals[k : k + chunk] for k in range(0, len(single_goals), chunk)]
+
+    workers = os.cpu_count() if workers is None else workers
+    workers = max(1, min(workers, len(tasks)))
+    backend = _resolve_backend(backend)
+    if stats is not None:
+        stats.update(queries=n_queries, goals=len(by_goal), searches=0, workers=workers, done=0)
+
+    def record(results, searches):
+        if stats is not None:
+            seconds = time.perf_counter() - t0
+            stats["searches"] += searches
+            stats["done"] += len(results)
+            stats.update(seconds=seconds, queries_per_sec=stats["done"] / seconds if seconds > 0 else 0.0)
+        return results
+
+    cost_map = np.asarray(cost_map, dtype=float)
+    # per-map heuristic inputs, computed here once instead of in every astar_grid call
+    hscale = min_cell_cost(cost_map) if heuristic == "octile" else None
+    landmarks = alt_landmarks(cost_map, backend=backend) if heuristic == "alt" and single_goals else None
+    if workers <= 1:
+        # local state, so interleaved plan_many generators do not share it
+        planner = {"cost_map": cost_map, "backend": backend, "heuristic": heuristic, "hscale": hscale,
+                   "landmarks": _flat_landmarks(landmarks, backend)}
+        for task in tasks:
+            yield from record(*_plan_groups(task, planner))
+        return
+
+    if backend == "numba":
+        # compile once here so forked workers inherit the kernel instead of each compiling it
+        _search_flat(np.ones((2, 2)), (0, 0), (1, 1), _HEURISTICS["zero"], backend)
+    with SharedArrays() as shared:
+        handle = shared.publish("cost_map", cost_map)
+        if landmarks is not None:
+            landmarks = shared.publish("landmarks", landmarks)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_planner,
+                                 initargs=(handle, backend, heuristic, hscale, landmarks)) as pool:
+            futures = [pool.submit(_plan_groups, task) for task in tasks]
+            try:
+                for future in as_completed(futures):
+                    yield from record(*future.result())
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+class _FrameCache:
+    """
+    LRU of flattened cube frames as memoryviews (fast scalar reads). Contiguous float32 or
+    float64 frames are not copied, so for a memmapped cube a cached frame is just a view
+    of the mapped pages; other frames are converted to float64.
+    """
+
+    def __init__(self, cube, max_frames: int):
+        self.cube = cube
+        self.max_frames = max(1, int(max_frames))
+        self._frames = OrderedDict()
+
+    def get(self, i: int):
+        frame = self._frames.get(i)
+        if frame is None:
+            frame = np.asarray(self.cube[i])
+            if frame.dtype not in (np.float32, np.float64):
+                frame = frame.astype(np.float64)
+            frame = memoryview(np.ascontiguousarray(frame).ravel())
+            self._frames[i] = frame
+            if len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        else:
+            self._frames.move_to_end(i)
+        return frame
+
+
+def astar_time_grid(
+    cost_cube,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    t0: int = 0,
+    steps_per_frame: int = 1,
+    allow_wait: bool = True,
+    max_wait: Optional[int] = None,
+    prune: bool = True,
+    heuristic: str = "cost_to_go",
+    max_frames: int = 16,
+    stats: Optional[dict] = None,
+):
+    """
+    Time-dependent A* over states (r, c, t) on a forecast cost cube.
+
+    Each move (and each wait, if allowed) takes one env step. A move departing at step t
+    costs mult * 0.5 * (c_u + c_v) on frame min(t // steps_per_frame, T - 1), the same
+    edge model as astar_grid; waiting costs the cell's own cost on that frame. Past the
+    last frame costs are static, so all later times collapse into one layer.
+
+    The cube is read frame by frame (any (T, H, W) array-like, e.g. a np.memmap) and at
+    most `max_frames` frames are held at once. With prune=True the search state is
+    bounded per cell: a cell is only entered by a move if that arrives strictly earlier
+    than every label already settled there, later times are reached by waiting (the FIFO
+    assumption). This keeps large cubes tractable but can miss a path that arrives later
+    yet cheaper than waiting would be; prune=False runs the exact time-expanded search.
+
+    Args:
+        cost_cube: (T, H, W) array-like of costs per frame
+        start: (row, col), departing at step t0
+        goal: (row, col), reached at any time
+        t0: step at which the search starts
+        steps_per_frame: env steps per cube frame
+        allow_wait: allow staying in place (action 0)
+        max_wait: if set, waiting at a cell is only allowed up to `max_wait` steps after
+            the earliest arrival there, which bounds the states per cell to max_wait + 1
+        prune: per-cell arrival-time pruning (see above)
+        heuristic: 'cost_to_go' (exact distance on the per-cell minimum over all frames),
+            'octile' (octile distance times the cube's minimum cost) or 'zero'; all are
+            admissible and consistent. Both non-zero ones cost one pass over the cube.
+        max_frames: frames kept in memory
+        stats: optional dict filled with 'expanded', 'settled' and 'max_heap'
+
+    Returns:
+        path: list of (row, col, step), or None if unreachable
+        cost: total cost (inf if unreachable)
+    """
+    T, H, W = (int(n) for n in cost_cube.shape)
+    n = H * W
+    t_static = (T - 1) * steps_per_frame
+    frames = _FrameCache(cost_cube, max_frames)
+    gr, gc = int(goal[0]), int(goal[1])
+    goal_idx = gr * W + gc
+    if heuristic == "zero":
+        h_field = [0.0] * n
+    else:
+        # every edge costs at least its cost on the per-cell minimum over time
+        min_frame = np.array(cost_cube[0], dtype=float)
+        for i in range(1, T):
+            np.minimum(min_frame, cost_cube[i], out=min_frame)
+        if heuristic == "cost_to_go":
+            h_field = cost_to_go(min_frame, goal)[0]
+        elif heuristic == "octile":
+            h_field = geodesic_distance((H, W), goal, scale=max(float(min_frame.min()), 0.0))
+        else:
+            raise ValueError(f"unknown heuristic {heuristic!r}")
+        h_field = h_field.ravel().tolist()
+    h = h_field.__getitem__
+
+    moves = [(dr, dc, mult) for dr, dc, mult in NEIGHBORS]
+    best_t = [t_static + 1] * n  # earliest settled arrival per cell
+    parents = {}  # settled state id (t * n + cell) -> parent state id
+    s = int(start[0]) * W + int(start[1])
+    # heap entries: (f, g, t, cell, parent state id, reached by waiting)
+    heap = [(h(s), 0.0, min(int(t0), t_static), s, -1, False)]
+    expanded = 0
+    max_heap = 1
+    found = None
+    while heap:
+        f, g, t, cell, psid, waited = heapq.heappop(heap)
+        sid = t * n + cell
+        if sid in parents:
+            continue
+        if prune and not waited and t >= best_t[cell]:
+            continue
+        parents[sid] = psid
+        if t < best_t[cell]:
+            best_t[cell] = t
+        if cell == goal_idx:
+            found = (sid, g)
+            break
+        expanded += 1
+        cost = frames.get(min(t // steps_per_frame, T - 1))
+        r, c = divmod(cell, W)
+        ccur = cost[cell]
+        nt = t + 1 if t < t_static else t_static
+        for dr, dc, mult in moves:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < H and 0 <= nc < W):
+                continue
+            nxt = nr * W + nc
+            if prune and nt >= best_t[nxt]:
+                continue
+            ng = g + mult * 0.5 * (ccur + cost[nxt])
+            heapq.heappush(heap, (ng + h(nxt), ng, nt, nxt, sid, False))
+        # waiting only makes sense while the forecast still changes
+        if allow_wait and t < t_static and (max_wait is None or nt - best_t[cell] <= max_wait):
+            ng = g + ccur
+            heapq.heappush(heap, (ng + h(cell), ng, nt, cell, sid, True))
+        if len(heap) > max_heap:
+            max_heap = len(heap)
+
+    if stats is not None:
+        stats.update(expanded=expanded, settled=len(parents), max_heap=max_heap)
+    if found is None:
+        return None, float("inf")
+    sid, g = found
+    path = []
+    while sid != -1:
+        t, cell = divmod(sid, n)
+        path.append((cell // W, cell % W, t))
+        sid = parents[sid]
+    path.reverse()
+    return path, g
+
+
+def _dijkstra_dict(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int], stats: Optional[dict] = None):
     H, W = cost_map.shape
     INF = float("inf")
     dist = np.full((H, W), INF, dtype=float)
@@ -64,20 +845,34 @@ def dijkstra_grid(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int,
                 dist[nr, nc] = nd
                 prev[(nr, nc)] = (r, c)
                 heapq.heappush(heap, (nd, (nr, nc)))
+    if stats is not None:
+        stats["expanded"] = int(visited.sum())
     if not visited[gr, gc]:
         return None, float("inf")
     path = _reconstruct(prev, (sr, sc), (gr, gc))
     return path, dist[gr, gc]
 
 
-def astar_grid(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int], heuristic: str = "manhattan"):
+def _astar_dict(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int], heuristic: str = "octile",
+                hscale: float = 1.0, landmarks: Optional[np.ndarray] = None, stats: Optional[dict] = None):
     H, W = cost_map.shape
+    lm_goal = landmarks[:, goal[0], goal[1]] if landmarks is not None else None
+
     def h(a, b):
         (r1, c1), (r2, c2) = a, b
         if heuristic == "manhattan":
-            return abs(r1 - r2) + abs(c1 - c2)
+            return hscale * (abs(r1 - r2) + abs(c1 - c2))
         elif heuristic == "euclidean":
-            return math.hypot(r1 - r2, c1 - c2)
+            return hscale * math.hypot(r1 - r2, c1 - c2)
+        elif heuristic == "octile":
+            dr, dc = abs(r1 - r2), abs(c1 - c2)
+            return hscale * (max(dr, dc) + _SQRT2_M1 * min(dr, dc))
+        elif heuristic == "alt":
+            best = 0.0
+            for a_k, b_k in zip(lm_goal, landmarks[:, r1, c1]):
+                if a_k < math.inf and b_k < math.inf and abs(a_k - b_k) > best:
+                    best = abs(a_k - b_k)
+            return best
         else:
             return 0.0
 
@@ -90,6 +885,8 @@ def astar_grid(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, in
     while open_heap:
         f, current = heapq.heappop(open_heap)
         if current == goal:
+            if stats is not None:
+                stats["expanded"] = len(closed)
             path = _reconstruct(prev, start, goal)
             return path, g_score[goal]
         if current in closed:
@@ -107,4 +904,6 @@ def astar_grid(cost_map: np.ndarray, start: Tuple[int, int], goal: Tuple[int, in
                 g_score[neighbor] = tentative_g
                 f_score[neighbor] = tentative_g + h(neighbor, goal)
                 heapq.heappush(open_heap, (f_score[neighbor], neighbor))
+    if stats is not None:
+        stats["expanded"] = len(closed)
     return None, float("inf")
@@ -0,0 +1,150 @@
+# utils/shared.py
+"""
+Read-only numpy arrays in multiprocessing.shared_memory, for cost maps shared by workers.
+
+The owning process publishes each array once into a named segment and hands workers a
+small picklable SharedArrayHandle; workers attach() and get a read-only ndarray over the
+segment itself, so N workers cost one copy of the map instead of N.
+
+    with SharedArrays() as shared:
+        handle = shared.publish("cost_map", cost_map)
+        ...  # pass `handle` to worker processes (AsyncVectorEnv env_fns, pools, ...)
+        cost_map = attach(handle)  # in the worker: no copy
+
+Attached arrays pickle as their handle, so closures and objects holding them (env
+factories sent to AsyncVectorEnv or pool workers) stay small and unpickle by attaching.
+
+SharedArrays owns the segments and unlinks them on close(), on leaving the with block,
+when it is garbage collected, or at interpreter exit. It cannot be pickled: keep it in
+the owning process and out of anything sent to workers. Attaching processes never unlink
+(they do not register with the multiprocessing resource tracker, which would otherwise
+destroy the segment when the first worker exits).
+"""
+
+import os
+import sys
+import threading
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+# segments attached in this process, kept open for the lifetime of the arrays over them
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+# serialises the resource_tracker.register swap in _open_segment with segment creation
+_tracker_lock = threading.Lock()
+
+
+class SharedArrayHandle(NamedTuple):
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # before 3.13 attaching registers the segment with the resource tracker, which then
+    # unlinks it when this process exits; the owner is responsible for that. Registering
+    # and unregistering again is not enough: a forked worker shares the owner's tracker,
+    # so its unregister would drop the owner's registration.
+    register = resource_tracker.register
+
+    def register_except_shm(name, rtype):
+        if rtype != "shared_memory":
+            register(name, rtype)
+
+    with _tracker_lock:
+        resource_tracker.register = register_except_shm
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedNDArray(np.ndarray):
+    """ndarray over a whole shared segment; pickles as its handle instead of its data."""
+
+    _handle = None
+
+    def __array_finalize__(self, obj):
+        self._handle = None  # slices and other views pickle as ordinary arrays
+
+    def __reduce__(self):
+        if self._handle is not None:
+            return attach, (self._handle,)
+        return np.asarray(self).__reduce__()
+
+
+def attach(handle: SharedArrayHandle) -> SharedNDArray:
+    """Read-only array over a published segment (no copy)."""
+    shm = _attached.get(handle.name)
+    if shm is None:
+        shm = _attached[handle.name] = _open_segment(handle.name)
+    arr = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf).view(SharedNDArray)
+    arr.flags.writeable = False
+    arr._handle = handle
+    return arr
+
+
+def _release(segments: Dict[str, shared_memory.SharedMemory], owner_pid: int):
+    if os.getpid() != owner_pid:
+        return  # a forked copy of the owner; the segments are not ours to unlink
+    for shm in segments.values():
+        try:
+            shm.close()
+        except BufferError:
+            pass  # arrays over it are still alive in this process; unlink anyway
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+
+class SharedArrays:
+    """Owner of a set of shared-memory arrays (see module docstring)."""
+
+    def __init__(self):
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self.handles: Dict[str, SharedArrayHandle] = {}
+        self._finalizer = weakref.finalize(self, _release, self._segments, os.getpid())
+
+    def publish(self, key: str, array: np.ndarray) -> SharedArrayHandle:
+        """Copy `array` into a new segment once; returns the handle workers attach to."""
+        if isinstance(array, SharedNDArray) and array._handle is not None:
+            self.handles[key] = array._handle  # already shared
+            return array._handle
+        array = np.ascontiguousarray(array)
+        with _tracker_lock:  # must be registered, so never created during the swap above
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        handle = SharedArrayHandle(shm.name, tuple(array.shape), array.dtype.str)
+        self._segments[shm.name] = shm
+        self.handles[key] = handle
+        return handle
+
+    def __reduce__(self):
+        # an unpickled copy would re-open the segments in another process, register them
+        # with that process's resource tracker and so unlink them when it exits
+        raise TypeError("SharedArrays owns its segments and cannot be pickled; "
+                        "send its handles or attached arrays instead")
+
+    def __getitem__(self, key: str) -> SharedArrayHandle:
+        return self.handles[key]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(shm.size for shm in self._segments.values())
+
+    def close(self):
+        """Unlink every segment (workers that are still attached keep their mappings)."""
+        self._finalizer()
+        self.handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
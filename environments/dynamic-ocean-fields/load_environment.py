@@ -11,9 +11,7 @@ import json
 import os
 
 # Import your local package (must be importable after editable install)
-from dynamic_ocean.envs.dynamic_ocean_env import DynamicOceanEnv
-from dynamic_ocean.utils.data_loader import load_grid
-from dynamic_ocean.envs.cost_functions import aggregate_cost
+from dynamic_ocean.env_factory import make_env_factory
 
 def load_environment(**kwargs) -> Any:
     """
@@ -23,24 +21,37 @@ def load_environment(**kwargs) -> Any:
       - weights: list of floats (optional)
       - patch_size: int optional
       - max_steps: int optional
-    This loader returns a callable (factory) that takes no args and returns a new env.
+      - start, goal: (row, col) overriding the map's own start / goal (optional)
+      - precompute_cost_to_go: bool, compute the goal cost-to-go field at load time
+        instead of on first use (default False)
+      - shaping: None, "cost_to_go" or "geodesic"; enables potential-based reward
+        shaping from that goal distance field (computed once, shared by all envs)
+      - shaping_gamma: float, discount used by the shaping term (default 0.99)
+      - cache_dir: optional directory of a utils.cost_cache.CostCache. The cost map, the
+        padded map and the distance fields are then read from (or written to) memory-mapped
+        files keyed on the grid bytes, weights and smooth_sigma, so workers on one host
+        share them instead of each rebuilding a private copy
+      - cache_max_bytes: optional size bound of that cache (LRU eviction)
+      - share_memory: bool, publish the cost map, padded map and fields once in
+        multiprocessing.shared_memory; envs attach to them read-only without copying, and
+        the factory pickles as segment handles (e.g. for AsyncVectorEnv workers). The
+        cost-to-go fields are then computed at load time, and the segments live until the
+        factory is garbage collected in the loading process or it exits (default False)
+      - observe_channels: bool, also observe the raw grid channels as 'local_channels';
+        the padded channel tensor is built once (cached / shared like the padded map)
+      - channel_layout: "last" ((K, K, C) patches, default) or "first" ((C, K, K))
+      - channel_dtype: dtype name of the channel observations (default "float32")
+      - pyramid_levels: int, observe L coarse cost levels as 'pyramid' (default 0)
+      - pyramid_pool: "mean" or "min" pooling of those levels (default "mean")
+    Other kwargs (e.g. obs_mode) are passed on to every DynamicOceanEnv.
+    This loader returns a callable (factory) that returns a new env; keyword arguments
+    to it override the env kwargs for that env (see dynamic_ocean.env_factory).
+    The factory's cost_to_go() returns the goal-rooted (dist, parent_dir) fields of
+    utils.pathfinding.cost_to_go; they are computed once and shared by every env.
     The verifiers template may require returning a vf.Environment; adapt if needed.
     """
     # Default to repo root data folder
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     default_grid = os.path.join(repo_root, "dynamic_ocean", "data", "sample_grid.npz")
-    grid_path = kwargs.get("grid_path", default_grid)
-    # load channels + meta
-    channels, meta = load_grid(grid_path)
-    weights = kwargs.get("weights", None) or [1.0] * channels.shape[0]
-    smooth_sigma = kwargs.get("smooth_sigma", 1.0)
-    cost_map = aggregate_cost(channels, weights, smooth_sigma=smooth_sigma)
-    start = meta.get("start", (0, 0))
-    goal = meta.get("goal", (channels.shape[1] - 1, channels.shape[2] - 1))
-
-    def env_factory():
-        return DynamicOceanEnv(cost_map=cost_map, start=start, goal=goal,
-                               patch_size=kwargs.get("patch_size", 3),
-                               max_steps=kwargs.get("max_steps", None))
-
-    return env_factory
+    kwargs.setdefault("grid_path", default_grid)
+    return make_env_factory(**kwargs)
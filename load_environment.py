@@ -1,15 +1,13 @@
 """Load function for Dynamic Ocean Fields environment."""
 
-from dynamic_ocean.envs import DynamicOceanEnv
+from dynamic_ocean.env_factory import make_env_factory
 from dynamic_ocean.utils.data_loader import generate_random_grid, load_grid
-from dynamic_ocean.envs.cost_functions import aggregate_cost
-import numpy as np
 
 
 def load_environment(grid_path=None, **kwargs):
     """
     Load the Dynamic Ocean Fields environment.
-    
+
     Args:
         grid_path: Path to .npz grid file. If None, generates random grid.
         **kwargs: Additional arguments:
@@ -18,25 +16,31 @@ def load_environment(grid_path=None, **kwargs):
             - patch_size: int, default 3
             - max_steps: int, optional
             - grid_size: tuple (height, width) if generating random grid, default (20, 20)
-    
+            - cache_dir, share_memory, shaping, observe_channels, pyramid_levels, ...:
+              options of dynamic_ocean.env_factory.make_env_factory; any other kwargs
+              go to DynamicOceanEnv
+
     Returns:
-        DynamicOceanEnv: Configured environment instance
+        DynamicOceanEnv: Configured environment instance. Its env_factory attribute builds
+        more envs over the same cost map and fields (and keeps shared memory alive).
     """
     if grid_path:
         channels, meta = load_grid(grid_path)
     else:
         grid_size = kwargs.pop('grid_size', (20, 20))
         channels = generate_random_grid(C=4, H=grid_size[0], W=grid_size[1], seed=42)
-    
+
     # Aggregate channels into single cost map (H, W)
     # Default weights: [wave_height, current_vel, temp, depth]
     weights = kwargs.pop('cost_weights', [1.0, 0.8, 0.3, 0.5])
-    cost_map = aggregate_cost(channels, weights=weights)
-    H, W = cost_map.shape
-    
+    H, W = channels.shape[1:]
+
     # Set defaults
     start = kwargs.pop('start', (0, 0))
     goal = kwargs.pop('goal', (H-1, W-1))
-    
-    env = DynamicOceanEnv(cost_map=cost_map, start=start, goal=goal, **kwargs)
+
+    factory = make_env_factory(channels=channels, weights=weights, smooth_sigma=kwargs.pop('smooth_sigma', 0.0),
+                               start=start, goal=goal, **kwargs)
+    env = factory()
+    env.env_factory = factory
     return env